@@ -1,25 +1,16 @@
 import os
-import sys  # Jangan lupa, biar bisa utak-atik sys.path
-import platform
 import logging
 import time
-from streamlit_autorefresh import st_autorefresh
 import threading
 import base64
 from io import BytesIO
 from datetime import datetime, timedelta
-import csv
-from PIL import Image, ImageDraw
 
 import streamlit as st
 import pandas as pd
-import plotly.graph_objs as go
-import schedule
 
-# Tambahkan folder 'modules' ke sys.path kalau belum ada
-modules_path = os.path.join(os.getcwd(), "modules")
-if modules_path not in sys.path:
-    sys.path.append(modules_path)
+# Catatan: plotly, PIL dan schedule sengaja diimpor di dalam fungsi yang
+# membutuhkannya agar cold start & rerun tidak membayar biaya impornya.
 
 # === Cek dan impor requests ===
 requests = None
@@ -29,36 +20,17 @@ except ImportError:
     st.error("Library 'requests' tidak ditemukan. Harap install library tersebut.")
     st.stop()
 
-# === Cek dan impor pyautogui serta ImageGrab jika OS mendukung ===
-pyautogui = None
-ImageGrab = None
-if platform.system() in ["Windows", "Darwin"] or os.environ.get('DISPLAY'):
-    try:
-        import pyautogui
-        from PIL import ImageGrab
-    except ImportError:
-        logging.warning("PyAutoGUI atau Pillow (ImageGrab) tidak dapat diimpor. Fungsi screenshot mungkin tidak tersedia.")
-else:
-    logging.info("PyAutoGUI dan ImageGrab tidak diimpor karena tidak ada lingkungan display atau bukan Windows/Darwin.")
-
 # === Import modul dari folder 'modules' ===
 try:
-    print("CWD:", os.getcwd())
-    print("Isi folder modules:", os.listdir("modules"))
-    
     from modules.indodax_api import (
         get_indodax_summary,
         get_trade_volume,
         fetch_all_tickers,
-        load_indodax_pairs,
-        get_candlestick_data,
-        get_top_movers,
         estimate_open_from_summary,
         get_open_24h,
     )
-    print("✅ Import modules.indodax_api berhasil!")
 except Exception as e:
-    print("❌ Gagal import modul indodax_api:", e)
+    logging.error(f"❌ Gagal import modul indodax_api: {e}")
     st.error(f"Gagal mengimpor modul Indodax API: {e}")
     st.stop()
 
@@ -71,9 +43,11 @@ except ImportError as e:
     st.stop()
 
 try:
-    from modules.telegram_bot import send_telegram_message, send_telegram_photo
+    from modules.chart_renderer import send_pair_chart
+    from modules.chart_data import prepare_chart_data
+    from modules.telegram_outbox import get_outbox
 except ImportError as e:
-    st.error(f"❌ Gagal impor modul telegram_bot: {e}")
+    st.error(f"❌ Gagal impor modul telegram_outbox: {e}")
     st.stop()
 
 try:
@@ -82,17 +56,45 @@ except ImportError as e:
     st.error(f"❌ Gagal impor modul signal_engine: {e}")
     st.stop()
 
+try:
+    from modules.rate_limiter import get_rate_stats
+    from modules.pair_registry import load_pair_registry, pair_registry
+    from modules.movers import WINDOWS as MOVER_WINDOWS, compute_movers, market_history, record_tickers
+    from modules.event_log import get_event_log
+    from modules.compact_frames import compact_candles, candle_frames, expand_candle_frames
+    from modules.circuit_breaker import pair_breaker, negative_cache
+    from modules.metrics import metrics, timed, start_metrics_server
+    from modules.profiler import ProfileSession, list_profiles
+    from modules.market_stream import get_market_stream
+    from modules.timeframes import timeframe_seconds
+    from modules.ohlc_history import get_candles_with_history
+    from modules.frame_cache import get_frame_cache
+    from modules.shared_cache import get_shared_cache
+    from modules.order_book import SIGNAL_BAND_PCT, get_order_book_store, parse_bands
+    from modules.screener import screen_thresholds
+    from modules.config import config_from_mapping
+except ImportError as e:
+    st.error(f"❌ Gagal impor modul: {e}")
+    st.stop()
+
+try:
+    from modules.scanner import run_auto_scan_scheduler
+except ImportError as e:
+    st.error(f"❌ Gagal impor modul scanner: {e}")
+    st.stop()
+
 try:
     from utils.helpers import (
         hitung_rasio_bs,
         clean_and_transform_market_data,
         enrich_market_dataframe,
-        get_top_movers as get_top_movers_helper,
         format_price_idr_int,
         format_number,
         format_token_amount,
         format_volume,  # ✅ WAJIB ADA!
+        format_price,
     )
+    from utils.market_table import SIGNAL_ORDER, SORTABLE_COLUMNS, build_fast_market_frame, query_market_table
 except ImportError as e:
     st.error(f"❌ Gagal impor modul helpers: {e}")
     st.stop()
@@ -110,7 +112,6 @@ default_session_keys = {
     "CURRENT_PAGE": "Home",
     "startup_notified": False,
     "auto_scan_started": False,
-    "last_screenshot_time": None
 }
 
 for key, default_value in default_session_keys.items():
@@ -118,42 +119,169 @@ for key, default_value in default_session_keys.items():
         st.session_state[key] = default_value
 
 # === get_app_config ===
+# Kunci yang wajib ada di secrets.toml; sisanya punya default di modules.config
+REQUIRED_SECRET_KEYS = ["exchange", "api_key", "api_secret", "telegram_token", "telegram_chat_id"]
+
 def get_app_config():
+    """st.secrets lewat coerce yang sama dengan scanner (modules.config): satu definisi per kunci."""
     try:
-        return {
-            "exchange": st.secrets["exchange"],
-            "api_key": st.secrets["api_key"],
-            "api_secret": st.secrets["api_secret"],
-            "telegram_token": st.secrets["telegram_token"],
-            "telegram_chat_id": st.secrets["telegram_chat_id"]
-        }
+        missing = [key for key in REQUIRED_SECRET_KEYS if key not in st.secrets]
+        if missing:
+            raise KeyError(f"kunci wajib tidak ada: {', '.join(missing)}")
+        config = config_from_mapping(st.secrets)
     except Exception as e:
         logger.error(f"Gagal memuat konfigurasi dari st.secrets: {e}")
         st.error(f"Gagal memuat konfigurasi aplikasi dari secrets.toml: {e}. Pastikan file secrets.toml sudah benar.")
         st.stop()
+    config["depth_bands"] = parse_bands(config["depth_bands"])
+    return config
 
 APP_CONFIG = get_app_config()
 TELEGRAM_TOKEN = APP_CONFIG["telegram_token"]
 TELEGRAM_CHAT_ID = APP_CONFIG["telegram_chat_id"]
+TELEGRAM_OUTBOX = get_outbox(TELEGRAM_TOKEN)
+EVENT_LOG = get_event_log()
+start_metrics_server(APP_CONFIG["metrics_port"])
+# Stream WebSocket opsional; tanpa stream (atau saat basi) semua panel kembali ke polling REST
+MARKET_STREAM = (
+    get_market_stream(APP_CONFIG["indodax_ws_url"], APP_CONFIG["indodax_ws_token"])
+    if APP_CONFIG["market_stream"] else None
+)
+# Frame candle + indikator per (pair, timeframe), dibatasi total byte (bukan jumlah entri)
+FRAME_CACHE = get_frame_cache(APP_CONFIG["frame_cache_mb"] * 2**20)
+# Deployment multi-proses: satu proses mengambil ticker/candle, proses lain membaca dari shared memory
+SHARED_CACHE = get_shared_cache(APP_CONFIG["shared_cache_dir"]) if APP_CONFIG["shared_cache"] else None
+# Order book (depth) pair paling likuid, diperbarui di latar belakang untuk tabel pasar global
+ORDER_BOOKS = get_order_book_store()
+
+# === Profiling on-demand (hanya jika profiling_admin aktif): ?profile=1 atau tombol admin -> satu rerun penuh diprofil ===
+# Sesi rerun sebelumnya yang terputus exception sebelum akhir skrip dibuang agar cProfile tidak tertinggal aktif
+stale_profile = st.session_state.pop("profile_session", None)
+if stale_profile is not None:
+    stale_profile.discard()
+PROFILE_SESSION = None
+profile_requested = st.query_params.get("profile") == "1"
+if profile_requested:
+    st.query_params.pop("profile", None)  # hanya rerun ini, bukan setiap refresh
+if APP_CONFIG["profiling_admin"] and (profile_requested or st.session_state.pop("profile_next_run", False)):
+    PROFILE_SESSION = ProfileSession("rerun").start()
+    if PROFILE_SESSION.active:
+        st.session_state.profile_session = PROFILE_SESSION
+
+def finish_profile_session(pair="", tf=""):
+    """Hentikan profil rerun ini (akhir skrip, atau sebelum st.stop()/st.rerun()); ringkasan atau None."""
+    if PROFILE_SESSION is None or not PROFILE_SESSION.active:
+        return None
+    st.session_state.pop("profile_session", None)
+    PROFILE_SESSION.pair, PROFILE_SESSION.tf = pair, tf
+    st.session_state.last_profile = PROFILE_SESSION.stop()
+    return st.session_state.last_profile
 
 # === FUNGSI PEMBANTU ===
 
-# === format_price ===
-def format_price(price, pair_symbol):
-    try:
-        price = float(price)
-        pair_symbol = str(pair_symbol).lower()
-        if any(currency in pair_symbol for currency in ["usdt", "usdc", "usd"]):
-            return f"{price:,.8f}"
-        elif "idr" in pair_symbol:
-            return f"{price:,.0f}" if price >= 1 else f"{price:,.6f}"
-        else:
-            return f"{price:,.2f}"
-    except (ValueError, TypeError):
-        return str(price)
+# === Jadwal refresh per panel (fragment) & cache data ===
+PANEL_REFRESH = {
+    "pair_info": "5s" if MARKET_STREAM else "30s",
+    "price_slide": "3s" if MARKET_STREAM else "10s",
+    "candles": "15s" if MARKET_STREAM else "60s",
+    "market": "60s",
+    "monitoring": "5s",
+}
+
+def candle_bucket(tf):
+    """Indeks candle yang sedang berjalan; berubah saat candle timeframe tersebut ditutup."""
+    return int(time.time() // timeframe_seconds(tf, 300))
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def cached_pairs():
+    # Registry (id kanonik, alias, presisi) dibangun ulang paling sering sekali per jam
+    return load_pair_registry(refresh=True).ids()
+
+@st.cache_data(ttl=10, show_spinner=False)
+def cached_summary(pair):
+    if SHARED_CACHE is not None:
+        return SHARED_CACHE.get_or_publish(f"summary/{pair}", lambda: get_indodax_summary(pair), max_age=10, valid=bool)
+    return get_indodax_summary(pair)
+
+def live_summary(pair):
+    """Ticker dari stream WebSocket jika masih segar, selain itu polling REST (cache 10 detik)."""
+    if MARKET_STREAM is not None and MARKET_STREAM.state.is_live():
+        summary = MARKET_STREAM.state.summary(pair)
+        if summary is not None:
+            return summary
+    return cached_summary(pair)
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def cached_cmc_info(symbol):
+    return get_coinmarketcap_info(symbol, api_key=APP_CONFIG["coinmarketcap_api_key"])
+
+@st.cache_data(ttl=60, show_spinner=False)
+def cached_all_tickers():
+    if SHARED_CACHE is not None:
+        tickers = SHARED_CACHE.get_or_publish("tickers", fetch_all_tickers, max_age=60, valid=bool)
+    else:
+        tickers = fetch_all_tickers()
+    # Setiap fetch baru dicatat sebagai snapshot untuk top movers multi-window
+    record_tickers(tickers)
+    return tickers
+
+def cached_candles_with_indicators(pair, tf, bucket, compact=False, generation=0):
+    """
+    Candle + indikator per (pair, timeframe) di FRAME_CACHE (LRU dibatasi byte, tanpa
+    salin/pickle seperti st.cache_data); `bucket` membuat entri basi saat candle ditutup,
+    `generation` saat stream pair ini bolong (candle diambil ulang via REST).
+    """
+    return FRAME_CACHE.get_or_compute(
+        (pair, tf), (bucket, generation, compact), lambda: shared_candles_with_indicators(pair, tf, bucket, compact, generation)
+    )
+
+def shared_candles_with_indicators(pair, tf, bucket, compact=False, generation=0):
+    """
+    Lewat SHARED_CACHE (jika aktif): hanya frame indikator yang dibagi antar proses,
+    frame candle diturunkan dari kolom OHLCV-nya.
+    """
+    if SHARED_CACHE is None or generation:
+        # generation > 0: stream pair ini bolong di proses ini, ambil ulang sendiri via REST
+        return build_candles_with_indicators(pair, tf, compact)
+    with_indicators = SHARED_CACHE.get_or_publish(
+        f"candles/{pair}/{tf}", lambda: build_candles_with_indicators(pair, tf, compact)[1],
+        stamp=[bucket, compact], valid=lambda df: not df.empty,
+    )
+    return candle_frames(with_indicators, compact)
+
+def build_candles_with_indicators(pair, tf, compact=False):
+    # Riwayat panjang dari store lokal (backfill sekali) + candle terbaru dari /trades
+    candle_df = get_candles_with_history(pair, tf)
+    if candle_df.empty:
+        return candle_df, candle_df
+    with timed("indicators", pair=pair, tf=tf):
+        with_indicators = apply_indicators(candle_df.copy())
+    if compact:
+        # Cukup simpan satu frame ringkas (float32, ts int64); OHLC sudah ada di frame indikator
+        return None, compact_candles(with_indicators, pair)
+    return candle_df, with_indicators
+
+def load_candles(pair, tf):
+    generation = 0
+    if MARKET_STREAM is not None:
+        MARKET_STREAM.track(pair, [tf])
+        generation = MARKET_STREAM.state.generation(pair)
+    candle_df, with_indicators = expand_candle_frames(
+        *cached_candles_with_indicators(pair, tf, candle_bucket(tf), APP_CONFIG["compact_frames"], generation)
+    )
+    if MARKET_STREAM is not None and MARKET_STREAM.state.is_live():
+        # Candle berjalan diperbarui per trade dari stream; indikator dihitung ulang (murah)
+        live_df = MARKET_STREAM.state.overlay_candle(pair, tf, candle_df)
+        if live_df is not candle_df:
+            candle_df = live_df
+            with timed("indicators", pair=pair, tf=tf):
+                with_indicators = apply_indicators(candle_df.copy())
+    return candle_df, with_indicators
 
 # === load_logo ===
 def load_logo(logo_path="logo.png"):
+    from PIL import Image, ImageDraw
+
     if os.path.exists(logo_path):
         try:
             logo_img = Image.open(logo_path)
@@ -174,42 +302,57 @@ def load_logo(logo_path="logo.png"):
 
     return default_logo
 
-# === take_and_send_screenshot ===
-def take_and_send_screenshot(filepath="ui_screenshot.png", caption=""):
-    if ImageGrab:
-        try:
-            ss = ImageGrab.grab()
-            ss.save(filepath)
-            send_telegram_photo(filepath, TELEGRAM_TOKEN, TELEGRAM_CHAT_ID, caption=caption)
-            logger.info(f"✅ Screenshot UI '{filepath}' dikirim ke Telegram.")
-            os.remove(filepath)
-        except Exception as e:
-            logger.warning(f"❌ Gagal mengambil atau mengirim screenshot: {e}")
+# === load_logo_assets ===
+LOGO_THUMB_PATH = os.path.join("assets", "logo_thumb.png")
+LOGO_THUMB_SIZE = (120, 120)
+
+@st.cache_resource(show_spinner=False)
+def load_logo_assets(logo_path="logo.png", thumb_path=LOGO_THUMB_PATH):
+    """
+    Thumbnail logo (bytes PNG) dan data URI untuk header, dibuat sekali per proses.
+    Memakai thumbnail yang sudah disiapkan di assets/; jika tidak ada, logo asli
+    diperkecil di memori.
+    """
+    if os.path.exists(thumb_path):
+        with open(thumb_path, "rb") as f:
+            thumb_bytes = f.read()
     else:
-        logger.info("📸 Screenshot dinonaktifkan (ImageGrab tidak tersedia).")
+        from PIL import Image
+
+        logo_img = load_logo(logo_path)
+        logo_img.thumbnail(LOGO_THUMB_SIZE, Image.LANCZOS)
+        buffered = BytesIO()
+        logo_img.save(buffered, format="PNG", optimize=True)
+        thumb_bytes = buffered.getvalue()
+    return thumb_bytes, f"data:image/png;base64,{base64.b64encode(thumb_bytes).decode()}"
+
+# === send_chart_snapshot ===
+def send_chart_snapshot(pair, tf='1h', caption=""):
+    """Render chart pair di server (tanpa display) lalu masukkan ke outbox Telegram."""
+    try:
+        send_pair_chart(TELEGRAM_OUTBOX, TELEGRAM_CHAT_ID, pair, tf=tf, caption=caption)
+    except Exception as e:
+        logger.warning(f"❌ Gagal merender atau mengirim chart {pair}: {e}")
 
-# === periodic_screenshot_job ===
-def periodic_screenshot_job(interval_seconds):
-    now = datetime.now()
-    if interval_seconds > 0:
-        if st.session_state.last_screenshot_time is None or \
-           (now - st.session_state.last_screenshot_time).total_seconds() >= interval_seconds:
-            take_and_send_screenshot(caption=f"Periodic UI Screenshot ({now.strftime('%Y-%m-%d %H:%M:%S')})")
-            st.session_state.last_screenshot_time = now
+# === run_periodic_chart_scheduler ===
+def run_periodic_chart_scheduler(interval_seconds, pair, tf='1h'):
+    import schedule
 
-# === run_periodic_screenshot_scheduler ===
-def run_periodic_screenshot_scheduler(interval_seconds):
     if interval_seconds > 0:
-        schedule.every(interval_seconds).seconds.do(periodic_screenshot_job, interval_seconds)
-        logger.info(f"Screenshot periodik diatur setiap {interval_seconds} detik.")
+        schedule.every(interval_seconds).seconds.do(
+            lambda: send_chart_snapshot(pair, tf, caption=f"Chart Periodik {pair.upper()} ({datetime.now().strftime('%Y-%m-%d %H:%M:%S')})")
+        )
+        logger.info(f"Chart periodik {pair} diatur setiap {interval_seconds} detik.")
         while True:
             schedule.run_pending()
             time.sleep(1)
     else:
-        logger.info("Screenshot periodik dinonaktifkan.")
+        logger.info("Chart periodik dinonaktifkan.")
 
 # === plot_technical_charts ===
 def plot_technical_charts(df, pair_symbol):
+    import plotly.graph_objects as go
+
     fig = go.Figure()
     fig.add_trace(go.Candlestick(
         x=df.index, open=df['open'], high=df['high'], low=df['low'], close=df['close'], name='Candlestick'
@@ -232,7 +375,8 @@ def plot_technical_charts(df, pair_symbol):
 
 # === scan_selected_pair_signals ===
 def scan_selected_pair_signals(pair_symbol, candle_df, summary_data):
-    signals_df = scan_signals(pair_symbol, candle_df)
+    with timed("scan", pair=pair_symbol):
+        signals_df = scan_signals(pair_symbol, candle_df)
     if not signals_df.empty:
         st.dataframe(signals_df.tail(5))
         last_signal_info = signals_df.iloc[-1]
@@ -260,36 +404,24 @@ def scan_selected_pair_signals(pair_symbol, candle_df, summary_data):
 
                 final_msg = "\n".join(msg_parts)
 
-                if send_telegram_message(final_msg, TELEGRAM_TOKEN, TELEGRAM_CHAT_ID):
-                    st.success(f"Sinyal terkirim ke Telegram! 🚀\n{final_msg}")
+                if TELEGRAM_OUTBOX.enqueue_message(final_msg, TELEGRAM_CHAT_ID):
+                    st.success(f"Sinyal masuk antrean Telegram! 🚀\n{final_msg}")
                     st.session_state.SENT_SIGNALS.append({
                         'pair': pair_symbol,
                         'signal_text': current_signal_text,
                         'time': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
                     })
-                    with open("signal_logs.txt", "a", encoding="utf-8") as f:
-                        f.write(f"{datetime.now()} - {pair_symbol} - {final_msg}\n")
+                    EVENT_LOG.log(
+                        "signal", pair_symbol, message=final_msg, signals=signal_messages,
+                        source="ui", tf=st.session_state.get('signal_interval_tf', '')
+                    )
                 else:
-                    st.error("Gagal mengirim sinyal ke Telegram.")
+                    st.error("Gagal mengirim sinyal ke Telegram (token/chat id belum diatur).")
             else:
                 st.info(f"Sinyal '{current_signal_text}' untuk {pair_symbol.upper()} sudah pernah dikirim.")
     else:
         st.write("Tidak ada sinyal MACD/Volume Spike terdeteksi untuk pair ini.")
 
-# === generate_market_signal ===
-def generate_market_signal(buy_vol, sell_vol):
-    if buy_vol > sell_vol * 1.2: return "STRONG BUY"
-    if buy_vol > sell_vol: return "BUY"
-    if buy_vol == sell_vol: return "HOLD"
-    if sell_vol > buy_vol * 1.2: return "STRONG SELL"
-    return "SELL"
-
-# === get_position_suggestion ===
-def get_position_suggestion(signal):
-    if signal in ["STRONG BUY", "BUY"]: return "Pertimbangkan LONG"
-    if signal in ["STRONG SELL", "SELL"]: return "Pertimbangkan SHORT"
-    return "-"
-
 # === style_signal_column ===
 def style_signal_column(val):
     color_map = {
@@ -301,75 +433,59 @@ def style_signal_column(val):
     }
     return color_map.get(val, "")
 
-# === auto_scan_all_pairs_job ===
-def auto_scan_all_pairs_job(available_pairs):
-    logger.info("Memulai auto-scan semua pair...")
-    alerted_pairs_info = []
-    for p in available_pairs:
-        try:
-            df = get_candlestick_data(p, tf='1h', limit=100)
-            if df is not None and not df.empty:
-                df_with_indicators = apply_indicators(df.copy())
-                latest = df_with_indicators.iloc[-1]
-                alerts = []
-                if latest.get('rsi', 50) > 70: alerts.append(f"RSI Overbought ({latest['rsi']:.2f})")
-                elif latest.get('rsi', 50) < 30: alerts.append(f"RSI Oversold ({latest['rsi']:.2f})")
-
-                macd = latest.get('macd')
-                macd_signal = latest.get('macd_signal')
-                macd_hist = latest.get('macd_hist')
-                if macd is not None and macd_signal is not None and macd_hist is not None:
-                    prev_macd_hist = df_with_indicators['macd_hist'].iloc[-2] if len(df_with_indicators) > 1 else 0
-                    if macd > macd_signal and prev_macd_hist <= 0:
-                        alerts.append("MACD Bullish Crossover")
-                    elif macd < macd_signal and prev_macd_hist >= 0:
-                        alerts.append("MACD Bearish Crossover")
-
-                if alerts:
-                    signal_message = f"🚨 Sinyal Auto-Scan pada {p.upper()} (1H):\n" + "\n".join([f"- {a}" for a in alerts])
-                    send_telegram_message(signal_message, TELEGRAM_TOKEN, TELEGRAM_CHAT_ID)
-                    alerted_pairs_info.append({'pair': p, 'signals': alerts, 'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")})
-                    logger.info(f"Sinyal auto-scan terdeteksi di {p.upper()}: {', '.join(alerts)}")
-        except Exception as e:
-            logger.warning(f"Error saat auto-scan pair {p}: {e}")
-            time.sleep(1)
-
-    if alerted_pairs_info:
-        try:
-            with open("auto_scan_log.csv", "a", newline='', encoding="utf-8") as f:
-                writer = csv.writer(f)
-                if f.tell() == 0:
-                    writer.writerow(["Timestamp", "Pair", "Detected Signals"])
-                for item in alerted_pairs_info:
-                    writer.writerow([item['timestamp'], item['pair'], ", ".join(item['signals'])])
-            logger.info(f"Hasil auto-scan disimpan ke auto_scan_log.csv. Sinyal pada: {', '.join([i['pair'] for i in alerted_pairs_info])}")
-        except IOError as e:
-            logger.error(f"Gagal menulis ke auto_scan_log.csv: {e}")
-    else:
-        logger.info("Auto-scan selesai: tidak ada sinyal baru yang signifikan terdeteksi.")
-    return alerted_pairs_info
+# === render_fast_market_table ===
+MARKET_COLUMN_CONFIG = {
+    "Harga": st.column_config.NumberColumn("Harga", format="localized"),
+    "Volume IDR (24j)": st.column_config.NumberColumn("Volume IDR (24j)", format="compact"),
+    "Harga Bid": st.column_config.NumberColumn("Harga Bid", format="localized", help="Harga beli tertinggi (ticker)"),
+    "Harga Ask": st.column_config.NumberColumn("Harga Ask", format="localized", help="Harga jual terendah (ticker)"),
+    "Spread (%)": st.column_config.NumberColumn("Spread (%)", format="%.2f%%"),
+    "Kedalaman Bid": st.column_config.NumberColumn("Kedalaman Bid", format="compact", help="Notional bid (IDR) dalam band sinyal dari mid"),
+    "Kedalaman Ask": st.column_config.NumberColumn("Kedalaman Ask", format="compact", help="Notional ask (IDR) dalam band sinyal dari mid"),
+    "Slope Buku": st.column_config.NumberColumn("Slope Buku", format="compact", help="Tambahan kedalaman (IDR) per 1% jarak dari mid"),
+    "Rasio B/S": st.column_config.NumberColumn("Rasio B/S", format="%.2f", help="Kedalaman bid / ask: > 1.2 Demand > Supply, < 0.8 Supply > Demand"),
+    "Sinyal Pasar": st.column_config.TextColumn("Sinyal Pasar"),
+    "Saran Posisi": st.column_config.TextColumn("Saran Posisi"),
+    "Spike (%)": st.column_config.NumberColumn("Spike (%)", format="%.2f%%"),
+}
 
-# === run_auto_scan_scheduler ===
-def run_auto_scan_scheduler(available_pairs):
-    schedule.every(1).hours.do(auto_scan_all_pairs_job, available_pairs)
-    logger.info("Auto-scan semua pair diatur untuk berjalan setiap jam.")
-    while True:
-        schedule.run_pending()
-        time.sleep(30)
+def render_fast_market_table(df_market):
+    """Tabel bertipe tanpa Styler; filter/sort/paging dilakukan di server."""
+    fast_df = build_fast_market_frame(df_market)
+
+    col_search, col_signal, col_sort, col_order, col_size = st.columns([2, 3, 2, 1, 1])
+    search = col_search.text_input("Cari pair", key="market_search")
+    signals = col_signal.multiselect("Filter sinyal", SIGNAL_ORDER, key="market_signal_filter")
+    sort_by = col_sort.selectbox("Urutkan", SORTABLE_COLUMNS, key="market_sort_by")
+    ascending = col_order.toggle("Naik", value=False, key="market_sort_asc")
+    page_size = col_size.selectbox("Baris", [25, 50, 100], index=1, key="market_page_size")
+
+    page = st.session_state.get("market_page", 1)
+    page_df, total_rows, total_pages = query_market_table(
+        fast_df, search=search, signals=signals, sort_by=sort_by,
+        ascending=ascending, page=page, page_size=page_size
+    )
+    column_config = {**MARKET_COLUMN_CONFIG, **{
+        col: st.column_config.NumberColumn(col, format="%.2f", help="(bid - ask) / (bid + ask) dalam band ini, -1..1")
+        for col in page_df.columns if col.startswith("Imbalance ±")
+    }}
+    st.dataframe(page_df, column_config=column_config, use_container_width=True, height=min(600, 38 + 35 * len(page_df)))
+    # Jaga nomor halaman tetap valid saat filter mengurangi jumlah halaman
+    st.session_state.market_page = min(max(1, int(page)), total_pages)
+    st.number_input(
+        f"Halaman (dari {total_pages}, total {total_rows} pair)",
+        min_value=1, max_value=total_pages, step=1, key="market_page"
+    )
 
 # === TAMPILAN UI ===
 
 # === LOGO DAN JUDUL ===
-APP_LOGO = load_logo()
-if APP_LOGO:
-    buffered = BytesIO()
-    APP_LOGO.save(buffered, format="PNG")
-    base64_logo = base64.b64encode(buffered.getvalue()).decode()
-
+LOGO_THUMB_BYTES, LOGO_DATA_URI = load_logo_assets()
+if LOGO_DATA_URI:
     st.markdown(
         f"""
         <div style="display: flex; align-items: center; margin-bottom: 20px;">
-            <img src="data:image/png;base64,{base64_logo}" width="50" style="margin-right:15px; border-radius: 5px;">
+            <img src="{LOGO_DATA_URI}" width="50" style="margin-right:15px; border-radius: 5px;">
             <h1 style="display:inline; vertical-align: middle;">Read ONE Trade</h1>
         </div>
         """,
@@ -379,16 +495,18 @@ else:
     st.title("Read ONE Trade")
 
 # === SIDEBAR ===
-st.sidebar.image(APP_LOGO, width=120)
+st.sidebar.image(LOGO_THUMB_BYTES, width=120)
 st.sidebar.header("Pengaturan Utama")
 
-available_pairs = load_indodax_pairs()
+available_pairs = cached_pairs()
 if not available_pairs:
     st.error("Gagal mengambil daftar pair dari Indodax API. Aplikasi tidak dapat melanjutkan.")
     logger.error("Gagal memuat daftar pair Indodax.")
+    finish_profile_session()
     st.stop()
 
-selected_pair = st.sidebar.selectbox("🎯 Pilih Pair", available_pairs, index=available_pairs.index('btcidr') if 'btcidr' in available_pairs else 0)
+DEFAULT_PAIR = pair_registry.canonical("btcidr", available_pairs[0])
+selected_pair = st.sidebar.selectbox("🎯 Pilih Pair", available_pairs, index=available_pairs.index(DEFAULT_PAIR) if DEFAULT_PAIR in available_pairs else 0)
 
 # === Sidebar Pengaturan API & Telegram ===
 with st.sidebar.expander("⚙️ Pengaturan API & Telegram (tersimpan)", expanded=False):
@@ -430,454 +548,599 @@ with st.sidebar.expander("⏱️ Pengaturan Sinyal Pair Terpilih", expanded=Fals
         st.success("✅ Daftar sinyal yang sudah terkirim berhasil di-reset.")
 
 # === Sidebar Pengaturan Screenshot Periodik ===
-with st.sidebar.expander("🖼️ Pengaturan Screenshot Periodik", expanded=False):
+with st.sidebar.expander("🖼️ Pengaturan Chart Periodik ke Telegram", expanded=False):
     screenshot_interval_map = {
         "Nonaktif": 0, "15 Menit": 900, "30 Menit": 1800, "1 Jam": 3600,
         "2 Jam": 7200, "4 Jam": 14400
     }
     selected_screenshot_interval_label = st.selectbox(
-        "Interval Screenshot ke Telegram",
+        "Interval Kirim Chart ke Telegram",
         options=list(screenshot_interval_map.keys()),
         index=0,
         key="screenshot_interval_label_select"
     )
     st.session_state.screenshot_interval_seconds = screenshot_interval_map[selected_screenshot_interval_label]
 
+# === Sidebar Monitoring Rate Limit Indodax ===
+@st.fragment(run_every=PANEL_REFRESH["monitoring"])
+def render_monitoring_panel():
+    rate_stats = get_rate_stats()
+    st.caption(
+        f"Konkurensi: {rate_stats['concurrency']['in_flight']}/{rate_stats['concurrency']['concurrency_limit']} | "
+        f"Antrean: {rate_stats['concurrency']['waiting']} | "
+        f"Error: {rate_stats['concurrency']['error_rate']:.0%} | "
+        f"Latensi: {rate_stats['concurrency']['avg_latency']:.2f}s"
+    )
+    st.dataframe(pd.DataFrame(rate_stats['endpoints']).T, use_container_width=True)
+    breaker_stats = pair_breaker.snapshot()
+    outbox_stats = TELEGRAM_OUTBOX.stats()
+    st.caption(
+        f"Outbox Telegram: {outbox_stats['pending']} tertunda ({outbox_stats['retrying']} retry) | "
+        f"terkirim {outbox_stats['sent']} | dibuang {outbox_stats['dropped']} | "
+        f"file_id tersimpan {outbox_stats['cached_file_ids']}"
+    )
+    st.caption(f"Pair diblokir circuit breaker: {len(breaker_stats)} | Negative cache: {len(negative_cache)}")
+    if MARKET_STREAM is not None:
+        stream_stats = MARKET_STREAM.state.stats()
+        status = "🟢 live" if stream_stats["live"] else ("🟡 basi" if stream_stats["connected"] else "🔴 putus (polling)")
+        st.caption(
+            f"Stream WebSocket: {status} | pesan {stream_stats['messages']} | gap {stream_stats['gaps']} | "
+            f"reconnect {stream_stats['reconnects']} | ticker {stream_stats['tickers']} pair"
+        )
+    if breaker_stats:
+        st.dataframe(pd.DataFrame(breaker_stats).T, use_container_width=True)
+
+with st.sidebar.expander("🚦 Monitoring Rate Limit API", expanded=False):
+    render_monitoring_panel()
+
+# === Sidebar Performa (latensi per stage) ===
+@st.fragment(run_every=PANEL_REFRESH["monitoring"])
+def render_performance_panel():
+    cache_stats = FRAME_CACHE.stats()
+    st.caption(
+        f"🧠 Cache frame: {cache_stats['entries']} entri, {cache_stats['bytes'] / 2**20:.1f}/"
+        f"{cache_stats['max_bytes'] / 2**20:.0f} MB | hit rate {cache_stats['hit_rate']:.0%} "
+        f"({cache_stats['hits']} hit, {cache_stats['misses']} miss) | "
+        f"{cache_stats['invalidations']} candle baru, {cache_stats['evictions']} evict"
+    )
+    if SHARED_CACHE is not None:
+        shared_stats = SHARED_CACHE.stats()
+        st.caption(
+            f"🔗 Shared cache ({shared_stats['directory']}): {shared_stats['segments']} segmen | "
+            f"{shared_stats['hits']} dibaca, {shared_stats['published']} dipublikasikan proses ini, "
+            f"{shared_stats['waited']} menunggu penulis lain, {shared_stats['fallbacks']} ambil sendiri"
+        )
+    detail = st.toggle("Rinci per pair/timeframe", key="perf_detail")
+    group_by = ("stage", "endpoint", "panel", "pair", "tf") if detail else ("stage", "endpoint", "panel")
+    rows = metrics.snapshot(group_by=group_by)
+    if not rows:
+        st.caption("Belum ada data latensi.")
+        return
+    perf_df = pd.DataFrame(rows).set_index(list(group_by))
+    st.dataframe(perf_df, use_container_width=True)
+    st.download_button(
+        "⬇️ Ekspor Prometheus", metrics.to_prometheus(), file_name="metrics.prom",
+        mime="text/plain", key="perf_export"
+    )
+    if st.button("🧹 Reset metrik", key="perf_reset"):
+        metrics.reset()
+
+with st.sidebar.expander("⏱️ Performa", expanded=False):
+    render_performance_panel()
+
+# === Sidebar Profiling (admin) ===
+def render_profile_summary(result, key_prefix):
+    st.caption(
+        f"{result['label']} {result['pair']} {result['tf']} @ {result['timestamp']} | "
+        f"{result['elapsed']:.2f}s | {result['samples']} sampel stack"
+    )
+    sort_by = st.radio("Urutkan", ["cumtime", "tottime"], horizontal=True, key=f"{key_prefix}_sort")
+    st.dataframe(pd.DataFrame(result[f"top_{sort_by}"]), use_container_width=True, hide_index=True)
+    for path, label in ((result["pstats_path"], "⬇️ pstats"), (result["folded_path"], "⬇️ flamegraph (folded)")):
+        if path and os.path.exists(path):
+            with open(path, "rb") as f:
+                st.download_button(label, f.read(), file_name=os.path.basename(path), key=f"{key_prefix}_{path}")
+
+if APP_CONFIG["profiling_admin"]:
+    with st.sidebar.expander("🔬 Profiling", expanded=False):
+        st.caption("Profil satu rerun penuh (cProfile + sampling stack). Bisa juga lewat URL `?profile=1`.")
+        if st.button("Profil rerun berikutnya", key="profile_next_button"):
+            st.session_state.profile_next_run = True
+            finish_profile_session()
+            st.rerun()
+        if st.session_state.get("last_profile"):
+            render_profile_summary(st.session_state.last_profile, "sidebar_profile")
+        saved_profiles = list_profiles()
+        if saved_profiles:
+            st.caption(f"{len(saved_profiles)} artefak terbaru di data/profiles/")
+
 st.sidebar.info(f"Versi Aplikasi: 1.0.0 | Terakhir update: {datetime.now().strftime('%Y-%m-%d')}")
 
 # === NOTIFIKASI STARTUP & INISIALISASI THREAD ===
 if not st.session_state.startup_notified:
     if TELEGRAM_TOKEN and TELEGRAM_CHAT_ID:
-        send_telegram_message("✅ Sistem Read ONE Trade aktif dan berjalan Lancar!", TELEGRAM_TOKEN, TELEGRAM_CHAT_ID)
-        take_and_send_screenshot(caption="Tampilan Awal UI Aktif")
+        TELEGRAM_OUTBOX.enqueue_message("✅ Sistem Read ONE Trade aktif dan berjalan Lancar!", TELEGRAM_CHAT_ID)
+        send_chart_snapshot(selected_pair, caption="Tampilan Awal UI Aktif")
     st.session_state.startup_notified = True
 
 if 'screenshot_thread' not in st.session_state and st.session_state.screenshot_interval_seconds > 0:
     screenshot_thread = threading.Thread(
-        target=run_periodic_screenshot_scheduler,
-        args=(st.session_state.screenshot_interval_seconds,),
+        target=run_periodic_chart_scheduler,
+        args=(st.session_state.screenshot_interval_seconds, selected_pair),
         daemon=True
     )
     screenshot_thread.start()
     st.session_state.screenshot_thread = screenshot_thread
-    logger.info("Thread untuk screenshot periodik dimulai.")
+    logger.info("Thread untuk chart periodik dimulai.")
 
 if not st.session_state.auto_scan_started:
-    auto_scan_thread = threading.Thread(target=run_auto_scan_scheduler, args=(available_pairs,), daemon=True)
+    auto_scan_thread = threading.Thread(
+        target=run_auto_scan_scheduler, args=(available_pairs, TELEGRAM_TOKEN, TELEGRAM_CHAT_ID),
+        kwargs={
+            "workers": APP_CONFIG["indicator_workers"],
+            "screen": screen_thresholds(APP_CONFIG) if APP_CONFIG["scan_screening"] else None,
+        },
+        daemon=True
+    )
     auto_scan_thread.start()
     st.session_state.auto_scan_started = True
     logger.info("Thread untuk auto-scan semua pair dimulai.")
 
 # === KONTEN UTAMA ===
+# Setiap panel adalah fragment dengan jadwal refresh & data sendiri; interaksi
+# widget di dalam satu panel hanya me-rerun panel tersebut.
 st.subheader(f"Analisis Pair: {selected_pair.upper()}")
 
 # === INFORMASI PAIR YANG DIPILIN SAAT INI ==================================================================
-with st.expander("📊 Informasi Pair Saat Ini", expanded=True):
-    try:
-        summary_data = get_indodax_summary(selected_pair)
-        coin_symbol = selected_pair.split("_")[0]
-        cmc_info = get_coinmarketcap_info(coin_symbol)
+@st.fragment(run_every=PANEL_REFRESH["pair_info"])
+@metrics.timer("render", panel="pair_info")
+def render_selected_pair_info(selected_pair):
+    with st.expander("📊 Informasi Pair Saat Ini", expanded=True):
+        try:
+            summary_data = live_summary(selected_pair)
+            coin_symbol = pair_registry.base_of(selected_pair)
+            cmc_info = cached_cmc_info(coin_symbol) or {}
 
-        if summary_data:
-            price_now = summary_data.get('last')
-            price_low_24h = summary_data.get('low', 0)
-            price_high_24h = summary_data.get('high', 0)
-            raw_open = summary_data.get('open', 0)
+            if summary_data:
+                price_now = summary_data.get('last')
+                price_low_24h = summary_data.get('low', 0)
+                price_high_24h = summary_data.get('high', 0)
+                raw_open = summary_data.get('open', 0)
 
-            # Gunakan harga open valid, fallback ke low atau last jika open tidak tersedia
-            price_open_24h = raw_open if raw_open > 0 else price_low_24h or price_now
+                # Gunakan harga open valid, fallback ke low atau last jika open tidak tersedia
+                price_open_24h = raw_open if raw_open > 0 else price_low_24h or price_now
 
-            volume_idr = summary_data.get('vol_idr', 0)
-            volume_token = volume_idr / price_now if price_now else 0
+                volume_idr = summary_data.get('vol_idr', 0)
+                volume_token = volume_idr / price_now if price_now else 0
 
-            if not price_now:
-                st.warning(f"Ups! Harga saat ini untuk {selected_pair.upper()} belum tersedia.")
-                st.stop()
+                if not price_now:
+                    st.warning(f"Ups! Harga saat ini untuk {selected_pair.upper()} belum tersedia.")
+                    return
 
-            # Hitung ROI persentase yang benar, baik untuk kenaikan maupun penurunan harga
-            if price_open_24h and price_open_24h > 0:
-                roi_percent = ((price_now - price_open_24h) / price_open_24h) * 100
-            else:
-                roi_percent = 0  # fallback jika open invalid atau 0
-
-            delta_str = f"{roi_percent:+.2f} %"
-            color = "#2ecc71" if roi_percent > 0 else "#e74c3c"
-
-            # CMC Info
-            logo = cmc_info.get('logo', '')
-            rank = cmc_info.get('rank', '-')
-            platform = cmc_info.get('platform', '-')
-            launch_year = cmc_info.get('launch_year', '-')
-            total_supply = f"{int(cmc_info.get('total_supply', 0)):,}"
-            circ_supply = f"{int(cmc_info.get('circulating_supply', 0)):,}"
-            slug = cmc_info.get('slug', '')
-            cmc_url = f"https://coinmarketcap.com/currencies/{slug}/" if slug else "#"
-
-            # Warna badge rank
-            badge_color = "#f1c40f" if rank != '-' and int(rank) <= 10 else "#bdc3c7"
-            if rank != '-' and 10 < int(rank) <= 50:
-                badge_color = "#95a5a6"
-            elif rank != '-' and 50 < int(rank) <= 100:
-                badge_color = "#cd7f32"
-
-            # Format tampilan
-            price_now_formatted = format_price_idr_int(price_now)
-            price_high_24h_formatted = format_price_idr_int(price_high_24h)
-            price_low_24h_formatted = format_price_idr_int(price_low_24h)
-            price_open_24h_formatted = format_price_idr_int(price_open_24h)
-
-            col1, col2 = st.columns([1, 2])
+                # Hitung ROI persentase yang benar, baik untuk kenaikan maupun penurunan harga
+                if price_open_24h and price_open_24h > 0:
+                    roi_percent = ((price_now - price_open_24h) / price_open_24h) * 100
+                else:
+                    roi_percent = 0  # fallback jika open invalid atau 0
+
+                delta_str = f"{roi_percent:+.2f} %"
+                color = "#2ecc71" if roi_percent > 0 else "#e74c3c"
+
+                # CMC Info
+                logo = cmc_info.get('logo', '')
+                rank = cmc_info.get('rank', '-')
+                platform = cmc_info.get('platform', '-')
+                launch_year = cmc_info.get('launch_year', '-')
+                total_supply = f"{int(cmc_info.get('total_supply', 0)):,}"
+                circ_supply = f"{int(cmc_info.get('circulating_supply', 0)):,}"
+                slug = cmc_info.get('slug', '')
+                cmc_url = f"https://coinmarketcap.com/currencies/{slug}/" if slug else "#"
+
+                # Warna badge rank
+                badge_color = "#f1c40f" if rank != '-' and int(rank) <= 10 else "#bdc3c7"
+                if rank != '-' and 10 < int(rank) <= 50:
+                    badge_color = "#95a5a6"
+                elif rank != '-' and 50 < int(rank) <= 100:
+                    badge_color = "#cd7f32"
+
+                # Format tampilan
+                price_now_formatted = format_price_idr_int(price_now)
+                price_high_24h_formatted = format_price_idr_int(price_high_24h)
+                price_low_24h_formatted = format_price_idr_int(price_low_24h)
+                price_open_24h_formatted = format_price_idr_int(price_open_24h)
+
+                col1, col2 = st.columns([1, 2])
+
+                with col1:
+                    st.markdown(f"""
+                        <div style="font-size:clamp(14px, 1.5vw, 16px); color:#e74c3c;">Indodax Exchange</div>
+                        <div style="display:flex; align-items:center;">
+                            {'<img src="' + logo + '" width="30" style="margin-right:8px;">' if logo else ''}
+                            <div style="font-size:clamp(20px, 2.5vw, 26px); font-weight:bold;">{selected_pair.upper()}</div>
+                        </div>
+                        <div style="font-size:clamp(28px, 3.5vw, 36px); font-weight:bold; color:{color};">{price_now_formatted}</div>
+                        <div style="font-size:clamp(14px, 2vw, 18px); color:{color}; margin-top:5px;">{delta_str}</div>
+                        <div style="font-size:clamp(12px, 1.5vw, 14px); margin-top:10px;">
+                            <strong>Open 24H:</strong> {price_open_24h_formatted}<br>
+                            <strong>High:</strong> {price_high_24h_formatted}<br>
+                            <strong>Low:</strong> {price_low_24h_formatted}<br>
+                            <strong>VOL 24H (IDR):</strong> {format_volume(volume_idr)}<br>
+                            <strong>VOL 24H ({coin_symbol.upper()}):</strong> {format_token_amount(volume_token)}
+                        </div>
+                    """, unsafe_allow_html=True)
 
-            with col1:
-                st.markdown(f"""
-                    <div style="font-size:clamp(14px, 1.5vw, 16px); color:#e74c3c;">Indodax Exchange</div>
-                    <div style="display:flex; align-items:center;">
-                        {'<img src="' + logo + '" width="30" style="margin-right:8px;">' if logo else ''}
-                        <div style="font-size:clamp(20px, 2.5vw, 26px); font-weight:bold;">{selected_pair.upper()}</div>
-                    </div>
-                    <div style="font-size:clamp(28px, 3.5vw, 36px); font-weight:bold; color:{color};">{price_now_formatted}</div>
-                    <div style="font-size:clamp(14px, 2vw, 18px); color:{color}; margin-top:5px;">{delta_str}</div>
-                    <div style="font-size:clamp(12px, 1.5vw, 14px); margin-top:10px;">
-                        <strong>Open 24H:</strong> {price_open_24h_formatted}<br>
-                        <strong>High:</strong> {price_high_24h_formatted}<br>
-                        <strong>Low:</strong> {price_low_24h_formatted}<br>
-                        <strong>VOL 24H (IDR):</strong> {format_volume(volume_idr)}<br>
-                        <strong>VOL 24H ({coin_symbol.upper()}):</strong> {format_token_amount(volume_token)}
-                    </div>
-                """, unsafe_allow_html=True)
+                with col2:
+                    st.markdown(f"""
+                        <div style="font-size:clamp(12px, 1.5vw, 14px); line-height:1.8;">
+                            <table style="width:100%;">
+                                <tr><td style="text-align:right;">- Tahun launching :</td><td style="padding-left:10px;">{launch_year}</td></tr>
+                                <tr><td style="text-align:right;">- Rank :</td>
+                                    <td style="padding-left:10px;">
+                                        <span style="background-color:{badge_color}; color:white; padding:2px 6px; border-radius:5px;">{rank}</span>
+                                    </td>
+                                </tr>
+                                <tr><td style="text-align:right;">- Blockchain :</td><td style="padding-left:10px;">{platform}</td></tr>
+                                <tr><td style="text-align:right;">- All-time high :</td><td style="padding-left:10px;">-</td></tr>
+                                <tr><td style="text-align:right;">- Total Supply :</td><td style="padding-left:10px;">{total_supply}</td></tr>
+                                <tr><td style="text-align:right;">- Circulating Supply :</td><td style="padding-left:10px;">{circ_supply}</td></tr>
+                            </table>
+                            <br>
+                            <a href="{cmc_url}" target="_blank" style="text-decoration:none;">
+                                <button style="padding:5px 10px; border:none; border-radius:5px; background:#3498db; color:white; cursor:pointer;">
+                                    🔗 Lihat di CoinMarketCap
+                                </button>
+                            </a>
+                        </div>
+                    """, unsafe_allow_html=True)
 
-            with col2:
-                st.markdown(f"""
-                    <div style="font-size:clamp(12px, 1.5vw, 14px); line-height:1.8;">
-                        <table style="width:100%;">
-                            <tr><td style="text-align:right;">- Tahun launching :</td><td style="padding-left:10px;">{launch_year}</td></tr>
-                            <tr><td style="text-align:right;">- Rank :</td>
-                                <td style="padding-left:10px;">
-                                    <span style="background-color:{badge_color}; color:white; padding:2px 6px; border-radius:5px;">{rank}</span>
-                                </td>
-                            </tr>
-                            <tr><td style="text-align:right;">- Blockchain :</td><td style="padding-left:10px;">{platform}</td></tr>
-                            <tr><td style="text-align:right;">- All-time high :</td><td style="padding-left:10px;">-</td></tr>
-                            <tr><td style="text-align:right;">- Total Supply :</td><td style="padding-left:10px;">{total_supply}</td></tr>
-                            <tr><td style="text-align:right;">- Circulating Supply :</td><td style="padding-left:10px;">{circ_supply}</td></tr>
-                        </table>
-                        <br>
-                        <a href="{cmc_url}" target="_blank" style="text-decoration:none;">
-                            <button style="padding:5px 10px; border:none; border-radius:5px; background:#3498db; color:white; cursor:pointer;">
-                                🔗 Lihat di CoinMarketCap
-                            </button>
-                        </a>
-                    </div>
-                """, unsafe_allow_html=True)
+            else:
+                st.warning(f"Tidak dapat mengambil informasi untuk {selected_pair}.")
 
-        else:
-            st.warning(f"Tidak dapat mengambil informasi untuk {selected_pair}.")
+        except Exception as e:
+            st.error(f"Terjadi kesalahan: {e}")
 
-    except Exception as e:
-        st.error(f"Terjadi kesalahan: {e}")
+render_selected_pair_info(selected_pair)
 #============BATAS KODE ========================================================================================================
 #=====TIMER REFRES DATA DAN TAMPILAN SLIDE======================================================================================
-# Daftar pair ticker
-ticker_pairs = ["btc_idr", "eth_idr", "usdt_idr"]
-
-# 🔁 Auto-refresh setiap 30 detik
-count = st_autorefresh(interval=60 * 6000, limit=None, key="datarefresh")
-current_index = count % len(ticker_pairs)
-selected_pair = ticker_pairs[current_index]
-
-# 🕓 Waktu terakhir refresh (biar bisa ditampilkan di UI)
+# 🕓 Waktu terakhir refresh penuh (panel fragment me-refresh dirinya sendiri)
 if 'last_refresh' not in st.session_state:
     st.session_state.last_refresh = time.strftime('%H:%M:%S')
 
-# Tombol manual refresh
+# Tombol manual refresh: buang cache data lalu rerun penuh
 if st.button("🔄 Refresh Sekarang"):
+    st.cache_data.clear()
+    FRAME_CACHE.clear()
     st.session_state.last_refresh = time.strftime('%H:%M:%S')
-    st.rerun()  # Ganti dengan st.experimental_rerun() kalau masih pakai versi lama
+    finish_profile_session(selected_pair, st.session_state.signal_interval_tf)
+    st.rerun()
 
 # Tampilkan info waktu refresh terakhir
 st.markdown(f"<div style='font-size:13px; color:gray;'>⏱️ Terakhir refresh: {st.session_state.last_refresh}</div>", unsafe_allow_html=True)
 #==========================================================BATAS KODE =====================================================================
 # === INFORMASI PAIR SLIDE ================================================================================================================
-with st.expander("📊 HARGA TERKINI", expanded=True):
-    selected_pairs = ["btc_idr", "eth_idr", "usdt_idr"]  # Ubah sesuai kebutuhan kamu
-
-    def format_volume(vol):
-        if vol >= 1_000_000_000:
-            return f"{vol/1_000_000_000:.2f} Bn"
-        elif vol >= 1_000_000:
-            return f"{vol/1_000_000:.2f} M"
-        elif vol >= 1_000:
-            return f"{vol/1_000:.2f} K"
-        return f"{vol:,.0f}"
-
-    def format_token_amount(amount):
-        if amount >= 1_000_000:
-            return f"{amount/1_000_000:.2f} M"
-        elif amount >= 1_000:
-            return f"{amount/1_000:.2f} K"
-        return f"{amount:.2f}"
-
-    cols = st.columns(len(selected_pairs))
-
-    for i, selected_pair in enumerate(selected_pairs):
-        try:
-            with cols[i]:
-                summary_data = get_indodax_summary(selected_pair)
-                coin_symbol = selected_pair.split("_")[0]
-                cmc_info = get_coinmarketcap_info(coin_symbol)
-
-                if summary_data:
-                    price_now = summary_data.get('last')
-                    price_low_24h = summary_data.get('low', 0)
-                    price_high_24h = summary_data.get('high', 0)
-                    raw_open = summary_data.get('open', 0)
-
-                    price_open_24h = raw_open if raw_open > 0 else price_low_24h or price_now
-
-                    volume_idr = summary_data.get('vol_idr', 0)
-                    volume_token = volume_idr / price_now if price_now else 0
-
-                    if not price_now:
-                        st.warning(f"Ups! Harga saat ini untuk {selected_pair.upper()} belum tersedia.")
-                        continue
-
-                    roi_percent = ((price_now - price_open_24h) / price_open_24h) * 100 if price_open_24h else 0
-                    delta_str = f"{roi_percent:+.2f} %"
-                    color = "#00ff88" if roi_percent > 0 else "#e74c3c"
-
-                    logo = cmc_info.get('logo', '')
-                    slug = cmc_info.get('slug', '')
-                    cmc_url = f"https://coinmarketcap.com/currencies/{slug}/" if slug else "#"
-
-                    price_now_formatted = format_price_idr_int(price_now)
-                    price_high_24h_formatted = format_price_idr_int(price_high_24h)
-                    price_low_24h_formatted = format_price_idr_int(price_low_24h)
-                    price_open_24h_formatted = format_price_idr_int(price_open_24h)
-
-                    st.markdown(f"""
-                        <div style="border:2px solid white; border-radius:12px; padding:15px; background-color:#000000; min-height:320px;">
-                            <div style="font-size:14px; color:#e74c3c;">Indodax Exchange</div>
-                            <div style="display:flex; align-items:center; margin-top:4px;">
-                                {'<img src="' + logo + '" width="24" style="margin-right:6px;">' if logo else ''}
-                                <span style="font-size:20px; font-weight:bold;">{selected_pair.upper()}</span>
-                            </div>
-                            <div style="font-size:28px; font-weight:bold; color:{color}; margin-top:6px;">{price_now_formatted}</div>
-                            <div style="font-size:16px; color:{color};">{delta_str}</div>
-                            <div style="font-size:12px; color:#ccc; margin-top:10px; line-height:1.6;">
-                                <strong>Open 24H:</strong> {price_open_24h_formatted}<br>
-                                <strong>High:</strong> {price_high_24h_formatted}<br>
-                                <strong>Low:</strong> {price_low_24h_formatted}<br>
-                                <strong>VOL 24H (IDR):</strong> {format_volume(volume_idr)}<br>
-                                <strong>VOL 24H ({coin_symbol.upper()}):</strong> {format_token_amount(volume_token)}
+SLIDE_PAIRS = [pair_registry.canonical(p, p) for p in ("btc_idr", "eth_idr", "usdt_idr")]  # Ubah sesuai kebutuhan kamu (alias apa pun)
+
+@st.fragment(run_every=PANEL_REFRESH["price_slide"])
+@metrics.timer("render", panel="price_slide")
+def render_price_slide():
+    with st.expander("📊 HARGA TERKINI", expanded=True):
+
+        def format_volume(vol):
+            if vol >= 1_000_000_000:
+                return f"{vol/1_000_000_000:.2f} Bn"
+            elif vol >= 1_000_000:
+                return f"{vol/1_000_000:.2f} M"
+            elif vol >= 1_000:
+                return f"{vol/1_000:.2f} K"
+            return f"{vol:,.0f}"
+
+        def format_token_amount(amount):
+            if amount >= 1_000_000:
+                return f"{amount/1_000_000:.2f} M"
+            elif amount >= 1_000:
+                return f"{amount/1_000:.2f} K"
+            return f"{amount:.2f}"
+
+        cols = st.columns(len(SLIDE_PAIRS))
+
+        for i, slide_pair in enumerate(SLIDE_PAIRS):
+            try:
+                with cols[i]:
+                    summary_data = live_summary(slide_pair)
+                    coin_symbol = pair_registry.base_of(slide_pair)
+                    cmc_info = cached_cmc_info(coin_symbol) or {}
+
+                    if summary_data:
+                        price_now = summary_data.get('last')
+                        price_low_24h = summary_data.get('low', 0)
+                        price_high_24h = summary_data.get('high', 0)
+                        raw_open = summary_data.get('open', 0)
+
+                        price_open_24h = raw_open if raw_open > 0 else price_low_24h or price_now
+
+                        volume_idr = summary_data.get('vol_idr', 0)
+                        volume_token = volume_idr / price_now if price_now else 0
+
+                        if not price_now:
+                            st.warning(f"Ups! Harga saat ini untuk {slide_pair.upper()} belum tersedia.")
+                            continue
+
+                        roi_percent = ((price_now - price_open_24h) / price_open_24h) * 100 if price_open_24h else 0
+                        delta_str = f"{roi_percent:+.2f} %"
+                        color = "#00ff88" if roi_percent > 0 else "#e74c3c"
+
+                        logo = cmc_info.get('logo', '')
+                        slug = cmc_info.get('slug', '')
+                        cmc_url = f"https://coinmarketcap.com/currencies/{slug}/" if slug else "#"
+
+                        price_now_formatted = format_price_idr_int(price_now)
+                        price_high_24h_formatted = format_price_idr_int(price_high_24h)
+                        price_low_24h_formatted = format_price_idr_int(price_low_24h)
+                        price_open_24h_formatted = format_price_idr_int(price_open_24h)
+
+                        st.markdown(f"""
+                            <div style="border:2px solid white; border-radius:12px; padding:15px; background-color:#000000; min-height:320px;">
+                                <div style="font-size:14px; color:#e74c3c;">Indodax Exchange</div>
+                                <div style="display:flex; align-items:center; margin-top:4px;">
+                                    {'<img src="' + logo + '" width="24" style="margin-right:6px;">' if logo else ''}
+                                    <span style="font-size:20px; font-weight:bold;">{slide_pair.upper()}</span>
+                                </div>
+                                <div style="font-size:28px; font-weight:bold; color:{color}; margin-top:6px;">{price_now_formatted}</div>
+                                <div style="font-size:16px; color:{color};">{delta_str}</div>
+                                <div style="font-size:12px; color:#ccc; margin-top:10px; line-height:1.6;">
+                                    <strong>Open 24H:</strong> {price_open_24h_formatted}<br>
+                                    <strong>High:</strong> {price_high_24h_formatted}<br>
+                                    <strong>Low:</strong> {price_low_24h_formatted}<br>
+                                    <strong>VOL 24H (IDR):</strong> {format_volume(volume_idr)}<br>
+                                    <strong>VOL 24H ({coin_symbol.upper()}):</strong> {format_token_amount(volume_token)}
+                                </div>
                             </div>
-                        </div>
-                    """, unsafe_allow_html=True)
+                        """, unsafe_allow_html=True)
 
-                else:
-                    st.warning(f"Tidak dapat mengambil info untuk {selected_pair.upper()}.")
-        except Exception as e:
-            st.error(f"Kesalahan saat menampilkan {selected_pair.upper()}: {e}")
+                    else:
+                        st.warning(f"Tidak dapat mengambil info untuk {slide_pair.upper()}.")
+            except Exception as e:
+                st.error(f"Kesalahan saat menampilkan {slide_pair.upper()}: {e}")
+
+render_price_slide()
 # ===============================================================BATAS KODE =====================================================================
-# === Memuat data candlestick ===
-main_placeholder = st.empty()
-with main_placeholder.container():
+@st.fragment(run_every=PANEL_REFRESH["candles"])
+@metrics.timer("render", panel="candles")
+def render_candle_panel(selected_pair, tf, tf_display):
+    import plotly.graph_objects as go
+
+    # === Memuat data candlestick ===
     with st.spinner(f'Memuat data candlestick & indikator untuk {selected_pair.upper()}...'):
-        candle_df = get_candlestick_data(selected_pair, tf=st.session_state.signal_interval_tf)
+        candle_df, candle_df_with_indicators = load_candles(selected_pair, tf)
         if candle_df.empty:
-            st.warning(f"Tidak dapat mengambil data candlestick untuk {selected_pair} dengan interval {st.session_state.signal_interval_display}.")
-        else:
-            candle_df_with_indicators = apply_indicators(candle_df.copy())
-
-# === CANDLESTICK CHART ===
-if not candle_df.empty and 'candle_df_with_indicators' in locals():
-    with st.expander(f"📈 Candlestick Chart: {selected_pair.upper()} ({st.session_state.signal_interval_display})", expanded=True):
-        chart_size_options = {"Kecil": 300, "Sedang": 450, "Besar": 600}
-        selected_chart_size_label = st.selectbox("Pilih Ukuran Chart", list(chart_size_options.keys()), index=1)
-        chart_height = chart_size_options[selected_chart_size_label]
-
-        fig_candle = go.Figure()
-        fig_candle.add_trace(go.Candlestick(
-            x=candle_df_with_indicators.index,
-            open=candle_df_with_indicators['open'], high=candle_df_with_indicators['high'],
-            low=candle_df_with_indicators['low'], close=candle_df_with_indicators['close'],
-            name='Candlestick', increasing_line_color='green', decreasing_line_color='red'
-        ))
-        fig_candle.add_trace(go.Bar(
-            x=candle_df_with_indicators.index, y=candle_df_with_indicators['volume'],
-            name='Volume', marker_color='rgba(0,100,255,0.3)', yaxis='y2'
-        ))
-        if 'sma_50' in candle_df_with_indicators.columns:
-            fig_candle.add_trace(go.Scatter(
-                x=candle_df_with_indicators.index, y=candle_df_with_indicators['sma_50'],
-                mode='lines', name='SMA 50', line=dict(color='orange')
+            st.warning(f"Tidak dapat mengambil data candlestick untuk {selected_pair} dengan interval {tf_display}.")
+
+    # === CANDLESTICK CHART ===
+    if not candle_df.empty:
+        with st.expander(f"📈 Candlestick Chart: {selected_pair.upper()} ({tf_display})", expanded=True):
+            chart_size_options = {"Kecil": 300, "Sedang": 450, "Besar": 600}
+            range_options = {"120 candle": 120, "500 candle": 500, "Semua": None}
+            col_size, col_range = st.columns(2)
+            selected_chart_size_label = col_size.selectbox("Pilih Ukuran Chart", list(chart_size_options.keys()), index=1, key="chart_size_select")
+            selected_range_label = col_range.selectbox("Rentang", list(range_options.keys()), index=1, key="chart_range_select")
+            chart_height = chart_size_options[selected_chart_size_label]
+
+            # Indikator dihitung pada resolusi penuh, baru dipotong & di-decimate untuk dikirim ke browser
+            chart_df, chart_info = prepare_chart_data(candle_df_with_indicators, visible_candles=range_options[selected_range_label])
+            x_values = chart_df['date'] if 'date' in chart_df.columns else chart_df.index
+
+            fig_candle = go.Figure()
+            fig_candle.add_trace(go.Candlestick(
+                x=x_values,
+                open=chart_df['open'], high=chart_df['high'],
+                low=chart_df['low'], close=chart_df['close'],
+                name='Candlestick', increasing_line_color='green', decreasing_line_color='red'
             ))
-        if 'bb_upper' in candle_df_with_indicators.columns and 'bb_lower' in candle_df_with_indicators.columns:
-             fig_candle.add_trace(go.Scatter(x=candle_df_with_indicators.index, y=candle_df_with_indicators['bb_upper'], mode='lines', name='BB Upper', line=dict(color='rgba(173,216,230,0.5)', dash='dot')))
-             fig_candle.add_trace(go.Scatter(x=candle_df_with_indicators.index, y=candle_df_with_indicators['bb_lower'], mode='lines', name='BB Lower', line=dict(color='rgba(173,216,230,0.5)', dash='dot'), fill='tonexty', fillcolor='rgba(173,216,230,0.1)'))
-
-        fig_candle.update_layout(
-            title=f"Candlestick & Volume: {selected_pair.upper()} ({st.session_state.signal_interval_display})",
-            xaxis_rangeslider_visible=False,
-            template="plotly_dark",
-            height=chart_height,
-            xaxis_title="Waktu",
-            yaxis_title="Harga",
-            yaxis=dict(domain=[0.3, 1]),
-            yaxis2=dict(domain=[0, 0.25], title="Volume", showgrid=False),
-            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
-            plot_bgcolor='rgba(17,17,17,0.9)', paper_bgcolor='rgba(0,0,0,0)',
-        )
-        st.plotly_chart(fig_candle, use_container_width=True)
+            if {'taker_buy_volume', 'taker_sell_volume'}.issubset(chart_df.columns):
+                # Volume dipecah per sisi taker (dihitung saat agregasi trades, tanpa fetch tambahan)
+                fig_candle.add_trace(go.Bar(
+                    x=x_values, y=chart_df['taker_buy_volume'],
+                    name='Taker Buy', marker_color='rgba(0,200,100,0.4)', yaxis='y2'
+                ))
+                fig_candle.add_trace(go.Bar(
+                    x=x_values, y=chart_df['taker_sell_volume'],
+                    name='Taker Sell', marker_color='rgba(255,80,80,0.4)', yaxis='y2'
+                ))
+            else:
+                fig_candle.add_trace(go.Bar(
+                    x=x_values, y=chart_df['volume'],
+                    name='Volume', marker_color='rgba(0,100,255,0.3)', yaxis='y2'
+                ))
+            # Garis indikator memakai WebGL (Scattergl); Candlestick/Bar tidak punya varian GL
+            if 'sma_50' in chart_df.columns:
+                fig_candle.add_trace(go.Scattergl(
+                    x=x_values, y=chart_df['sma_50'],
+                    mode='lines', name='SMA 50', line=dict(color='orange')
+                ))
+            if 'vwap' in chart_df.columns:
+                fig_candle.add_trace(go.Scattergl(
+                    x=x_values, y=chart_df['vwap'],
+                    mode='lines', name='VWAP', line=dict(color='violet', width=1), connectgaps=False
+                ))
+            if 'bb_upper' in chart_df.columns and 'bb_lower' in chart_df.columns:
+                 fig_candle.add_trace(go.Scattergl(x=x_values, y=chart_df['bb_upper'], mode='lines', name='BB Upper', line=dict(color='rgba(173,216,230,0.5)', dash='dot')))
+                 fig_candle.add_trace(go.Scattergl(x=x_values, y=chart_df['bb_lower'], mode='lines', name='BB Lower', line=dict(color='rgba(173,216,230,0.5)', dash='dot'), fill='tonexty', fillcolor='rgba(173,216,230,0.1)'))
+
+            fig_candle.update_layout(
+                title=f"Candlestick & Volume: {selected_pair.upper()} ({tf_display})",
+                xaxis_rangeslider_visible=False,
+                template="plotly_dark",
+                height=chart_height,
+                xaxis_title="Waktu",
+                yaxis_title="Harga",
+                yaxis=dict(domain=[0.3, 1]),
+                yaxis2=dict(domain=[0, 0.25], title="Volume", showgrid=False),
+                legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+                barmode='stack',
+                plot_bgcolor='rgba(17,17,17,0.9)', paper_bgcolor='rgba(0,0,0,0)',
+            )
+            st.plotly_chart(fig_candle, use_container_width=True)
+            if chart_info["bucket"] > 1:
+                st.caption(f"⚡ {chart_info['source_points']} candle diringkas menjadi {chart_info['points']} titik "
+                           f"(1 titik = {chart_info['bucket']} candle, payload ±{chart_info['estimated_bytes'] / 1024:.0f} KB).")
+
+    # === SINYAL MACD & VOLUME SPIKE (Pair Terpilih) ===
+    if not candle_df.empty:
+        with st.expander("📈 Sinyal MACD & Volume Spike (Pair Terpilih)", expanded=True):
+            scan_selected_pair_signals(selected_pair, candle_df_with_indicators, live_summary(selected_pair))
+    else:
+        st.info(f"Data candlestick untuk {selected_pair.upper()} tidak tersedia untuk pemindaian sinyal.")
+
+    # === RIWAYAT ALERT (event log, query per pair via index) ===
+    with st.expander(f"🗒️ Riwayat Alert {selected_pair.upper()} (7 hari)", expanded=False):
+        recent_alerts = EVENT_LOG.recent_alerts(selected_pair, days=7, limit=50)
+        if recent_alerts:
+            alerts_df = pd.DataFrame(recent_alerts)
+            alerts_df["Waktu"] = pd.to_datetime(alerts_df["ts"], unit="s", utc=True).dt.tz_convert("Asia/Jakarta").dt.strftime("%Y-%m-%d %H:%M:%S")
+            alerts_df["Sinyal"] = alerts_df["signals"].str.join("; ")
+            st.dataframe(
+                alerts_df[["Waktu", "kind", "tf", "Sinyal"]].rename(columns={"kind": "Jenis", "tf": "TF"}),
+                use_container_width=True, hide_index=True,
+            )
+        else:
+            st.write("Belum ada alert tercatat untuk pair ini.")
 
-# === SINYAL MACD & VOLUME SPIKE (Pair Terpilih) ===
-if not candle_df.empty and 'candle_df_with_indicators' in locals():
-    with st.expander("📈 Sinyal MACD & Volume Spike (Pair Terpilih)", expanded=True):
-        scan_selected_pair_signals(selected_pair, candle_df_with_indicators, summary_data)
-else:
-    st.info(f"Data candlestick untuk {selected_pair.upper()} tidak tersedia untuk pemindaian sinyal.")
 
-# === VISUALISASI TEKNIKAL & SCANNER PAIR LAIN ===
-with st.expander("📉 Visualisasi Teknikal & Scanner Pair Lain", expanded=False):
-    scanner_pair = st.selectbox(
-        "Pilih Pair untuk Analisis Teknikal Cepat",
-        available_pairs,
-        index=available_pairs.index(selected_pair)
-    )
-    if st.button(f"Tampilkan Analisis Teknikal untuk {scanner_pair.upper()}", key="scan_other_pair"):
-        with st.spinner(f"Memuat data & indikator untuk {scanner_pair.upper()}..."):
-            df_chart_scanner = get_candlestick_data(scanner_pair, tf='1H')
-            if df_chart_scanner is not None and not df_chart_scanner.empty:
-                df_chart_scanner_indicators = apply_indicators(df_chart_scanner.copy())
-                plot_technical_charts(df_chart_scanner_indicators, scanner_pair)
-            else:
-                st.warning(f"Tidak dapat memuat data chart untuk {scanner_pair.upper()}.")
+render_candle_panel(selected_pair, st.session_state.signal_interval_tf, st.session_state.signal_interval_display)
 
-# === DETEKSI PASAR GLOBAL ===
-# ----Fungsi Hitung Rasio
-# --- Fungsi pembersih & transformasi awal data ticker ---
-# --- Fungsi untuk memperkaya dataframe dengan logika bisnis ---
-def clean_and_transform_market_data(data_dict):
-    df = pd.DataFrame.from_dict(data_dict, orient='index')
-    df.index.name = 'Pair'
-
-    required_cols = ['last', 'buy', 'sell', 'vol_idr', 'high', 'low']
-    for col in required_cols:
-        if col not in df.columns:
-            logger.warning(f"Kolom '{col}' tidak ditemukan. Ditambahkan dengan nilai default 0.")
-            df[col] = 0
-
-    for col in required_cols:
-        df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-
-    return df
-
-def hitung_rasio_bs(buy, sell):
-    if buy == 0 and sell == 0:
-        return "Seimbang (1.00)"
-    ratio = buy / (sell + 1e-9)
-    if ratio > 1.2:
-        return f"Demand > Supply ({ratio:.2f})"
-    elif ratio < 0.8:
-        return f"Supply > Demand ({ratio:.2f})"
-    else:
-        return f"Seimbang ({ratio:.2f})"
-
-def enrich_market_dataframe(df):
-    df['Harga'] = [format_price(price, pair) for price, pair in zip(df['last'], df.index)]
-    df['Volume IDR (24j)'] = df['vol_idr'].apply(lambda x: f"{x:,.0f} IDR")
-    df['Volume Buy'] = df['buy'].apply(lambda x: f"{x:,.0f}")
-    df['Volume Sell'] = df['sell'].apply(lambda x: f"{x:,.0f}")
-    df['Rasio B/S'] = df.apply(lambda x: hitung_rasio_bs(x['buy'], x['sell']), axis=1)
-    df['Sinyal Pasar'] = df.apply(lambda x: generate_market_signal(x['buy'], x['sell']), axis=1)
-    df['Saran Posisi'] = df['Sinyal Pasar'].apply(get_position_suggestion)
-    df['Spike (%)'] = df.apply(lambda x: ((x['high'] - x['low']) / x['low'] * 100) if x['low'] > 0 else 0, axis=1)
-    df['Spike (%)'] = df['Spike (%)'].apply(lambda x: f"{x:.2f}%")
-    return df
-
-with st.expander("📡 Deteksi Pasar Global", expanded=True):
-    with st.spinner("Memuat data ticker semua pair..."):
-        all_tickers_data = fetch_all_tickers()
-
-    if all_tickers_data:
-        df_market = clean_and_transform_market_data(all_tickers_data)
-        df_market = enrich_market_dataframe(df_market)
-        df_market = df_market.sort_values(by='vol_idr', ascending=False)
-
-        required_cols = ['last', 'buy', 'sell', 'vol_idr', 'high', 'low']
-        for col in required_cols:
-            if col not in df_market.columns:
-                logger.warning(f"Kolom '{col}' tidak ditemukan di data ticker. Ditambahkan dengan nilai default 0.")
-                df_market[col] = 0
-
-        for col in ['last', 'buy', 'sell', 'vol_idr', 'high', 'low']:
-             df_market[col] = pd.to_numeric(df_market[col], errors='coerce').fillna(0)
-
-        df_market['Harga'] = [format_price(price, pair) for price, pair in zip(df_market['last'], df_market.index)]
-        df_market['Volume IDR (24j)'] = df_market['vol_idr'].apply(lambda x: f"{x:,.0f} IDR")
-        df_market['Volume Buy'] = df_market['buy'].apply(lambda x: f"{x:,.0f}")
-        df_market['Volume Sell'] = df_market['sell'].apply(lambda x: f"{x:,.0f}")
-        df_market['Rasio B/S'] = df_market.apply(lambda x: "Demand > Supply" if x['buy'] > x['sell'] else ("Supply > Demand" if x['sell'] > x['buy'] else "Seimbang"), axis=1)
-        df_market['Sinyal Pasar'] = df_market.apply(lambda x: generate_market_signal(x['buy'], x['sell']), axis=1)
-        df_market['Saran Posisi'] = df_market['Sinyal Pasar'].apply(get_position_suggestion)
-
-        df_market['Spike (%)'] = df_market.apply(
-            lambda x: ((x['high'] - x['low']) / x['low'] * 100) if x['low'] > 0 else 0, axis=1
+# === VISUALISASI TEKNIKAL & SCANNER PAIR LAIN ===
+@st.fragment
+@metrics.timer("render", panel="scanner")
+def render_scanner_panel(selected_pair):
+    with st.expander("📉 Visualisasi Teknikal & Scanner Pair Lain", expanded=False):
+        scanner_pair = st.selectbox(
+            "Pilih Pair untuk Analisis Teknikal Cepat",
+            available_pairs,
+            index=available_pairs.index(selected_pair) if selected_pair in available_pairs else 0,
+            key="scanner_pair_select"
         )
-        df_market['Spike (%)'] = df_market['Spike (%)'].apply(lambda x: f"{x:.2f}%")
+        if st.button(f"Tampilkan Analisis Teknikal untuk {scanner_pair.upper()}", key="scan_other_pair"):
+            with st.spinner(f"Memuat data & indikator untuk {scanner_pair.upper()}..."):
+                df_chart_scanner, df_chart_scanner_indicators = load_candles(scanner_pair, '1H')
+                if df_chart_scanner is not None and not df_chart_scanner.empty:
+                    plot_technical_charts(df_chart_scanner_indicators, scanner_pair)
+                else:
+                    st.warning(f"Tidak dapat memuat data chart untuk {scanner_pair.upper()}.")
 
-        df_market = df_market.sort_values(by='vol_idr', ascending=False)
 
-        cols_to_display = ['Harga', 'Volume IDR (24j)', 'Volume Buy', 'Volume Sell', 'Rasio B/S', 'Sinyal Pasar', 'Saran Posisi', 'Spike (%)']
+render_scanner_panel(selected_pair)
 
-        styled_df_market = df_market[cols_to_display].style \
-            .applymap(style_signal_column, subset=['Sinyal Pasar']) \
-            .set_properties(**{'text-align': 'right'}, subset=['Harga', 'Volume IDR (24j)', 'Volume Buy', 'Volume Sell', 'Spike (%)']) \
-            .set_properties(**{'text-align': 'left'}, subset=['Rasio B/S', 'Saran Posisi']) \
-            .set_properties(**{'text-align': 'center'}, subset=['Sinyal Pasar']) \
-            .format({'Harga': '{}', 'Volume Buy': '{}', 'Volume Sell': '{}', 'Spike (%)': '{}'})
-        # --- ----------------------------------------------
+# === DETEKSI PASAR GLOBAL ===
+@st.fragment(run_every=PANEL_REFRESH["market"])
+@metrics.timer("render", panel="market")
+def render_market_overview():
+    with st.expander("📡 Deteksi Pasar Global", expanded=True):
+        with st.spinner("Memuat data ticker semua pair..."):
+            all_tickers_data = cached_all_tickers()
+
+        if all_tickers_data:
+            # Enrichment vektor + memo per snapshot (lihat utils.helpers.enrich_market_dataframe)
+            df_market = clean_and_transform_market_data(all_tickers_data)
+            # Order book pair terlikuid: yang basi diambil ulang di latar belakang, render tidak menunggu
+            depth_pairs = df_market['vol_idr'].nlargest(APP_CONFIG["depth_pairs"]).index.tolist()
+            ORDER_BOOKS.refresh(depth_pairs)
+            depth_df = ORDER_BOOKS.metrics(depth_pairs, bands=APP_CONFIG["depth_bands"])
+            with timed("enrich"):
+                df_market = enrich_market_dataframe(df_market, depth_df)
+            df_market = df_market.sort_values(by='vol_idr', ascending=False)
+            book_stats = ORDER_BOOKS.stats()
+            st.caption(
+                f"📚 Order book: {len(depth_df)}/{len(depth_pairs)} pair terlikuid"
+                + (f", tertua {book_stats['oldest_age']:.0f} detik" if book_stats['oldest_age'] is not None else "")
+                + (f", {book_stats['inflight']} sedang diambil" if book_stats['inflight'] else "")
+                + f" | Sinyal & Rasio B/S dari kedalaman ±{SIGNAL_BAND_PCT:g}% dari mid."
+            )
 
-        st.dataframe(styled_df_market, use_container_width=True, height=600)
-    else:
-        st.warning("❗ Tidak ada data ticker global yang tersedia dari Indodax saat ini.")
-
-# === TOP MOVERS (24 Jam) ===
-with st.expander("🔥 Top Movers (24 Jam)", expanded=True):
-    if all_tickers_data:
-        top_gainers, top_losers, top_volume_movers = get_top_movers(all_tickers_data)
-
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            st.write("#🚀 Top Gainers")
-            if not top_gainers.empty:
-                st.dataframe(top_gainers[['last', 'change']].style.format({
-                    'last': lambda x: format_price(x, 'idr'),
-                    'change': '{:.2f}%'
-                }).set_caption("Persentase kenaikan tertinggi"))
-            else:
-                st.info("Tidak ada data top gainers.")
-        with col2:
-            st.write("#🔻 Top Losers")
-            if not top_losers.empty:
-                st.dataframe(top_losers[['last', 'change']].style.format({
-                    'last': lambda x: format_price(x, 'idr'),
-                    'change': '{:.2f}%'
-                }).set_caption("Persentase penurunan terdalam"))
-            else:
-                st.info("Tidak ada data top losers.")
-        with col3:
-            st.write("#💰 Top Volume")
-            if not top_volume_movers.empty:
-                st.dataframe(top_volume_movers[['vol_idr']].style.format({
-                    'vol_idr': '{:,.0f} IDR'
-                }).set_caption("Volume perdagangan tertinggi dalam IDR"))
+            table_mode = st.radio(
+                "Mode Tabel", ["⚡ Cepat (paging server)", "🎨 Klasik (Styler)"],
+                horizontal=True, key="market_table_mode"
+            )
+
+            if table_mode.startswith("⚡"):
+                render_fast_market_table(df_market)
             else:
-                st.info("Tidak ada data top volume.")
-    else:
-        st.warning("Tidak dapat menampilkan Top Movers karena data ticker global tidak tersedia.")
+                cols_to_display = ['Harga', 'Volume IDR (24j)', 'Harga Bid', 'Harga Ask', 'Spread (%)', 'Kedalaman Bid', 'Kedalaman Ask',
+                                   'Rasio B/S', 'Sinyal Pasar', 'Saran Posisi', 'Spike (%)']
+
+                with timed("render", panel="market_styler"):
+                    styled_df_market = df_market[cols_to_display].style \
+                        .applymap(style_signal_column, subset=['Sinyal Pasar']) \
+                        .set_properties(**{'text-align': 'right'}, subset=['Harga', 'Volume IDR (24j)', 'Harga Bid', 'Harga Ask', 'Spread (%)', 'Kedalaman Bid', 'Kedalaman Ask', 'Spike (%)']) \
+                        .set_properties(**{'text-align': 'left'}, subset=['Rasio B/S', 'Saran Posisi']) \
+                        .set_properties(**{'text-align': 'center'}, subset=['Sinyal Pasar']) \
+                        .format({'Harga': '{}', 'Harga Bid': '{}', 'Harga Ask': '{}', 'Spike (%)': '{}'})
+                    # --- ----------------------------------------------
+
+                    st.dataframe(styled_df_market, use_container_width=True, height=600)
+        else:
+            st.warning("❗ Tidak ada data ticker global yang tersedia dari Indodax saat ini.")
+
+    # === TOP MOVERS (multi-window) ===
+    with st.expander("🔥 Top Movers", expanded=True):
+        if all_tickers_data:
+            liquidity_options = {"Semua": 0, "≥ 100 Jt IDR": 1e8, "≥ 1 M IDR": 1e9, "≥ 10 M IDR": 1e10}
+            col_window, col_k, col_liq = st.columns([2, 1, 1])
+            window = col_window.radio("Window", list(MOVER_WINDOWS), index=len(MOVER_WINDOWS) - 1, horizontal=True, key="movers_window")
+            top_k = col_k.number_input("Top K", min_value=3, max_value=50, value=10, step=1, key="movers_k")
+            min_liquidity = col_liq.selectbox("Likuiditas Min.", list(liquidity_options), key="movers_min_liquidity")
+
+            snapshot = market_history.latest()
+            if snapshot is None or len(snapshot) != len(all_tickers_data):
+                snapshot = record_tickers(all_tickers_data)
+            movers = compute_movers(snapshot, k=int(top_k), min_vol_idr=liquidity_options[min_liquidity])
+            window_movers = movers["windows"][window]
+            top_gainers, top_losers, top_volume_movers = window_movers["gainers"], window_movers["losers"], movers["volume"]
+
+            if window_movers["source"] is None:
+                st.info(f"Riwayat snapshot baru {market_history.coverage_seconds() / 60:.0f} menit; window {window} belum bisa dihitung.")
+            elif window_movers["source"] == "ticker":
+                st.caption("Perubahan 24h memakai estimasi dari ticker (last vs low 24 jam) sampai riwayat snapshot mencapai 24 jam.")
+
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.write(f"#🚀 Top Gainers ({window})")
+                if not top_gainers.empty:
+                    st.dataframe(top_gainers[['last', 'change']].style.format({
+                        'last': lambda x: format_price(x, 'idr'),
+                        'change': '{:.2f}%'
+                    }).set_caption("Persentase kenaikan tertinggi"))
+                else:
+                    st.info("Tidak ada data top gainers.")
+            with col2:
+                st.write(f"#🔻 Top Losers ({window})")
+                if not top_losers.empty:
+                    st.dataframe(top_losers[['last', 'change']].style.format({
+                        'last': lambda x: format_price(x, 'idr'),
+                        'change': '{:.2f}%'
+                    }).set_caption("Persentase penurunan terdalam"))
+                else:
+                    st.info("Tidak ada data top losers.")
+            with col3:
+                st.write("#💰 Top Volume")
+                if not top_volume_movers.empty:
+                    st.dataframe(top_volume_movers[['vol_idr']].style.format({
+                        'vol_idr': '{:,.0f} IDR'
+                    }).set_caption("Volume perdagangan tertinggi dalam IDR"))
+                else:
+                    st.info("Tidak ada data top volume.")
+        else:
+            st.warning("Tidak dapat menampilkan Top Movers karena data ticker global tidak tersedia.")
+
+
+render_market_overview()
 
 # === Footer ===
 st.markdown("---")
 st.markdown(f"<p style='text-align: center; color: grey;'>Develop By : OTOH © {datetime.now().year}</p>", unsafe_allow_html=True)
 
 logger.info("Pemuatan halaman utama selesai.")
+
+profile_result = finish_profile_session(selected_pair, st.session_state.signal_interval_tf)
+if profile_result is not None:
+    with st.expander("🔬 Hasil Profiling Rerun Ini", expanded=True):
+        render_profile_summary(profile_result, "page_profile")
@@ -0,0 +1,62 @@
+"""
+Laporan memori frame candle + sinyal per pair: layout float64/string saat ini
+vs. layout ringkas (modules.compact_frames).
+
+Data trades disintesis (tanpa akses jaringan) lalu diproses dengan pipeline
+yang sama dengan dashboard: resample OHLC -> apply_indicators -> scan_signals.
+
+    python benchmarks/memory_footprint.py --pairs 50 --trades 5000
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.compact_frames import memory_report  # noqa: E402
+from modules.indicators import apply_indicators  # noqa: E402
+from modules.signal_engine import scan_signals  # noqa: E402
+
+TIMEFRAMES = ("15min", "1h", "4h")
+
+
+def synthetic_candles(rng, n_trades, tf, base_price):
+    now = pd.Timestamp.now().floor("s")
+    dates = now - pd.to_timedelta(np.sort(rng.integers(0, 30 * 86400, n_trades))[::-1], unit="s")
+    price = base_price * np.exp(np.cumsum(rng.normal(0, 0.002, n_trades)))
+    trades = pd.DataFrame({"price": price, "amount": rng.exponential(1.0, n_trades)}, index=dates).sort_index()
+    ohlc = trades["price"].resample(tf).ohlc().dropna()
+    ohlc["volume"] = trades["amount"].resample(tf).sum()
+    return ohlc.rename_axis("date").reset_index()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pairs", type=int, default=20)
+    parser.add_argument("--trades", type=int, default=5000, help="Jumlah trades per pair")
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(42)
+    frames = {}
+    for i in range(args.pairs):
+        pair = f"coin{i}_idr"
+        base_price = float(10 ** rng.uniform(0, 9))
+        frames[pair] = []
+        for tf in TIMEFRAMES:
+            candles = apply_indicators(synthetic_candles(rng, args.trades, tf, base_price))
+            frames[pair].append((candles, scan_signals(pair, candles)))
+
+    report = memory_report(frames)
+    pd.set_option("display.width", 120)
+    print(report.head(10).to_string())
+    total_before, total_after = report["bytes_sebelum"].sum(), report["bytes_sesudah"].sum()
+    print(f"\nTotal {args.pairs} pair x {len(TIMEFRAMES)} timeframe: "
+          f"{total_before / 1e6:.2f} MB -> {total_after / 1e6:.2f} MB ({total_before / total_after:.1f}x lebih kecil)")
+    print(f"Rata-rata per pair: {total_before / args.pairs / 1024:.1f} KB -> {total_after / args.pairs / 1024:.1f} KB")
+
+
+if __name__ == "__main__":
+    main()
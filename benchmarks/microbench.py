@@ -0,0 +1,397 @@
+"""
+Microbenchmark hot path data & sinyal dengan fixture sintetis atau rekaman.
+
+Kasus yang diukur (skala trades: 1k/100k/1M, skala pair: 50/500/2000):
+  candles.parse_resample   get_candlestick_data (decode JSON, parse, resample 5min)
+  indicators.apply         apply_indicators pada candle hasil resample
+  signals.scan             scan_signals pada frame berindikator
+  tickers.parse            fetch_all_tickers (decode JSON + parsing per pair)
+  market.enrich_cold       enrich_market_dataframe tanpa memo
+  market.enrich_memo       enrich_market_dataframe dengan memo snapshot (hit)
+  depth.metrics            depth_metrics (spread, imbalance per band, slope) untuk book 150 level semua pair
+  movers.engine            snapshot_from_tickers + compute_movers (4 window)
+  movers.legacy_dict_sort  get_top_movers lama (indodax_api, sorted() per dict) sebagai pembanding
+  movers.legacy_pandas     get_top_movers lama (utils.helpers, sort_values) sebagai pembanding
+
+HTTP tidak dipanggil: governed_get di modules.indodax_api diganti respons
+fixture selama pengukuran. Hasil disimpan sebagai JSON, lalu dibandingkan:
+
+    python benchmarks/microbench.py run                       # semua skala
+    python benchmarks/microbench.py run --quick --only market  # skala kecil, filter nama
+    python benchmarks/microbench.py run --fixtures benchmarks/fixtures
+    python benchmarks/microbench.py record --pairs btc_idr,eth_idr   # rekam fixture dari Indodax
+    python benchmarks/microbench.py compare lama.json baru.json --threshold 0.1
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import warnings
+from contextlib import contextmanager
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from modules import indodax_api  # noqa: E402
+from modules.indicators import apply_indicators  # noqa: E402
+from modules.movers import WINDOWS, SnapshotHistory, compute_movers, snapshot_from_tickers  # noqa: E402
+from modules.order_book import OrderBook, depth_metrics  # noqa: E402
+from modules.signal_engine import scan_signals  # noqa: E402
+from utils import helpers  # noqa: E402
+
+TRADE_SCALES = (1_000, 100_000, 1_000_000)
+PAIR_SCALES = (50, 500, 2000)
+QUICK_TRADE_SCALES = (1_000, 100_000)
+QUICK_PAIR_SCALES = (50, 500)
+CANDLE_TF = "5min"
+# Rata-rata jeda antar trade sintetis (detik): 1M trades ~ 1 tahun ~ 100k candle 5 menit
+MEAN_TRADE_GAP_SECONDS = 30
+RESULTS_DIR = os.path.join(REPO_ROOT, "benchmarks", "results")
+FIXTURES_DIR = os.path.join(REPO_ROOT, "benchmarks", "fixtures")
+# Selisih median di bawah ini dianggap noise saat membandingkan hasil
+NOISE_FLOOR_SECONDS = 0.001
+
+
+# ========================================
+# 🧪 Fixture
+# ========================================
+def synthetic_trades_payload(n_trades, seed=0, base_price=500_000_000.0):
+    """Body JSON /api/{pair}/trades (nilai string seperti respons Indodax, terbaru dulu)."""
+    rng = np.random.default_rng(seed)
+    now = int(time.time())
+    dates = now - np.cumsum(rng.exponential(MEAN_TRADE_GAP_SECONDS, n_trades)).astype(np.int64)
+    prices = np.round(base_price * np.exp(np.cumsum(rng.normal(0, 0.0005, n_trades))))
+    amounts = rng.exponential(0.01, n_trades)
+    trades = [
+        {"date": str(d), "price": str(int(p)), "amount": f"{a:.8f}", "tid": str(n_trades - i), "type": "buy" if i % 2 else "sell"}
+        for i, (d, p, a) in enumerate(zip(dates.tolist(), prices.tolist(), amounts.tolist()))
+    ]
+    return json.dumps(trades)
+
+
+def synthetic_tickers_payload(n_pairs, seed=0):
+    """Body JSON /api/tickers untuk `n_pairs` pair."""
+    rng = np.random.default_rng(seed)
+    now = int(time.time())
+    tickers = {}
+    for i in range(n_pairs):
+        last = float(10 ** rng.uniform(0, 9))
+        low, high = last * rng.uniform(0.8, 1.0), last * rng.uniform(1.0, 1.2)
+        tickers[f"coin{i}_idr"] = {
+            "high": f"{high:.0f}", "low": f"{low:.0f}", "last": f"{last:.0f}",
+            "buy": f"{last * 0.999:.0f}", "sell": f"{last * 1.001:.0f}",
+            "vol_idr": f"{rng.exponential(1e9):.0f}", f"vol_coin{i}": f"{rng.exponential(1e3):.8f}",
+            "server_time": now, "name": f"Coin {i}",
+        }
+    return json.dumps({"tickers": tickers})
+
+
+def synthetic_order_books(tickers, levels=150, seed=0):
+    """Book /depth sintetis (`levels` level per sisi, langkah 0.05%) di sekitar harga last tiap pair."""
+    rng = np.random.default_rng(seed)
+    steps = 1 + 0.0005 * np.arange(1, levels + 1)
+    books = []
+    for pair, info in tickers.items():
+        last = info["last"] or 1.0
+        payload = {
+            "buy": np.column_stack([last / steps, rng.exponential(1.0, levels)]).tolist(),
+            "sell": np.column_stack([last * steps, rng.exponential(1.0, levels)]).tolist(),
+        }
+        books.append(OrderBook(pair).apply_snapshot(payload))
+    return books
+
+
+def load_recorded_fixtures(directory):
+    """File `trades_*.json` dan `tickers*.json` hasil subcommand `record`."""
+    trades, tickers = {}, {}
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        if not name.endswith(".json"):
+            continue
+        with open(path, encoding="utf-8") as f:
+            body = f.read()
+        if name.startswith("trades_"):
+            trades[f"rec:{name[len('trades_'):-5]}"] = body
+        elif name.startswith("tickers"):
+            tickers[f"rec:{name[:-5]}"] = body
+    return trades, tickers
+
+
+class FixtureResponse:
+    status_code = 200
+    ok = True
+
+    def __init__(self, body):
+        self.text = body
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return json.loads(self.text)
+
+
+@contextmanager
+def serve_fixture(body):
+    """Ganti governed_get di modules.indodax_api dengan respons fixture."""
+    original = indodax_api.governed_get
+    indodax_api.governed_get = lambda url, endpoint_class=None, **kwargs: FixtureResponse(body)
+    try:
+        yield
+    finally:
+        indodax_api.governed_get = original
+
+
+# ========================================
+# 🕰️ Implementasi top movers lama (pembanding, sudah diganti modules.movers)
+# ========================================
+def legacy_top_movers_dict_sort(tickers):
+    top_gainers = sorted(tickers.items(), key=lambda x: x[1]["change"], reverse=True)[:10]
+    top_losers = sorted(tickers.items(), key=lambda x: x[1]["change"])[:10]
+    top_volume = sorted(tickers.items(), key=lambda x: x[1]["vol_idr"], reverse=True)[:10]
+    return pd.DataFrame(dict(top_gainers)).T, pd.DataFrame(dict(top_losers)).T, pd.DataFrame(dict(top_volume)).T
+
+
+def legacy_top_movers_pandas(tickers):
+    df = pd.DataFrame.from_dict(tickers, orient='index')
+    for col in ('last', 'change', 'vol_idr'):
+        df[col] = pd.to_numeric(df[col], errors='coerce')
+    df = df.dropna(subset=['last', 'change', 'vol_idr'])
+    return (
+        df.sort_values(by='change', ascending=False).head(10),
+        df.sort_values(by='change').head(10),
+        df.sort_values(by='vol_idr', ascending=False).head(10),
+    )
+
+
+def movers_history(tickers):
+    """History snapshot sintetis yang menutup semua window movers."""
+    history = SnapshotHistory(min_interval=0)
+    now = time.time()
+    rng = np.random.default_rng(1)
+    for seconds in sorted(WINDOWS.values(), reverse=True):
+        past = {pair: {**info, "last": info["last"] * rng.uniform(0.9, 1.1)} for pair, info in tickers.items()}
+        history.record(snapshot_from_tickers(past, ts=now - seconds))
+    return history
+
+
+# ========================================
+# ⏱️ Runner
+# ========================================
+def measure(func, setup=None, repeat=5, max_seconds=20.0):
+    """Jalankan `func(*setup())` sampai `repeat` kali atau `max_seconds` habis (minimal sekali)."""
+    timings = []
+    budget_start = time.perf_counter()
+    while len(timings) < repeat:
+        args = setup() if setup else ()
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+        if time.perf_counter() - budget_start > max_seconds:
+            break
+    return {
+        "median_s": statistics.median(timings),
+        "min_s": min(timings),
+        "mean_s": statistics.fmean(timings),
+        "runs": len(timings),
+    }
+
+
+def trade_cases(label, body):
+    """Kasus per skala trades; candle & indikator disiapkan sekali di luar pengukuran."""
+    def parse_resample():
+        with serve_fixture(body):
+            return indodax_api.get_candlestick_data("bench_idr", tf=CANDLE_TF)
+
+    candles = parse_resample()
+    with_indicators = apply_indicators(candles.copy())
+    meta = {"candles": len(candles)}
+    yield "candles.parse_resample", label, meta, parse_resample, None
+    yield "indicators.apply", label, meta, apply_indicators, lambda: (candles.copy(),)
+    yield "signals.scan", label, meta, scan_signals, lambda: ("bench_idr", with_indicators)
+
+
+def pair_cases(label, body):
+    def parse_tickers():
+        with serve_fixture(body):
+            return indodax_api.fetch_all_tickers()
+
+    tickers = parse_tickers()
+    market_df = helpers.clean_and_transform_market_data(tickers)
+    history = movers_history(tickers)
+    meta = {"pairs": len(tickers)}
+
+    def enrich_cold(df):
+        helpers._enrich_cache.clear()
+        return helpers.enrich_market_dataframe(df)
+
+    helpers.enrich_market_dataframe(market_df)
+    books = synthetic_order_books(tickers)
+    yield "tickers.parse", label, meta, parse_tickers, None
+    yield "market.enrich_cold", label, meta, enrich_cold, lambda: (market_df,)
+    yield "market.enrich_memo", label, meta, helpers.enrich_market_dataframe, lambda: (market_df,)
+    yield "depth.metrics", label, meta, depth_metrics, lambda: (books,)
+    yield "movers.engine", label, meta, lambda: compute_movers(snapshot_from_tickers(tickers), history), None
+    yield "movers.legacy_dict_sort", label, meta, legacy_top_movers_dict_sort, lambda: (tickers,)
+    yield "movers.legacy_pandas", label, meta, legacy_top_movers_pandas, lambda: (tickers,)
+
+
+CASE_NAMES = {
+    trade_cases: ("candles.parse_resample", "indicators.apply", "signals.scan"),
+    pair_cases: ("tickers.parse", "market.enrich_cold", "market.enrich_memo", "depth.metrics", "movers.engine",
+                 "movers.legacy_dict_sort", "movers.legacy_pandas"),
+}
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True,
+                              text=True, timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ""
+
+
+def run(args):
+    trade_scales = QUICK_TRADE_SCALES if args.quick else TRADE_SCALES
+    pair_scales = QUICK_PAIR_SCALES if args.quick else PAIR_SCALES
+    if args.trades:
+        trade_scales = [int(x) for x in args.trades.split(",")]
+    if args.pairs:
+        pair_scales = [int(x) for x in args.pairs.split(",")]
+
+    fixtures = [(trade_cases, f"trades={n}", lambda n=n: synthetic_trades_payload(n)) for n in trade_scales]
+    fixtures += [(pair_cases, f"pairs={n}", lambda n=n: synthetic_tickers_payload(n)) for n in pair_scales]
+    if args.fixtures:
+        recorded_trades, recorded_tickers = load_recorded_fixtures(args.fixtures)
+        fixtures += [(trade_cases, label, lambda body=body: body) for label, body in recorded_trades.items()]
+        fixtures += [(pair_cases, label, lambda body=body: body) for label, body in recorded_tickers.items()]
+
+    results = []
+    for cases, label, make_body in fixtures:
+        if args.only and not any(args.only in name for name in CASE_NAMES[cases]):
+            continue  # lewati pembuatan fixture yang tidak dipakai
+        for name, scale, meta, func, setup in cases(label, make_body()):
+            if args.only and args.only not in name:
+                continue
+            stats = measure(func, setup, repeat=args.repeat, max_seconds=args.max_seconds)
+            results.append({"name": name, "scale": scale, **meta, **stats})
+            print(f"{name:<26} {scale:<18} median {stats['median_s'] * 1000:10.2f} ms   "
+                  f"min {stats['min_s'] * 1000:10.2f} ms   ({stats['runs']}x)", flush=True)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "git": git_revision(),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+        },
+        "results": results,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"microbench-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nHasil disimpan ke {output}")
+    return 0
+
+
+
+# ========================================
+# 📉 Perbandingan antar run
+# ========================================
+def compare(args):
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = {(r["name"], r["scale"]): r for r in json.load(f)["results"]}
+    with open(args.current, encoding="utf-8") as f:
+        current = {(r["name"], r["scale"]): r for r in json.load(f)["results"]}
+
+    regressions = 0
+    print(f"{'kasus':<26} {'skala':<18} {'lama ms':>10} {'baru ms':>10} {'rasio':>7}")
+    for key in sorted(set(baseline) | set(current)):
+        old, new = baseline.get(key), current.get(key)
+        if old is None or new is None:
+            old_ms = f"{old['median_s'] * 1000:.2f}" if old else "-"
+            new_ms = f"{new['median_s'] * 1000:.2f}" if new else "-"
+            print(f"{key[0]:<26} {key[1]:<18} {old_ms:>10} {new_ms:>10}   (hanya di satu run)")
+            continue
+        ratio = new["median_s"] / old["median_s"] if old["median_s"] else float("inf")
+        regressed = ratio > 1 + args.threshold and new["median_s"] - old["median_s"] > NOISE_FLOOR_SECONDS
+        improved = ratio < 1 - args.threshold and old["median_s"] - new["median_s"] > NOISE_FLOOR_SECONDS
+        regressions += regressed
+        flag = "  ⚠️ REGRESI" if regressed else ("  ✅ lebih cepat" if improved else "")
+        print(f"{key[0]:<26} {key[1]:<18} {old['median_s'] * 1000:10.2f} {new['median_s'] * 1000:10.2f} {ratio:6.2f}x{flag}")
+
+    print(f"\n{regressions} regresi (ambang {args.threshold:.0%}, noise floor {NOISE_FLOOR_SECONDS * 1000:.0f} ms)")
+    return 1 if regressions else 0
+
+
+# ========================================
+# 📼 Rekam fixture dari Indodax
+# ========================================
+def record(args):
+    from modules.rate_limiter import governed_get
+
+    os.makedirs(args.directory, exist_ok=True)
+    targets = [("tickers.json", "https://indodax.com/api/tickers", "ticker")]
+    targets += [(f"trades_{pair}.json", f"https://indodax.com/api/{pair}/trades", "trades")
+                for pair in args.pairs.split(",") if pair]
+    for name, url, endpoint_class in targets:
+        response = governed_get(url, endpoint_class)
+        response.raise_for_status()
+        path = os.path.join(args.directory, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(response.text)
+        print(f"📼 {url} -> {path} ({len(response.text) / 1024:.0f} KB)")
+    return 0
+
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = sub.add_parser("run", help="Jalankan benchmark dan simpan hasil JSON")
+    run_parser.add_argument("--quick", action="store_true", help="Hanya skala kecil (1k/100k trades, 50/500 pair)")
+    run_parser.add_argument("--trades", help="Skala trades dipisah koma, mis. 1000,100000")
+    run_parser.add_argument("--pairs", help="Skala pair dipisah koma, mis. 50,2000")
+    run_parser.add_argument("--only", help="Hanya kasus yang namanya mengandung teks ini")
+    run_parser.add_argument("--fixtures", help="Folder fixture rekaman (trades_<pair>.json, tickers.json)")
+    run_parser.add_argument("--repeat", type=int, default=5)
+    run_parser.add_argument("--max-seconds", type=float, default=20.0, help="Batas waktu per kasus")
+    run_parser.add_argument("--output", help="Path file JSON (default: benchmarks/results/microbench-<waktu>.json)")
+    run_parser.set_defaults(func=run)
+
+    compare_parser = sub.add_parser("compare", help="Bandingkan dua file hasil dan tandai regresi")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.10, help="Rasio perlambatan yang dianggap regresi")
+    compare_parser.set_defaults(func=compare)
+
+    record_parser = sub.add_parser("record", help="Rekam respons Indodax sebagai fixture")
+    record_parser.add_argument("--pairs", default="btc_idr,eth_idr,usdt_idr")
+    record_parser.add_argument("--directory", default=FIXTURES_DIR)
+    record_parser.set_defaults(func=record)
+    return parser
+
+
+def main(argv=None):
+    args = build_arg_parser().parse_args(argv)
+    # Peringatan/log per panggilan dari kode yang diukur hanya mengotori output
+    logging.basicConfig(level=logging.ERROR)
+    warnings.simplefilter("ignore", FutureWarning)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,106 @@
+"""
+Ukur waktu startup (cold import) scanner headless vs. import dashboard Streamlit,
+serta biaya logo per rerun sebelum/sesudah thumbnail + data URI di-cache.
+
+Setiap skenario import dijalankan di interpreter baru beberapa kali lalu diambil median.
+
+    python benchmarks/startup_time.py --repeat 5
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DASHBOARD_MODULES = (
+    "import modules.indodax_api, modules.indicators, modules.signal_engine, modules.telegram_outbox\n"
+    "import modules.coinmarketcap_api, modules.chart_renderer, modules.scanner, utils.helpers, utils.market_table\n"
+)
+
+SCENARIOS = {
+    # Import eager di Read_One_Trade_V.02.py sebelum optimasi startup
+    "dashboard sebelum (eager plotly/PIL/schedule)": (
+        "import streamlit, pandas, plotly.graph_objs, schedule\n"
+        "from PIL import Image, ImageDraw\n"
+        "try:\n    import streamlit_autorefresh\nexcept ImportError:\n    pass\n"
+        + DASHBOARD_MODULES
+    ),
+    # Import level-modul dashboard sekarang (plotly/PIL/schedule lazy)
+    "dashboard sesudah (lazy import)": (
+        "import streamlit, pandas\n"
+        + DASHBOARD_MODULES
+    ),
+    "scanner CLI (import + config)": (
+        "import modules.scanner\n"
+        "from modules.config import load_config\n"
+        "load_config()\n"
+    ),
+    "scanner siap scan (lazy import pipeline)": (
+        "import modules.scanner\n"
+        "import modules.indodax_api, modules.indicators, modules.telegram_bot\n"
+        "import sys\n"
+        "assert 'streamlit' not in sys.modules, 'scanner tidak boleh mengimpor streamlit'\n"
+    ),
+}
+
+
+def time_scenario(code, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT, check=True, stderr=subprocess.DEVNULL)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def time_logo_per_rerun(repeat):
+    """Biaya logo yang dulu dibayar tiap rerun vs. thumbnail yang sudah disiapkan."""
+    import base64
+    from io import BytesIO
+    from PIL import Image
+
+    def before():
+        img = Image.open(os.path.join(REPO_ROOT, "logo.png"))
+        img.load()
+        buffered = BytesIO()
+        img.save(buffered, format="PNG")
+        return base64.b64encode(buffered.getvalue()).decode()
+
+    def after():
+        with open(os.path.join(REPO_ROOT, "assets", "logo_thumb.png"), "rb") as f:
+            return base64.b64encode(f.read()).decode()
+
+    results = {}
+    for name, func in (("logo sebelum (decode 1024px + encode PNG + base64)", before),
+                       ("logo sesudah (thumbnail 120px + base64, sekali/proses)", after)):
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            payload = func()
+            samples.append(time.perf_counter() - start)
+        results[name] = (statistics.median(samples), len(payload))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    baseline = time_scenario("pass", args.repeat)
+    print(f"{'Skenario':<48} {'median (ms)':>12} {'tanpa interpreter':>18}")
+    for name, code in SCENARIOS.items():
+        elapsed = time_scenario(code, args.repeat)
+        print(f"{name:<48} {elapsed * 1000:>12.1f} {(elapsed - baseline) * 1000:>18.1f}")
+
+    print()
+    print(f"{'Logo per rerun':<56} {'median (ms)':>12} {'data URI (KB)':>14}")
+    for name, (elapsed, size) in time_logo_per_rerun(args.repeat).items():
+        print(f"{name:<56} {elapsed * 1000:>12.1f} {size / 1024:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Kurva scaling pool proses indikator (modules.worker_pool) dari 1 sampai N worker,
+dibandingkan dengan perhitungan berurutan di proses utama.
+
+Candle disintesis (tanpa jaringan); waktu start worker tidak ikut diukur
+(pool dipanaskan dulu dengan satu putaran kecil).
+
+    python benchmarks/worker_scaling.py --pairs 500 --max-workers 8
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from memory_footprint import synthetic_candles  # noqa: E402
+from modules.worker_pool import IndicatorWorkerPool, compute_pair  # noqa: E402
+
+
+def build_candles(n_pairs, n_trades):
+    rng = np.random.default_rng(7)
+    return {f"coin{i}_idr": synthetic_candles(rng, n_trades, "1h", float(10 ** rng.uniform(0, 6))) for i in range(n_pairs)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pairs", type=int, default=200)
+    parser.add_argument("--trades", type=int, default=5000, help="Jumlah trades per pair")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args(argv)
+
+    candles = build_candles(args.pairs, args.trades)
+    rows = sum(len(df) for df in candles.values())
+    print(f"{args.pairs} pair, {rows} candle total, {os.cpu_count()} core terdeteksi\n")
+
+    start = time.perf_counter()
+    for pair, df in candles.items():
+        compute_pair(pair, df.copy())
+    baseline = time.perf_counter() - start
+    print(f"{'berurutan (1 proses)':<24} {baseline:8.2f} s   1.00x")
+
+    for workers in range(1, args.max_workers + 1):
+        pool = IndicatorWorkerPool(workers)
+        try:
+            pool.run(dict(list(candles.items())[:workers]))  # panaskan worker (import pandas/ta)
+            start = time.perf_counter()
+            results = pool.run(candles)
+            elapsed = time.perf_counter() - start
+        finally:
+            pool.close()
+        errors = sum(1 for result in results.values() if "error" in result)
+        print(f"{f'pool {workers} worker':<24} {elapsed:8.2f} s   {baseline / elapsed:.2f}x"
+              + (f"   ({errors} error)" if errors else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+import math
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# ========================================
+# 📉 Persiapan data chart: decimation OHLC + batas payload
+# ========================================
+# Estimasi empiris payload JSON Plotly per titik untuk chart candlestick +
+# volume + 2 garis BB (x berupa tanggal string, y typed array base64).
+BYTES_PER_POINT = 180
+CHART_PAYLOAD_BUDGET_BYTES = 250_000
+MIN_PIXELS_PER_CANDLE = 3
+DEFAULT_VIEWPORT_PX = 1200
+
+# Cara agregasi kolom per bucket; kolom lain (indikator garis, CVD) memakai nilai terakhir
+OHLC_AGGREGATION = {
+    "open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum",
+    "taker_buy_volume": "sum", "taker_sell_volume": "sum", "trade_count": "sum", "vwap": "vwap",
+}
+
+
+def max_points_for(viewport_px=DEFAULT_VIEWPORT_PX, payload_budget=CHART_PAYLOAD_BUDGET_BYTES,
+                   bytes_per_point=BYTES_PER_POINT):
+    """Jumlah titik maksimum: dibatasi lebar viewport dan budget payload, mana yang lebih kecil."""
+    by_pixels = max(1, int(viewport_px // MIN_PIXELS_PER_CANDLE))
+    by_budget = max(1, int(payload_budget // bytes_per_point))
+    return min(by_pixels, by_budget)
+
+
+def decimate_ohlc(df, max_points, time_col="date"):
+    """
+    Gabungkan candle berurutan ke dalam bucket berukuran sama (open pertama,
+    high maksimum, low minimum, close terakhir, volume dijumlah) sehingga
+    ekstrem harga tetap terlihat, tidak seperti sampling biasa.
+
+    Returns:
+        tuple: (DataFrame hasil decimation, ukuran bucket)
+    """
+    n = len(df)
+    if n <= max_points:
+        return df, 1
+
+    bucket = math.ceil(n / max_points)
+    # Bucket disejajarkan dari candle terakhir agar candle terbaru utuh di bucket sendiri-sendiri
+    starts = np.arange(n - bucket * math.ceil(n / bucket), n, bucket).clip(min=0)
+    starts = np.unique(starts)
+    ends = np.append(starts[1:], n) - 1
+
+    result = {}
+    if time_col in df.columns:
+        result[time_col] = df[time_col].to_numpy()[starts]
+    for col in df.columns:
+        if col == time_col:
+            continue
+        values = df[col].to_numpy()
+        how = OHLC_AGGREGATION.get(col, "last")
+        if how == "first":
+            result[col] = values[starts]
+        elif how == "last":
+            result[col] = values[ends]
+        elif not np.issubdtype(values.dtype, np.number):
+            result[col] = values[ends]
+        elif how == "max":
+            result[col] = np.fmax.reduceat(values, starts)
+        elif how == "min":
+            result[col] = np.fmin.reduceat(values, starts)
+        elif how == "vwap" and "volume" in df.columns:
+            # VWAP bucket = total notional / total volume candle-candle di dalamnya
+            volume = np.nan_to_num(df["volume"].to_numpy(dtype=np.float64))
+            notional = np.add.reduceat(np.nan_to_num(values * volume), starts)
+            total = np.add.reduceat(volume, starts)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                result[col] = np.where(total > 0, notional / total, values[ends])
+        else:
+            result[col] = np.add.reduceat(np.nan_to_num(values), starts)
+    index = df.index[starts] if time_col in df.columns else df.index[ends]
+    return pd.DataFrame(result, index=index), bucket
+
+
+def prepare_chart_data(df, visible_candles=None, viewport_px=DEFAULT_VIEWPORT_PX,
+                       payload_budget=CHART_PAYLOAD_BUDGET_BYTES):
+    """
+    Potong ke jendela yang terlihat lalu decimation sesuai viewport & budget payload.
+
+    Args:
+        df (pd.DataFrame): Candle + indikator (indikator sudah dihitung pada resolusi penuh).
+        visible_candles (int): Jumlah candle terakhir yang ditampilkan (None = semua).
+
+    Returns:
+        tuple: (DataFrame siap plot, dict info decimation)
+    """
+    if visible_candles:
+        df = df.tail(visible_candles)
+    max_points = max_points_for(viewport_px, payload_budget)
+    chart_df, bucket = decimate_ohlc(df, max_points)
+    info = {
+        "source_points": len(df),
+        "points": len(chart_df),
+        "bucket": bucket,
+        "estimated_bytes": len(chart_df) * BYTES_PER_POINT,
+    }
+    if bucket > 1:
+        logger.debug(f"Chart di-decimate: {info}")
+    return chart_df, info
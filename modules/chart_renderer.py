@@ -0,0 +1,165 @@
+import io
+import logging
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# ========================================
+# 🎨 Render chart candlestick tanpa display (Pillow saja)
+# ========================================
+BACKGROUND = (17, 17, 17)
+GRID = (45, 45, 45)
+TEXT = (220, 220, 220)
+UP = (38, 166, 91)
+DOWN = (231, 76, 60)
+VOLUME = (52, 101, 164)
+BB_LINE = (120, 170, 200)
+
+MAX_CACHED_IMAGES = 64
+
+
+def _scale(values, lo, hi, top, bottom):
+    span = (hi - lo) or 1.0
+    return bottom - (values - lo) / span * (bottom - top)
+
+
+def _draw_series(draw, xs, ys, fill):
+    """Gambar garis, putus di nilai NaN (awal Bollinger Bands)."""
+    segment = []
+    for x, y in zip(xs, ys):
+        if np.isnan(y):
+            if len(segment) > 1:
+                draw.line(segment, fill=fill, width=1)
+            segment = []
+        else:
+            segment.append((float(x), float(y)))
+    if len(segment) > 1:
+        draw.line(segment, fill=fill, width=1)
+
+
+def render_candlestick_chart(df, pair, tf, width=800, height=450, max_candles=120, fmt="PNG"):
+    """
+    Gambar candlestick + volume + Bollinger Bands langsung dari kolom DataFrame
+    (open/high/low/close/volume, opsional bb_upper/bb_lower) ke bytes gambar.
+
+    Args:
+        df (pd.DataFrame): Data candle (hasil get_candlestick_data/apply_indicators).
+        pair (str): Nama pair untuk judul.
+        tf (str): Label timeframe untuk judul.
+        fmt (str): "PNG" (palet 32 warna) atau "WEBP".
+
+    Returns:
+        bytes: Gambar terkompresi, atau b"" jika data kosong.
+    """
+    from PIL import Image, ImageDraw
+
+    if df is None or df.empty:
+        return b""
+    df = df.tail(max_candles)
+
+    o = df['open'].to_numpy(dtype=float)
+    h = df['high'].to_numpy(dtype=float)
+    l = df['low'].to_numpy(dtype=float)
+    c = df['close'].to_numpy(dtype=float)
+    v = df['volume'].to_numpy(dtype=float)
+    bb_upper = df['bb_upper'].to_numpy(dtype=float) if 'bb_upper' in df.columns else None
+    bb_lower = df['bb_lower'].to_numpy(dtype=float) if 'bb_lower' in df.columns else None
+
+    left, right, top = 10, 90, 30
+    price_bottom = int(height * 0.72)
+    vol_top, vol_bottom = price_bottom + 10, height - 10
+    plot_width = width - left - right
+    step = plot_width / len(c)
+    body_half = max(1.0, step * 0.35)
+    xs = left + step * (np.arange(len(c)) + 0.5)
+
+    price_values = [h, l] + [band for band in (bb_upper, bb_lower) if band is not None]
+    lo = float(np.nanmin(np.concatenate(price_values)))
+    hi = float(np.nanmax(np.concatenate(price_values)))
+    y_open, y_close = _scale(o, lo, hi, top, price_bottom), _scale(c, lo, hi, top, price_bottom)
+    y_high, y_low = _scale(h, lo, hi, top, price_bottom), _scale(l, lo, hi, top, price_bottom)
+    y_vol = _scale(v, 0.0, float(np.nanmax(v)) or 1.0, vol_top, vol_bottom)
+
+    img = Image.new("RGB", (width, height), BACKGROUND)
+    draw = ImageDraw.Draw(img)
+
+    for frac in (0.0, 0.25, 0.5, 0.75, 1.0):
+        y = top + frac * (price_bottom - top)
+        draw.line([(left, y), (left + plot_width, y)], fill=GRID)
+        draw.text((left + plot_width + 6, y - 6), f"{hi - frac * (hi - lo):,.2f}", fill=TEXT)
+    draw.line([(left, vol_top), (left + plot_width, vol_top)], fill=GRID)
+
+    if bb_upper is not None and bb_lower is not None:
+        _draw_series(draw, xs, _scale(bb_upper, lo, hi, top, price_bottom), BB_LINE)
+        _draw_series(draw, xs, _scale(bb_lower, lo, hi, top, price_bottom), BB_LINE)
+
+    rising = c >= o
+    for i in range(len(c)):
+        color = UP if rising[i] else DOWN
+        draw.line([(xs[i], y_high[i]), (xs[i], y_low[i])], fill=color)
+        y0, y1 = sorted((y_open[i], y_close[i]))
+        draw.rectangle([xs[i] - body_half, y0, xs[i] + body_half, max(y1, y0 + 1)], fill=color)
+        draw.rectangle([xs[i] - body_half, y_vol[i], xs[i] + body_half, vol_bottom], fill=VOLUME)
+
+    draw.text((left, 8), f"{pair.upper()} ({tf})  last: {c[-1]:,.2f}", fill=TEXT)
+
+    buffered = io.BytesIO()
+    if fmt.upper() == "WEBP":
+        img.save(buffered, format="WEBP", quality=80, method=4)
+    else:
+        img.quantize(colors=32).save(buffered, format="PNG", optimize=True)
+    return buffered.getvalue()
+
+
+# ========================================
+# ✅ Cache gambar per (pair, timeframe, candle terakhir)
+# ========================================
+_image_cache = OrderedDict()
+_image_cache_lock = threading.Lock()
+
+
+def chart_cache_key(df, pair, tf):
+    """Key unik: pair, timeframe dan isi candle terakhir (waktu, close, volume)."""
+    last = df.iloc[-1]
+    timestamp = last['date'] if 'date' in df.columns else df.index[-1]
+    return f"{pair}|{tf}|{timestamp}|{last['close']}|{last['volume']}"
+
+
+def get_chart_image(df, pair, tf, **render_kwargs):
+    """
+    Render chart dengan cache LRU. Chart yang tidak berubah (candle terakhir sama)
+    tidak dirender ulang.
+
+    Returns:
+        tuple: (cache_key, bytes gambar) atau (None, b"") jika data kosong.
+    """
+    if df is None or df.empty:
+        return None, b""
+    key = chart_cache_key(df, pair, tf)
+    with _image_cache_lock:
+        if key in _image_cache:
+            _image_cache.move_to_end(key)
+            return key, _image_cache[key]
+
+    image = render_candlestick_chart(df, pair, tf, **render_kwargs)
+    with _image_cache_lock:
+        _image_cache[key] = image
+        while len(_image_cache) > MAX_CACHED_IMAGES:
+            _image_cache.popitem(last=False)
+    return key, image
+
+
+def send_pair_chart(outbox, chat_id, pair, tf='1h', caption=""):
+    """Ambil candle + indikator pair, render chart lalu masukkan ke outbox Telegram."""
+    from modules.indodax_api import get_candlestick_data
+    from modules.indicators import apply_indicators
+
+    df = get_candlestick_data(pair, tf=tf)
+    if df.empty:
+        logger.warning(f"📸 Chart {pair} ({tf}) tidak dikirim: data candle kosong.")
+        return None
+    key, image = get_chart_image(apply_indicators(df.copy()), pair, tf)
+    return outbox.enqueue_photo(image, chat_id, caption=caption or f"📈 {pair.upper()} ({tf})", cache_key=key)
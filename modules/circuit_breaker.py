@@ -0,0 +1,130 @@
+import time
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+# ========================================
+# ✅ Circuit breaker per pair
+# ========================================
+class PairCircuitBreaker:
+    """
+    Circuit breaker per pair dengan interval open eksponensial.
+
+    Setelah `failure_threshold` kegagalan berturut-turut pair masuk state OPEN
+    selama base_interval * 2^(n-1) detik (dibatasi max_interval). Setelah itu
+    satu request probe diizinkan (HALF_OPEN): sukses menutup breaker, gagal
+    membuka lagi dengan interval dua kali lipat.
+    """
+
+    def __init__(self, failure_threshold=2, base_interval=300, max_interval=6 * 3600):
+        self.failure_threshold = failure_threshold
+        self.base_interval = base_interval
+        self.max_interval = max_interval
+        self._lock = threading.Lock()
+        self._state = {}
+
+    def _entry(self, pair):
+        return self._state.setdefault(pair, {"state": CLOSED, "failures": 0, "opens": 0, "open_until": 0.0, "last_error": ""})
+
+    def allow(self, pair):
+        """True jika request untuk pair boleh dilakukan (mengklaim slot probe saat half-open)."""
+        with self._lock:
+            entry = self._state.get(pair)
+            if entry is None or entry["state"] == CLOSED:
+                return True
+            if entry["state"] == OPEN and time.monotonic() >= entry["open_until"]:
+                entry["state"] = HALF_OPEN
+                logger.info(f"🔎 Circuit breaker {pair} half-open, mengirim probe.")
+                return True
+            return False
+
+    def is_blocked(self, pair):
+        """Cek tanpa mengklaim probe (untuk melewati pair di loop scan)."""
+        with self._lock:
+            entry = self._state.get(pair)
+            if entry is None or entry["state"] == CLOSED:
+                return False
+            return entry["state"] == HALF_OPEN or time.monotonic() < entry["open_until"]
+
+    def record_success(self, pair):
+        with self._lock:
+            entry = self._state.get(pair)
+            if entry is not None:
+                if entry["state"] != CLOSED:
+                    logger.info(f"✅ Circuit breaker {pair} kembali closed.")
+                del self._state[pair]
+
+    def record_failure(self, pair, error=""):
+        with self._lock:
+            entry = self._entry(pair)
+            entry["failures"] += 1
+            entry["last_error"] = str(error)[:200]
+            if entry["state"] == HALF_OPEN or entry["failures"] >= self.failure_threshold:
+                entry["opens"] += 1
+                interval = min(self.max_interval, self.base_interval * 2 ** (entry["opens"] - 1))
+                entry["state"] = OPEN
+                entry["open_until"] = time.monotonic() + interval
+                logger.warning(f"⛔ Circuit breaker {pair} open selama {interval:.0f} detik: {entry['last_error']}")
+
+    def snapshot(self):
+        now = time.monotonic()
+        with self._lock:
+            return {
+                pair: {
+                    "state": entry["state"],
+                    "failures": entry["failures"],
+                    "retry_in": round(max(0.0, entry["open_until"] - now), 1),
+                    "last_error": entry["last_error"],
+                }
+                for pair, entry in self._state.items()
+            }
+
+
+# ========================================
+# ✅ Negative cache untuk hasil kosong
+# ========================================
+class NegativeCache:
+    """Ingat (pair, kind) yang baru saja mengembalikan data kosong selama `ttl` detik."""
+
+    def __init__(self, ttl=900):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._expiry = {}
+
+    def mark_empty(self, pair, kind="trades", ttl=None):
+        with self._lock:
+            self._expiry[(pair, kind)] = time.monotonic() + (ttl or self.ttl)
+
+    def is_empty(self, pair, kind="trades"):
+        with self._lock:
+            expiry = self._expiry.get((pair, kind))
+            if expiry is None:
+                return False
+            if time.monotonic() >= expiry:
+                del self._expiry[(pair, kind)]
+                return False
+            return True
+
+    def clear(self, pair, kind="trades"):
+        with self._lock:
+            self._expiry.pop((pair, kind), None)
+
+    def __len__(self):
+        now = time.monotonic()
+        with self._lock:
+            return sum(1 for expiry in self._expiry.values() if expiry > now)
+
+
+pair_breaker = PairCircuitBreaker()
+negative_cache = NegativeCache()
+
+
+def is_pair_skipped(pair, kind="trades"):
+    """True jika pair sedang di-negative-cache atau breaker-nya open."""
+    return negative_cache.is_empty(pair, kind) or pair_breaker.is_blocked(pair)
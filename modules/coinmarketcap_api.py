@@ -1,9 +1,17 @@
+import logging
 import requests
-import streamlit as st
 from datetime import datetime
 
-def get_coinmarketcap_info(symbol: str, debug=False):
-    headers = {"X-CMC_PRO_API_KEY": st.secrets["coinmarketcap"]["api_key"]}
+from modules.config import load_config
+from modules.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+@metrics.timer("fetch", endpoint="cmc")
+def get_coinmarketcap_info(symbol: str, debug=False, api_key=None):
+    if api_key is None:
+        api_key = load_config()["coinmarketcap_api_key"]
+    headers = {"X-CMC_PRO_API_KEY": api_key}
 
     try:
         # Step 1: Get ID from symbol
@@ -82,5 +90,5 @@ def get_coinmarketcap_info(symbol: str, debug=False):
         }
     except Exception as e:
         if debug:
-            st.error(f"❗ Exception: {e}")
+            logger.error(f"❗ Exception: {e}")
         return None
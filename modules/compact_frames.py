@@ -0,0 +1,178 @@
+import logging
+
+import numpy as np
+import pandas as pd
+
+from modules.pair_registry import pair_registry
+
+logger = logging.getLogger(__name__)
+
+# ========================================
+# 🗜️ Layout ringkas untuk frame candle & sinyal (opt-in)
+# ========================================
+# float32 hanya dipakai jika round-trip float64 -> float32 -> float64 masih
+# dalam toleransi relatif ini. Kolom harga OHLC lebih ketat: error harus di
+# bawah setengah tick harga (presisi dari registry pair), atau persis sama jika
+# semua nilainya bulat (harga IDR > 2^24 seperti BTC/IDR tetap float64).
+FLOAT32_RTOL = 1e-6
+PRICE_COLUMNS = ("open", "high", "low", "close")
+TIME_COLUMN = "ts"
+OHLCV_COLUMNS = ["date", "open", "high", "low", "close", "volume"]
+
+# Sinyal dari modules.signal_engine.scan_signals dipadatkan menjadi bitmask uint8
+SIGNAL_FLAGS = {
+    "macd_signal_label": (1 << 0, "Bullish Cross"),
+    "volume_spike_label": (1 << 1, "Volume Spike"),
+    "rsi_oversold": (1 << 2, "Oversold"),
+    "rsi_overbought": (1 << 3, "Overbought"),
+    "bb_breakout": (1 << 4, "Breakout"),
+    "bb_breakdown": (1 << 5, "Breakdown"),
+    "combo_spike": (1 << 6, "Strong Up Spike"),
+}
+SIGNAL_PRICE_COLUMNS = ["open", "high", "low", "close", "macd"]
+
+
+def _to_epoch_seconds(values):
+    return pd.to_datetime(values).to_numpy(dtype="datetime64[s]").astype(np.int64)
+
+
+def _price_tolerance(pair, values):
+    info = pair_registry.resolve(pair) if pair else None
+    if info is not None and info.price_decimals is not None:
+        return 0.5 * 10.0 ** -info.price_decimals
+    finite = values[np.isfinite(values)]
+    return 0.0 if finite.size and np.all(finite == np.round(finite)) else None
+
+
+def _downcast_floats(df, pair=None):
+    for col in df.columns:
+        values = df[col].to_numpy()
+        if values.dtype != np.float64:
+            continue
+        compact = values.astype(np.float32)
+        restored = compact.astype(np.float64)
+        atol = _price_tolerance(pair, values) if col in PRICE_COLUMNS else None
+        if atol is None:
+            fits = np.allclose(restored, values, rtol=FLOAT32_RTOL, atol=0.0, equal_nan=True)
+        else:
+            fits = np.allclose(restored, values, rtol=0.0, atol=atol, equal_nan=True)
+        if fits:
+            df[col] = compact
+    return df
+
+
+def compact_candles(df, pair=None):
+    """
+    Frame candle/indikator ringkas: kolom float -> float32 jika presisi cukup,
+    `date` -> `ts` int64 (epoch detik), pair disimpan sekali di `df.attrs`.
+    """
+    if df is None or df.empty:
+        return df
+    out = df.copy()
+    if "date" in out.columns:
+        out[TIME_COLUMN] = _to_epoch_seconds(out.pop("date"))
+    if "pair" in out.columns:
+        pair = pair or str(out["pair"].iloc[0])
+        out = out.drop(columns="pair")
+    if "volume_spike" in out.columns:
+        out["volume_spike"] = out["volume_spike"].astype(np.int8)
+    out = _downcast_floats(out, pair)
+    out.attrs["pair"] = pair
+    return out
+
+
+def expand_candles(df):
+    """Kebalikan compact_candles: kembalikan kolom `date` datetime untuk chart & indikator."""
+    if df is None or df.empty or TIME_COLUMN not in df.columns:
+        return df
+    out = df.copy()
+    out.insert(0, "date", pd.to_datetime(out.pop(TIME_COLUMN), unit="s"))
+    return out
+
+
+def candle_frames(with_indicators, compact=False):
+    """
+    Frame indikator (biasa atau ringkas) -> (frame candle, frame indikator).
+    Mode ringkas mengembalikan frame candle None (diturunkan saat dibaca lewat
+    expand_candle_frames); pair tanpa candle (frame kosong, bisa tanpa kolom)
+    selalu menjadi (kosong, kosong) di kedua mode.
+    """
+    if with_indicators is None or with_indicators.empty:
+        empty = pd.DataFrame(columns=OHLCV_COLUMNS)
+        return empty, empty
+    if compact:
+        return None, with_indicators
+    return with_indicators[OHLCV_COLUMNS], with_indicators
+
+
+def expand_candle_frames(candle_df, with_indicators):
+    """Pasangan dari candle_frames/cache -> frame candle & indikator dengan kolom `date` untuk chart."""
+    if candle_df is not None:
+        return candle_df, with_indicators
+    with_indicators = expand_candles(with_indicators)
+    if with_indicators is None or with_indicators.empty:
+        empty = pd.DataFrame(columns=OHLCV_COLUMNS)
+        return empty, empty
+    return with_indicators[OHLCV_COLUMNS], with_indicators
+
+
+def compact_signals(signals):
+    """
+    Frame sinyal ringkas: label string per baris -> satu kolom bitmask `signal_flags`
+    (uint8), `timestamp` -> `ts` int64, pair di `attrs`.
+    """
+    if signals is None or signals.empty:
+        return signals
+    flags = np.zeros(len(signals), dtype=np.uint8)
+    for col, (bit, label) in SIGNAL_FLAGS.items():
+        source = "rsi_signal" if col.startswith("rsi_") else col
+        if source in signals.columns:
+            flags |= np.where(signals[source].to_numpy() == label, bit, 0).astype(np.uint8)
+
+    out = signals[[col for col in SIGNAL_PRICE_COLUMNS if col in signals.columns]].copy()
+    out["signal_flags"] = flags
+    if "timestamp" in signals.columns and pd.api.types.is_datetime64_any_dtype(signals["timestamp"]):
+        out[TIME_COLUMN] = _to_epoch_seconds(signals["timestamp"])
+    pair = str(signals["pair"].iloc[0]) if "pair" in signals.columns else None
+    out = _downcast_floats(out, pair)
+    out.attrs["pair"] = pair
+    return out
+
+
+def signal_labels(flags):
+    """Dekode bitmask menjadi label gabungan ("Bullish Cross, Volume Spike") sebagai kategori."""
+    flags = np.asarray(flags, dtype=np.uint8)
+    labels = np.full(len(flags), "", dtype=object)
+    for bit, label in SIGNAL_FLAGS.values():
+        hit = (flags & bit) != 0
+        labels[hit] = np.where(labels[hit] == "", label, labels[hit] + ", " + label)
+    return pd.Categorical(labels)
+
+
+# ========================================
+# 📊 Laporan memori sebelum/sesudah
+# ========================================
+def frame_bytes(df):
+    return 0 if df is None else int(df.memory_usage(deep=True, index=True).sum())
+
+
+def memory_report(frames):
+    """
+    Bandingkan footprint per pair.
+
+    Args:
+        frames (dict): {pair: [(candle_df, signals_df), ...]} satu tuple per timeframe.
+
+    Returns:
+        pd.DataFrame: byte sebelum/sesudah per pair + rasio, diurutkan dari yang terbesar.
+    """
+    rows = []
+    for pair, items in frames.items():
+        before = after = 0
+        for candles, signals in items:
+            before += frame_bytes(candles) + frame_bytes(signals)
+            after += frame_bytes(compact_candles(candles, pair)) + frame_bytes(compact_signals(signals))
+        rows.append({"pair": pair, "bytes_sebelum": before, "bytes_sesudah": after,
+                     "rasio": round(before / after, 2) if after else np.nan})
+    report = pd.DataFrame(rows).set_index("pair")
+    return report.sort_values("bytes_sebelum", ascending=False)
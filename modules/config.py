@@ -0,0 +1,101 @@
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+# ========================================
+# ⚙️ Konfigurasi tanpa Streamlit (TOML + env)
+# ========================================
+DEFAULT_CONFIG_PATH = os.path.join(".streamlit", "secrets.toml")
+ENV_PREFIX = "READONETRADE_"
+
+CONFIG_KEYS = ["exchange", "api_key", "api_secret", "telegram_token", "telegram_chat_id", "indodax_ws_url", "indodax_ws_token", "shared_cache_dir", "depth_bands"]
+# Opsi boolean (nilai "1"/"true"/"yes"/"on" dianggap aktif)
+FLAG_KEYS = ["compact_frames", "profiling_admin", "market_stream", "history_backfill", "shared_cache", "scan_screening"]
+# Opsi bilangan bulat (nilai tidak valid -> default)
+INT_KEYS = {"indicator_workers": 0, "metrics_port": 0, "frame_cache_mb": 256, "depth_pairs": 100}
+# Opsi bilangan desimal (ambang screening auto-scan, lihat modules.screener)
+FLOAT_KEYS = {
+    "screen_min_change_pct": 1.5,
+    "screen_min_range_pct": 4.0,
+    "screen_edge_fraction": 0.1,
+    "screen_min_volume_delta_pct": 20.0,
+    "screen_min_vol_idr": 0.0,
+}
+
+_config_cache = {}
+
+
+def _read_toml(path):
+    try:
+        import tomllib
+    except ImportError:  # Python < 3.11
+        try:
+            import tomli as tomllib
+        except ImportError:
+            logger.warning("tomllib/tomli tidak tersedia, file konfigurasi TOML dilewati.")
+            return {}
+
+    try:
+        with open(path, "rb") as f:
+            return tomllib.load(f)
+    except FileNotFoundError:
+        logger.info(f"File konfigurasi '{path}' tidak ditemukan, hanya memakai environment variable.")
+        return {}
+    except Exception as e:
+        logger.error(f"Gagal membaca file konfigurasi '{path}': {e}")
+        return {}
+
+
+def config_from_mapping(raw):
+    """
+    Satu titik coerce tipe untuk semua sumber konfigurasi (TOML mentah atau
+    `st.secrets`), ditimpa environment variable READONETRADE_<KEY>. Nilai
+    tidak valid jatuh ke default dengan peringatan, tidak pernah menaikkan error.
+
+    Returns:
+        dict: Konfigurasi dengan kunci CONFIG_KEYS, FLAG_KEYS, INT_KEYS, FLOAT_KEYS + "coinmarketcap_api_key".
+    """
+    config = {key: raw.get(key, "") for key in CONFIG_KEYS}
+    config["coinmarketcap_api_key"] = (raw.get("coinmarketcap") or {}).get("api_key", "")
+    config.update({key: raw.get(key, False) for key in FLAG_KEYS})
+    config.update({key: raw.get(key, default) for key, default in INT_KEYS.items()})
+    config.update({key: raw.get(key, default) for key, default in FLOAT_KEYS.items()})
+
+    for key in list(config):
+        env_value = os.environ.get(f"{ENV_PREFIX}{key.upper()}")
+        if env_value is not None:
+            config[key] = env_value
+    for key in FLAG_KEYS:
+        config[key] = str(config[key]).strip().lower() in ("1", "true", "yes", "on")
+    for keys, cast in ((INT_KEYS, int), (FLOAT_KEYS, float)):
+        for key, default in keys.items():
+            try:
+                config[key] = cast(config[key])
+            except (TypeError, ValueError):
+                logger.warning(f"Nilai '{key}' tidak valid ({config[key]!r}), memakai {default}.")
+                config[key] = default
+    return config
+
+
+def load_config(path=None, reload=False):
+    """
+    Muat konfigurasi aplikasi tanpa mengimpor Streamlit.
+
+    Urutan prioritas: environment variable (READONETRADE_<KEY>) lalu file TOML
+    (default `.streamlit/secrets.toml`, bisa diganti lewat READONETRADE_CONFIG).
+
+    Args:
+        path (str): Path file TOML (opsional).
+        reload (bool): Paksa baca ulang walaupun sudah ada di cache.
+
+    Returns:
+        dict: lihat config_from_mapping.
+    """
+    path = path or os.environ.get(f"{ENV_PREFIX}CONFIG", DEFAULT_CONFIG_PATH)
+    if not reload and path in _config_cache:
+        return dict(_config_cache[path])
+
+    config = config_from_mapping(_read_toml(path))
+    _config_cache[path] = config
+    return dict(config)
@@ -0,0 +1,170 @@
+import os
+import json
+import time
+import atexit
+import sqlite3
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# ========================================
+# 🗒️ Event log terstruktur (SQLite WAL, tulis batch)
+# ========================================
+EVENT_LOG_PATH = os.path.join("data", "events.sqlite3")
+FLUSH_INTERVAL_SECONDS = 2.0
+MAX_BATCH_SIZE = 500
+RETENTION_DAYS = 90
+PRUNE_INTERVAL_SECONDS = 3600
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id      INTEGER PRIMARY KEY,
+    ts      REAL NOT NULL,
+    pair    TEXT NOT NULL,
+    kind    TEXT NOT NULL,
+    source  TEXT NOT NULL DEFAULT '',
+    tf      TEXT NOT NULL DEFAULT '',
+    signals TEXT NOT NULL DEFAULT '[]',
+    message TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_events_pair_ts ON events (pair, ts);
+CREATE INDEX IF NOT EXISTS idx_events_ts ON events (ts);
+"""
+
+
+class EventLog:
+    """
+    Log alert/sinyal append-only. `log()` hanya menaruh event di buffer memori;
+    worker latar belakang menulisnya per batch dalam satu transaksi. Event yang
+    lebih tua dari `retention_days` dihapus berkala.
+    """
+
+    def __init__(self, path=EVENT_LOG_PATH, flush_interval=FLUSH_INTERVAL_SECONDS,
+                 max_batch=MAX_BATCH_SIZE, retention_days=RETENTION_DAYS):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.retention_days = retention_days
+        self._cond = threading.Condition()
+        self._db_lock = threading.Lock()
+        self._buffer = []
+        self._thread = None
+        self._last_prune = 0.0
+        self._written = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    # --- Tulis ---------------------------------------------------------
+    def start(self):
+        with self._cond:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="event-log", daemon=True)
+                self._thread.start()
+        return self
+
+    def log(self, kind, pair, message="", signals=None, source="", tf="", ts=None):
+        row = (ts or time.time(), str(pair).lower(), kind, source, tf, json.dumps(list(signals or []), ensure_ascii=False), message)
+        with self._cond:
+            self._buffer.append(row)
+            if len(self._buffer) >= self.max_batch:
+                self._cond.notify_all()
+
+    def flush(self):
+        """Tulis semua event di buffer sekarang juga (dipakai sebelum query & saat exit)."""
+        with self._cond:
+            rows, self._buffer = self._buffer, []
+        self._write(rows)
+
+    def _write(self, rows):
+        if not rows:
+            return
+        try:
+            with self._db_lock, self._conn:
+                self._conn.executemany(
+                    "INSERT INTO events (ts, pair, kind, source, tf, signals, message) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+            self._written += len(rows)
+        except sqlite3.Error as e:
+            logger.error(f"Gagal menulis {len(rows)} event ke {self.path}: {e}")
+
+    def prune(self, now=None):
+        cutoff = (now or time.time()) - self.retention_days * 86400
+        try:
+            with self._db_lock, self._conn:
+                deleted = self._conn.execute("DELETE FROM events WHERE ts < ?", (cutoff,)).rowcount
+            if deleted:
+                logger.info(f"🧹 {deleted} event lebih tua dari {self.retention_days} hari dihapus.")
+            return deleted
+        except sqlite3.Error as e:
+            logger.error(f"Gagal menghapus event lama: {e}")
+            return 0
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait(self.flush_interval)
+            self.flush()
+            if time.time() - self._last_prune >= PRUNE_INTERVAL_SECONDS:
+                self._last_prune = time.time()
+                self.prune()
+
+    # --- Query ---------------------------------------------------------
+    def query(self, pair=None, since=None, until=None, kind=None, limit=100):
+        """
+        Event terbaru lebih dulu. Filter pair + rentang waktu memakai index (pair, ts).
+
+        Returns:
+            list[dict]: ts, pair, kind, source, tf, signals (list), message
+        """
+        self.flush()
+        clauses, params = [], []
+        if pair:
+            clauses.append("pair = ?")
+            params.append(str(pair).lower())
+        if since is not None:
+            clauses.append("ts >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("ts < ?")
+            params.append(until)
+        if kind:
+            clauses.append("kind = ?")
+            params.append(kind)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        sql = f"SELECT ts, pair, kind, source, tf, signals, message FROM events {where} ORDER BY ts DESC LIMIT ?"
+        with self._db_lock:
+            rows = self._conn.execute(sql, (*params, int(limit))).fetchall()
+        return [
+            {"ts": ts, "pair": p, "kind": k, "source": src, "tf": tf, "signals": json.loads(signals), "message": message}
+            for ts, p, k, src, tf, signals, message in rows
+        ]
+
+    def recent_alerts(self, pair, days=7, limit=50):
+        return self.query(pair=pair, since=time.time() - days * 86400, limit=limit)
+
+    def stats(self):
+        with self._cond:
+            pending = len(self._buffer)
+        return {"pending": pending, "written": self._written}
+
+
+_event_log = None
+_event_log_lock = threading.Lock()
+
+
+def get_event_log(path=EVENT_LOG_PATH):
+    """Event log tunggal per proses; buffer di-flush otomatis saat proses berakhir."""
+    global _event_log
+    with _event_log_lock:
+        if _event_log is None:
+            _event_log = EventLog(path)
+            atexit.register(_event_log.flush)
+        return _event_log.start()
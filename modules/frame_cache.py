@@ -0,0 +1,148 @@
+import sys
+import logging
+import threading
+from collections import OrderedDict
+
+from modules.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# ========================================
+# 🧠 Cache frame candle + indikator per (pair, timeframe), dibatasi total byte
+# ========================================
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+_MISSING = object()
+
+
+def object_bytes(value):
+    """Perkiraan footprint memori: DataFrame/Series (deep), array numpy, tuple/list dijumlahkan."""
+    if value is None:
+        return 0
+    if isinstance(value, (tuple, list)):
+        return sum(object_bytes(item) for item in value)
+    if hasattr(value, "memory_usage"):
+        usage = value.memory_usage(index=True, deep=True)
+        return int(usage.sum() if hasattr(usage, "sum") else usage)
+    if hasattr(value, "nbytes"):
+        return int(value.nbytes)
+    return sys.getsizeof(value)
+
+
+class FrameCache:
+    """
+    LRU dengan anggaran byte (bukan jumlah entri): entri terlama dibuang sampai
+    total ukuran <= `max_bytes`, jadi satu frame 1D panjang "memakan" jatah
+    sebanyak puluhan frame 5min pendek.
+
+    Setiap entri membawa `stamp` (mis. indeks candle berjalan + generation stream);
+    get() dengan stamp berbeda = candle baru sudah masuk, entri lama dibuang.
+    Nilai yang dikembalikan dibagi antar pemanggil: perlakukan sebagai read-only.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, name="frames"):
+        self.max_bytes = int(max_bytes)
+        self.name = name
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (stamp, value, nbytes)
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+        self.rejected = 0
+
+    def _drop(self, key):
+        _, _, nbytes = self._entries.pop(key)
+        self._bytes -= nbytes
+
+    def _publish(self):
+        metrics.set_gauge("frame_cache_bytes", self._bytes, cache=self.name)
+        metrics.set_gauge("frame_cache_entries", len(self._entries), cache=self.name)
+
+    def get(self, key, stamp, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] != stamp:
+                self._drop(key)
+                self.invalidations += 1
+                metrics.inc("frame_cache_invalidations", cache=self.name)
+                self._publish()
+                entry = None
+            if entry is None:
+                self.misses += 1
+                metrics.inc("frame_cache_misses", cache=self.name)
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+        metrics.inc("frame_cache_hits", cache=self.name)
+        return entry[1]
+
+    def put(self, key, stamp, value, nbytes=None):
+        """Simpan `value`; frame yang lebih besar dari seluruh anggaran tidak disimpan."""
+        nbytes = object_bytes(value) if nbytes is None else int(nbytes)
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            if nbytes > self.max_bytes:
+                self.rejected += 1
+                logger.debug(f"Frame {key} ({nbytes} byte) melebihi anggaran cache {self.max_bytes} byte, tidak disimpan.")
+                return value
+            self._entries[key] = (stamp, value, nbytes)
+            self._bytes += nbytes
+            evicted = 0
+            while self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                evicted += 1
+            self.evictions += evicted
+            self._publish()
+        if evicted:
+            metrics.inc("frame_cache_evictions", evicted, cache=self.name)
+        return value
+
+    def get_or_compute(self, key, stamp, compute):
+        """Hit: nilai tersimpan; miss/stamp basi: hitung ulang lalu simpan."""
+        value = self.get(key, stamp, _MISSING)
+        if value is _MISSING:
+            value = self.put(key, stamp, compute())
+        return value
+
+    def invalidate(self, pair=None):
+        """Buang entri satu pair (key[0] == pair) atau semuanya."""
+        with self._lock:
+            keys = [key for key in self._entries if pair is None or key[0] == pair]
+            for key in keys:
+                self._drop(key)
+            self._publish()
+        return len(keys)
+
+    clear = invalidate
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "invalidations": self.invalidations,
+                "evictions": self.evictions,
+                "rejected": self.rejected,
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_frame_cache(max_bytes=DEFAULT_MAX_BYTES):
+    """Cache tunggal per proses (bertahan antar rerun Streamlit); anggaran ikut nilai terbaru."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = FrameCache(max_bytes)
+        elif _cache.max_bytes != int(max_bytes):
+            _cache.max_bytes = int(max_bytes)
+        return _cache
@@ -32,6 +32,12 @@ def apply_indicators(df):
         df['bb_upper'] = ta.volatility.bollinger_hband(df['close'])
         df['bb_lower'] = ta.volatility.bollinger_lband(df['close'])
 
+        # Alur transaksi (dari agregasi trades, tanpa fetch tambahan)
+        if {'taker_buy_volume', 'taker_sell_volume', 'vwap'}.issubset(df.columns):
+            taker_total = df['taker_buy_volume'] + df['taker_sell_volume']
+            df['taker_buy_ratio'] = df['taker_buy_volume'] / taker_total.where(taker_total > 0)
+            df['vwap_deviation'] = (df['close'] - df['vwap']) / df['vwap'] * 100
+
         return df
 
     except Exception as e:
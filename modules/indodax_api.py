@@ -1,14 +1,19 @@
-import requests
+import numpy as np
 import pandas as pd
 import json
 import logging
 
+from modules.circuit_breaker import negative_cache, pair_breaker
+from modules.timeframes import timeframe_seconds
+from modules.metrics import timed
+from modules.rate_limiter import governed_get
+
 logger = logging.getLogger(__name__)
 
 def load_indodax_pairs():
     url = "https://indodax.com/api/tickers"
     try:
-        response = requests.get(url)
+        response = governed_get(url, "ticker")
         response.raise_for_status()
         data = response.json()
         return sorted(data["tickers"].keys())
@@ -16,13 +21,26 @@ def load_indodax_pairs():
         logger.error(f"Gagal mengambil daftar pair: {e}")
         return []
 
+# Metadata semua pair (presisi harga/volume, base/quote) untuk registry pair
+def load_indodax_pair_metadata():
+    url = "https://indodax.com/api/pairs"
+    try:
+        response = governed_get(url, "public")
+        response.raise_for_status()
+        data = response.json()
+        return data if isinstance(data, list) else []
+    except Exception as e:
+        logger.error(f"Gagal mengambil metadata pair: {e}")
+        return []
+
 # Fungsi untuk mendapatkan summary dari pair tertentu
 def get_indodax_summary(pair):
     url = f"https://indodax.com/api/{pair}/ticker"
     try:
-        response = requests.get(url)
-        response.raise_for_status()
-        json_data = response.json()
+        with timed("fetch", endpoint="ticker", pair=pair):
+            response = governed_get(url, "ticker")
+            response.raise_for_status()
+            json_data = response.json()
         if "ticker" not in json_data:
             raise ValueError(f"Pair '{pair}' tidak ditemukan atau tidak valid.")
         data = json_data["ticker"]
@@ -39,19 +57,74 @@ def get_indodax_summary(pair):
         logger.error(f"Gagal mengambil data ticker dari Indodax: {e}")
         raise RuntimeError from e
 
+# ==========================================================
+# Trades -> array NumPy & agregasi candle satu lintasan
+# ==========================================================
+# `type` trade Indodax = sisi taker: "buy" memakan ask, "sell" memakan bid
+TRADE_SIDES = {"buy": 1, "sell": -1}
+# Kolom alur transaksi per candle yang ikut dihitung bersama OHLCV
+FLOW_COLUMNS = ['taker_buy_volume', 'taker_sell_volume', 'cvd', 'vwap', 'trade_count']
+
+def _numeric_array(values):
+    try:
+        return np.asarray(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        return pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(dtype=np.float64)
+
+def parse_trades(trades):
+    """
+    List trade /trades -> (ts detik int64, price, amount, side int8: 1 buy, -1 sell, 0 lainnya),
+    urut dari yang terlama. Baris dengan date/price/amount tidak valid dibuang.
+    """
+    # /trades terbaru dulu: dibalik lalu sort stabil agar urutan dalam detik yang sama tetap benar
+    trades = trades[::-1]
+    ts = _numeric_array([t.get('date') for t in trades])
+    price = _numeric_array([t.get('price') for t in trades])
+    amount = _numeric_array([t.get('amount') for t in trades])
+    side = np.fromiter((TRADE_SIDES.get(t.get('type'), 0) for t in trades), dtype=np.int8, count=len(trades))
+    valid = np.isfinite(ts) & np.isfinite(price) & np.isfinite(amount)
+    ts = ts[valid].astype(np.int64)
+    order = np.argsort(ts, kind='stable')
+    return ts[order], price[valid][order], amount[valid][order], side[valid][order]
+
+def aggregate_candles(ts, price, amount, side, tf_seconds):
+    """
+    Satu lintasan atas trades terurut (np.*.reduceat per batas candle): OHLCV +
+    volume taker buy/sell, CVD (kumulatif buy - sell), VWAP dan jumlah trade.
+    Candle tanpa trade tidak dibuat (sama seperti resample().ohlc().dropna()).
+    """
+    bucket = ts // tf_seconds
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    ends = np.r_[starts[1:], len(ts)] - 1
+    volume = np.add.reduceat(amount, starts)
+    taker_buy = np.add.reduceat(np.where(side > 0, amount, 0.0), starts)
+    taker_sell = np.add.reduceat(np.where(side < 0, amount, 0.0), starts)
+    notional = np.add.reduceat(price * amount, starts)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        vwap = np.where(volume > 0, notional / volume, price[ends])
+    return pd.DataFrame({
+        'date': pd.to_datetime(bucket[starts] * tf_seconds, unit='s'),
+        'open': price[starts],
+        'high': np.maximum.reduceat(price, starts),
+        'low': np.minimum.reduceat(price, starts),
+        'close': price[ends],
+        'volume': volume,
+        'taker_buy_volume': taker_buy,
+        'taker_sell_volume': taker_sell,
+        'cvd': np.cumsum(taker_buy - taker_sell),
+        'vwap': vwap,
+        'trade_count': ends - starts + 1,
+    })
+
 # Fungsi untuk mendapatkan volume perdagangan buy dan sell dari pair tertentu
 def get_trade_volume(pair):
     url = f"https://indodax.com/api/{pair}/trades"
     try:
-        response = requests.get(url)
+        response = governed_get(url, "trades")
         response.raise_for_status()
-        trades = response.json()
-        df = pd.DataFrame(trades)
-        df["price"] = df["price"].astype(float)
-        df["amount"] = df["amount"].astype(float)
-        df["type"] = df["type"].astype(str)
-        buy_volume = df[df["type"] == "buy"]["amount"].sum()
-        sell_volume = df[df["type"] == "sell"]["amount"].sum()
+        _, _, amount, side = parse_trades(response.json())
+        # Satu bincount: indeks 0 = sell, 1 = tanpa sisi, 2 = buy
+        sell_volume, _, buy_volume = np.bincount(side + 1, weights=amount, minlength=3)
         return buy_volume, sell_volume
     except Exception as e:
         logger.error(f"Gagal mengambil data volume perdagangan: {e}")
@@ -61,31 +134,35 @@ def get_trade_volume(pair):
 def fetch_all_tickers():
     url = "https://indodax.com/api/tickers"
     try:
-        response = requests.get(url)
-        response.raise_for_status()
-        data = response.json()["tickers"]
+        with timed("fetch", endpoint="tickers"):
+            response = governed_get(url, "ticker")
+            response.raise_for_status()
+            data = response.json()["tickers"]
 
         tickers_data = {}
-        for pair, info in data.items():
-            try:
-                high = float(info.get("high", 0))
-                low = float(info.get("low", 0))
-                last = float(info.get("last", 0))
-                buy = float(info.get("buy", 0))
-                sell = float(info.get("sell", 0))
-                vol_idr = float(info.get("vol_idr", 0))
-
-                tickers_data[pair] = {
-                    "last": last,
-                    "change": ((last - low) / low * 100) if low else 0,
-                    "vol_idr": vol_idr,
-                    "buy": buy,
-                    "sell": sell
-                }
-
-            except (ValueError, TypeError) as e:
-                logger.warning(f"Gagal parsing data untuk pair {pair}: {e}")
-                continue
+        with timed("parse", endpoint="tickers"):
+            for pair, info in data.items():
+                try:
+                    high = float(info.get("high", 0))
+                    low = float(info.get("low", 0))
+                    last = float(info.get("last", 0))
+                    buy = float(info.get("buy", 0))
+                    sell = float(info.get("sell", 0))
+                    vol_idr = float(info.get("vol_idr", 0))
+
+                    tickers_data[pair] = {
+                        "last": last,
+                        "high": high,
+                        "low": low,
+                        "change": ((last - low) / low * 100) if low else 0,
+                        "vol_idr": vol_idr,
+                        "buy": buy,
+                        "sell": sell
+                    }
+
+                except (ValueError, TypeError) as e:
+                    logger.warning(f"Gagal parsing data untuk pair {pair}: {e}")
+                    continue
 
         return tickers_data
 
@@ -93,58 +170,65 @@ def fetch_all_tickers():
         logger.error(f"Gagal mengambil data tickers: {e}")
         return {}
 
+# Order book (depth) satu pair: {"buy": [[harga, jumlah], ...], "sell": [...]}
+def fetch_depth(pair):
+    url = f"https://indodax.com/api/{pair}/depth"
+    with timed("fetch", endpoint="depth", pair=pair):
+        response = governed_get(url, "depth")
+        response.raise_for_status()
+        data = response.json()
+    if isinstance(data, dict) and "error" in data:
+        raise ValueError(f"Indodax error untuk {pair}: {data.get('error_description', data['error'])}")
+    return data
+
 # Fungsi untuk mendapatkan data candlestick (ohlc) dari pair tertentu
-def get_candlestick_data(pair, tf='5min'):
+def get_candlestick_data(pair, tf='5min', limit=None):
+    # Lewati round-trip untuk pair yang baru saja kosong atau breaker-nya open
+    if negative_cache.is_empty(pair, "trades"):
+        return pd.DataFrame()
+    if not pair_breaker.allow(pair):
+        return pd.DataFrame()
+
     url = f"https://indodax.com/api/{pair}/trades"
     try:
-        response = requests.get(url)
-        response.raise_for_status()
-        trades = response.json()
-        
+        with timed("fetch", endpoint="trades", pair=pair, tf=tf):
+            response = governed_get(url, "trades")
+            response.raise_for_status()
+            trades = response.json()
+
+        if isinstance(trades, dict) and "error" in trades:
+            raise ValueError(f"Indodax error untuk {pair}: {trades.get('error_description', trades['error'])}")
+
         if not trades:
             logger.warning(f"Data trades kosong untuk candlestick {pair}")
+            negative_cache.mark_empty(pair, "trades")
+            pair_breaker.record_success(pair)
             return pd.DataFrame()
         
-        df = pd.DataFrame(trades)
-        if df.empty or not {'date', 'price', 'amount'}.issubset(df.columns):
-            logger.warning(f"Data candlestick tidak lengkap untuk {pair}")
-            return pd.DataFrame()
-
-        df['date'] = pd.to_datetime(df['date'], unit='s', errors='coerce')
-        df.dropna(subset=['date'], inplace=True)
-        df['price'] = pd.to_numeric(df['price'], errors='coerce')
-        df['amount'] = pd.to_numeric(df['amount'], errors='coerce')
-        df.dropna(subset=['price', 'amount'], inplace=True)
-
-        if df.empty:
+        with timed("parse", endpoint="trades", pair=pair, tf=tf):
+            if not isinstance(trades, list) or not {'date', 'price', 'amount'}.issubset(trades[0]):
+                logger.warning(f"Data candlestick tidak lengkap untuk {pair}")
+                pair_breaker.record_failure(pair, "data trades tidak lengkap")
+                return pd.DataFrame()
+            ts, price, amount, side = parse_trades(trades)
+
+        if len(ts) == 0:
+            pair_breaker.record_failure(pair, "semua baris trades tidak valid")
             return pd.DataFrame()
 
-        df.set_index('date', inplace=True)
+        with timed("resample", pair=pair, tf=tf):
+            ohlc = aggregate_candles(ts, price, amount, side, timeframe_seconds(tf))
+        if limit:
+            ohlc = ohlc.tail(limit).reset_index(drop=True)
 
-        ohlc = df['price'].resample(tf).ohlc().dropna()
-        ohlc['volume'] = df['amount'].resample(tf).sum()
-
-        return ohlc.reset_index()
+        pair_breaker.record_success(pair)
+        return ohlc
 
     except Exception as e:
         logger.error(f"Gagal mengambil data candlestick: {e}")
+        pair_breaker.record_failure(pair, e)
         return pd.DataFrame()
 
-# Fungsi untuk mendapatkan top movers
-def get_top_movers(tickers):
-    try:
-        top_gainers = sorted(tickers.items(), key=lambda x: x[1]["change"], reverse=True)[:10]
-        top_losers = sorted(tickers.items(), key=lambda x: x[1]["change"])[:10]
-        top_volume = sorted(tickers.items(), key=lambda x: x[1]["vol_idr"], reverse=True)[:10]
-        return (
-            pd.DataFrame(dict(top_gainers)).T,
-            pd.DataFrame(dict(top_losers)).T,
-            pd.DataFrame(dict(top_volume)).T,
-        )
-    except Exception as e:
-        logger.error(f"Gagal memproses data top movers: {e}")
-        return pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
-
 # ==========================================================
 def estimate_open_from_summary(high, low, last):
     """
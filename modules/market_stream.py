@@ -0,0 +1,365 @@
+import json
+import time
+import random
+import asyncio
+import logging
+import threading
+
+from modules.metrics import inc
+from modules.timeframes import timeframe_seconds
+
+logger = logging.getLogger(__name__)
+
+# ========================================
+# 📡 Streaming data pasar lewat WebSocket Indodax (polling jadi fallback)
+# ========================================
+# Indodax memakai protokol JSON Centrifugo: kirim {"params": {"token": ...}, "id": 1}
+# lalu subscribe {"method": 1, "params": {"channel": ...}, "id": n}. Publikasi datang
+# sebagai {"result": {"channel": ..., "data": {"data": [...], "offset": N}}}.
+DEFAULT_WS_URL = "wss://ws3.indodax.com/ws/"
+SUMMARY_CHANNEL = "market:summary-24h"
+TICK_CHANNEL_PREFIX = "chart:tick-"
+# Data dianggap basi (fallback ke polling) jika tidak ada pesan selama ini
+STALE_AFTER_SECONDS = 30
+CONNECT_TIMEOUT_SECONDS = 10
+RECONNECT_BASE_SECONDS = 1.0
+RECONNECT_MAX_SECONDS = 60.0
+# Sesi yang bertahan selama ini dianggap stabil: backoff kembali ke awal
+STABLE_SESSION_SECONDS = 30
+READ_POLL_SECONDS = 1.0
+
+def channel_pair_id(pair):
+    """btc_idr -> btcidr (format id pair di channel WebSocket)."""
+    return str(pair).lower().replace("_", "")
+
+
+class StreamState:
+    """
+    State pasar in-memory yang diperbarui per event: ticker 24 jam semua pair
+    dan candle yang sedang berjalan untuk (pair, timeframe) yang dilacak.
+    Aman diakses dari thread Streamlit maupun thread stream.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.tickers = {}
+        self._candles = {}
+        self._tracked = {}
+        self._tracked_since = {}
+        self._last_seq = {}
+        self._offsets = {}
+        self._generation = {}
+        self.connected = False
+        self.last_message_at = 0.0
+        self.messages = 0
+        self.gaps = 0
+        self.reconnects = 0
+
+    # --- Pelacakan ----------------------------------------------------
+    def track(self, pair, timeframes):
+        """Lacak candle berjalan `pair` untuk `timeframes`; True jika ada yang baru."""
+        with self._lock:
+            known = self._tracked.setdefault(pair, set())
+            new = set(timeframes) - known
+            known.update(new)
+            self._tracked_since.setdefault(pair, time.time())
+            return bool(new)
+
+    def tracked_pairs(self):
+        with self._lock:
+            return list(self._tracked)
+
+    def generation(self, pair):
+        """Naik setiap kali stream pair ini terputus/bolong; dipakai sebagai kunci cache REST."""
+        with self._lock:
+            return self._generation.get(pair, 0)
+
+    def mark_resync(self, pairs):
+        with self._lock:
+            for pair in pairs:
+                self._generation[pair] = self._generation.get(pair, 0) + 1
+                self._tracked_since[pair] = time.time()
+                for key in [key for key in self._candles if key[0] == pair]:
+                    del self._candles[key]
+
+    # --- Event --------------------------------------------------------
+    def check_offset(self, channel, offset):
+        """
+        Returns:
+            int | None: jumlah publikasi yang terlewat (0 = berurutan), None jika duplikat.
+        """
+        with self._lock:
+            last = self._offsets.get(channel)
+            if last is not None and offset <= last:
+                return None
+            self._offsets[channel] = offset
+            return 0 if last is None else offset - last - 1
+
+    def reset_offsets(self):
+        with self._lock:
+            self._offsets.clear()
+
+    def apply_summary(self, rows):
+        """Baris market:summary-24h: [pair, ts, last, low, high, harga 24j lalu, vol IDR, vol koin]."""
+        with self._lock:
+            for row in rows:
+                try:
+                    pair_id, ts = str(row[0]), int(row[1])
+                    last, low, high, open_24h = (float(v) for v in row[2:6])
+                    vol_idr, vol_coin = float(row[6]), float(row[7])
+                except (IndexError, TypeError, ValueError):
+                    continue
+                self.tickers[pair_id] = {
+                    "high": high,
+                    "low": low,
+                    "last": last,
+                    "open": open_24h,
+                    "vol_idr": vol_idr,
+                    "vol_btc": vol_coin,
+                    "percent": (last - open_24h) / open_24h * 100 if open_24h else 0,
+                    "ts": ts,
+                }
+
+    def apply_trades(self, rows):
+        """Baris chart:tick-<pair>: [ts, id trade, pair, harga, jumlah koin]."""
+        with self._lock:
+            for row in rows:
+                try:
+                    ts, seq, pair_id = int(row[0]), int(row[1]), str(row[2])
+                    price, amount = float(row[3]), float(row[4])
+                except (IndexError, TypeError, ValueError):
+                    continue
+                pair = next((p for p in self._tracked if channel_pair_id(p) == pair_id), None)
+                if pair is None or seq <= self._last_seq.get(pair, -1):
+                    continue
+                self._last_seq[pair] = seq
+                ticker = self.tickers.get(pair_id)
+                if ticker is not None and ts >= ticker["ts"]:
+                    ticker["last"] = price
+                    ticker["high"] = max(ticker["high"], price)
+                    ticker["low"] = min(ticker["low"], price) if ticker["low"] else price
+                for tf in self._tracked[pair]:
+                    self._update_candle(pair, tf, ts, price, amount)
+
+    def _update_candle(self, pair, tf, ts, price, amount):
+        seconds = timeframe_seconds(tf)
+        start = ts - ts % seconds
+        candle = self._candles.get((pair, tf))
+        if candle is not None and start < candle["start"]:
+            return  # trade terlambat untuk candle yang sudah ditutup
+        if candle is None or start > candle["start"]:
+            self._candles[(pair, tf)] = {
+                "start": start, "open": price, "high": price, "low": price, "close": price, "volume": amount,
+                # Lengkap = stream sudah berjalan sejak candle dibuka, bisa menggantikan data polling
+                "complete": self._tracked_since.get(pair, ts) <= start,
+            }
+            return
+        candle["high"] = max(candle["high"], price)
+        candle["low"] = min(candle["low"], price)
+        candle["close"] = price
+        candle["volume"] += amount
+
+    # --- Baca ---------------------------------------------------------
+    def is_live(self, now=None):
+        return self.connected and (now or time.time()) - self.last_message_at < STALE_AFTER_SECONDS
+
+    def summary(self, pair):
+        """Ticker pair dalam bentuk yang sama dengan get_indodax_summary (None jika belum ada)."""
+        with self._lock:
+            ticker = self.tickers.get(channel_pair_id(pair))
+            return None if ticker is None else {k: v for k, v in ticker.items() if k != "ts"}
+
+    def open_candle(self, pair, tf):
+        with self._lock:
+            candle = self._candles.get((pair, tf))
+            return None if candle is None else dict(candle)
+
+    def overlay_candle(self, pair, tf, candles):
+        """
+        Gabungkan candle berjalan dari stream ke frame candle hasil polling. Candle
+        lengkap menggantikan baris polling; candle parsial hanya memperluas high/low
+        dan memperbarui close (volume diambil yang terbesar agar tidak dihitung ganda).
+        """
+        import pandas as pd
+
+        candle = self.open_candle(pair, tf)
+        if candle is None or candles is None or candles.empty:
+            return candles
+        start = pd.Timestamp(candle["start"], unit="s")
+        last_date = candles["date"].iloc[-1]
+        if start < last_date:
+            return candles
+        values = {k: candle[k] for k in ("open", "high", "low", "close", "volume")}
+        if start > last_date:
+            row = pd.DataFrame([{"date": start, **values}])
+            return pd.concat([candles, row], ignore_index=True)
+
+        out = candles.copy()
+        i = out.index[-1]
+        if not candle["complete"]:
+            values["open"] = out.at[i, "open"]
+            values["high"] = max(values["high"], out.at[i, "high"])
+            values["low"] = min(values["low"], out.at[i, "low"])
+            values["volume"] = max(values["volume"], out.at[i, "volume"])
+        for col, value in values.items():
+            out.at[i, col] = value
+        return out
+
+    def stats(self):
+        with self._lock:
+            return {
+                "connected": self.connected,
+                "live": self.is_live(),
+                "age": time.time() - self.last_message_at if self.last_message_at else None,
+                "messages": self.messages,
+                "gaps": self.gaps,
+                "reconnects": self.reconnects,
+                "tickers": len(self.tickers),
+                "tracked": {pair: sorted(tfs) for pair, tfs in self._tracked.items()},
+            }
+
+
+class MarketStream:
+    """
+    Klien WebSocket di thread latar belakang (event loop asyncio + tornado).
+    Reconnect dengan exponential backoff + jitter; publikasi yang bolong
+    (offset melompat) atau putus koneksi membuat pair terkait di-resync lewat REST.
+    """
+
+    def __init__(self, url=DEFAULT_WS_URL, token="", state=None):
+        self.url = url or DEFAULT_WS_URL
+        self.token = token
+        self.state = state or StreamState()
+        self._subscribed = set()
+        self._wanted = {SUMMARY_CHANNEL}
+        self._wanted_lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+        self._next_id = 1
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=lambda: asyncio.run(self._run()), name="market-stream", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def track(self, pair, timeframes):
+        """Lacak trades `pair` (candle berjalan untuk `timeframes`); subscribe dilakukan oleh thread stream."""
+        self.state.track(pair, timeframes)
+        with self._wanted_lock:
+            self._wanted.add(f"{TICK_CHANNEL_PREFIX}{channel_pair_id(pair)}")
+        return self
+
+    # --- Loop koneksi -------------------------------------------------
+    async def _run(self):
+        attempt = 0
+        while not self._stop.is_set():
+            started = time.monotonic()
+            try:
+                await self._session()
+            except Exception as e:
+                logger.warning(f"📡 Stream WebSocket terputus: {e}")
+            finally:
+                if self.state.connected:
+                    self.state.connected = False
+                    self.state.reconnects += 1
+                    inc("stream_reconnects")
+                    # Publikasi selama putus tidak bisa dipulihkan: candle pair dilacak diambil ulang via REST
+                    self.state.mark_resync(self.state.tracked_pairs())
+                self.state.reset_offsets()
+                self._subscribed.clear()
+            if self._stop.is_set():
+                return
+            attempt = 0 if time.monotonic() - started >= STABLE_SESSION_SECONDS else attempt + 1
+            delay = min(RECONNECT_MAX_SECONDS, RECONNECT_BASE_SECONDS * 2 ** attempt) * random.uniform(0.5, 1.0)
+            logger.info(f"📡 Menyambung ulang stream dalam {delay:.1f} detik (percobaan {attempt}).")
+            await asyncio.sleep(delay)
+
+    def _request_id(self):
+        self._next_id += 1
+        return self._next_id
+
+    async def _session(self):
+        from tornado.websocket import websocket_connect
+
+        conn = await websocket_connect(self.url, connect_timeout=CONNECT_TIMEOUT_SECONDS)
+        try:
+            await conn.write_message(json.dumps({"params": {"token": self.token}, "id": self._request_id()}))
+            self.state.connected = True
+            self.state.last_message_at = time.time()
+            logger.info(f"📡 Stream WebSocket tersambung ke {self.url}")
+            while not self._stop.is_set():
+                await self._sync_subscriptions(conn)
+                try:
+                    message = await asyncio.wait_for(conn.read_message(), timeout=READ_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    if time.time() - self.state.last_message_at > STALE_AFTER_SECONDS:
+                        raise ConnectionError(f"tidak ada pesan selama {STALE_AFTER_SECONDS} detik")
+                    continue
+                if message is None:
+                    raise ConnectionError("koneksi ditutup server")
+                self.state.last_message_at = time.time()
+                # Centrifugo bisa menggabungkan beberapa pesan JSON dipisah baris baru
+                for line in message.splitlines():
+                    if line.strip():
+                        self._handle(json.loads(line))
+        finally:
+            conn.close()
+
+    async def _sync_subscriptions(self, conn):
+        with self._wanted_lock:
+            missing = self._wanted - self._subscribed
+        for channel in sorted(missing):
+            await conn.write_message(json.dumps({"method": 1, "params": {"channel": channel}, "id": self._request_id()}))
+            self._subscribed.add(channel)
+
+    def _handle(self, message):
+        if message.get("error"):
+            logger.warning(f"📡 Error dari server stream: {message['error']}")
+            return
+        result = message.get("result") or {}
+        channel = result.get("channel")
+        publication = result.get("data")
+        if not channel or not isinstance(publication, dict):
+            return  # balasan connect/subscribe atau ping
+
+        self.state.messages += 1
+        offset = publication.get("offset")
+        if offset is not None:
+            missed = self.state.check_offset(channel, int(offset))
+            if missed is None:
+                return
+            if missed:
+                self.state.gaps += 1
+                inc("stream_gaps", channel=channel.split(":")[0])
+                if channel.startswith(TICK_CHANNEL_PREFIX):
+                    logger.warning(f"📡 {missed} publikasi terlewat di {channel}, candle di-resync via REST.")
+                    pair_id = channel[len(TICK_CHANNEL_PREFIX):]
+                    self.state.mark_resync([p for p in self.state.tracked_pairs() if channel_pair_id(p) == pair_id])
+                else:
+                    # Summary berisi snapshot semua pair: publikasi berikutnya sudah memulihkan state
+                    logger.info(f"📡 {missed} publikasi terlewat di {channel}.")
+
+        rows = publication.get("data") or []
+        if channel == SUMMARY_CHANNEL:
+            self.state.apply_summary(rows)
+        elif channel.startswith(TICK_CHANNEL_PREFIX):
+            self.state.apply_trades(rows)
+        inc("stream_messages", channel=channel.split(":")[0])
+
+
+_stream = None
+_stream_lock = threading.Lock()
+
+
+def get_market_stream(url=DEFAULT_WS_URL, token=""):
+    """Stream tunggal per proses; dimulai saat pertama kali diminta."""
+    global _stream
+    with _stream_lock:
+        if _stream is None:
+            _stream = MarketStream(url, token)
+        return _stream.start()
@@ -0,0 +1,244 @@
+import os
+import time
+import bisect
+import logging
+import threading
+import functools
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# ========================================
+# ⏱️ Metrik in-process: timer per stage, counter, histogram
+# ========================================
+METRIC_PREFIX = "readonetrade"
+# Bucket histogram latensi (detik), gaya Prometheus
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Batas jumlah seri (kombinasi label); label pair di atas batas digabung menjadi "_other"
+MAX_SERIES = 5000
+METRICS_PATH = os.path.join("data", "metrics.prom")
+
+
+class _Histogram:
+    __slots__ = ("counts", "sum", "count", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+        self.max = max(self.max, value)
+
+    def quantile(self, q):
+        """Perkiraan kuantil: interpolasi linear di dalam bucket, dibatasi nilai maksimum."""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        running = 0
+        for i, bucket_count in enumerate(self.counts):
+            if bucket_count and running + bucket_count >= target:
+                lower = LATENCY_BUCKETS[i - 1] if i > 0 else 0.0
+                upper = LATENCY_BUCKETS[i] if i < len(LATENCY_BUCKETS) else self.max
+                estimate = lower + (upper - lower) * (target - running) / bucket_count
+                return min(estimate, self.max)
+            running += bucket_count
+        return self.max
+
+
+class MetricsRegistry:
+    def __init__(self, max_series=MAX_SERIES):
+        self.max_series = max_series
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = {}
+        self._gauges = {}
+
+    def _key(self, store, name, labels):
+        key = (name, tuple(sorted((k, str(v)) for k, v in labels.items() if v not in (None, ""))))
+        if key not in store and len(store) >= self.max_series and "pair" in labels:
+            return self._key(store, name, {**labels, "pair": "_other"})
+        return key
+
+    def observe(self, stage, seconds, **labels):
+        with self._lock:
+            key = self._key(self._histograms, stage, labels)
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = _Histogram()
+            histogram.observe(seconds)
+
+    def inc(self, name, amount=1, **labels):
+        with self._lock:
+            key = self._key(self._counters, name, labels)
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def set_gauge(self, name, value, **labels):
+        with self._lock:
+            self._gauges[self._key(self._gauges, name, labels)] = value
+
+    @contextmanager
+    def timed(self, stage, **labels):
+        """Ukur durasi blok; error dihitung di counter `<stage>_errors` lalu diteruskan."""
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.inc(f"{stage}_errors", **labels)
+            raise
+        finally:
+            self.observe(stage, time.perf_counter() - start, **labels)
+
+    def timer(self, stage, **labels):
+        """Versi dekorator dari timed()."""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.timed(stage, **labels):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+            self._gauges.clear()
+
+    # --- Ringkasan & ekspor -------------------------------------------
+    def snapshot(self, group_by=("stage",)):
+        """
+        Ringkasan histogram, dijumlahkan per kombinasi label `group_by`
+        (mis. ("stage",) atau ("stage", "pair", "tf")).
+
+        Returns:
+            list[dict]: stage/label, count, total_s, mean_ms, p50_ms, p95_ms, max_ms
+        """
+        with self._lock:
+            merged = {}
+            for (stage, labels), histogram in self._histograms.items():
+                label_map = dict(labels, stage=stage)
+                group = tuple(label_map.get(name, "") for name in group_by)
+                target = merged.get(group)
+                if target is None:
+                    target = merged[group] = _Histogram()
+                target.counts = [a + b for a, b in zip(target.counts, histogram.counts)]
+                target.sum += histogram.sum
+                target.count += histogram.count
+                target.max = max(target.max, histogram.max)
+
+        rows = []
+        for group, histogram in merged.items():
+            row = dict(zip(group_by, group))
+            row.update({
+                "count": histogram.count,
+                "total_s": round(histogram.sum, 3),
+                "mean_ms": round(histogram.sum / histogram.count * 1000, 1) if histogram.count else 0.0,
+                "p50_ms": round(histogram.quantile(0.5) * 1000, 1),
+                "p95_ms": round(histogram.quantile(0.95) * 1000, 1),
+                "max_ms": round(histogram.max * 1000, 1),
+            })
+            rows.append(row)
+        return sorted(rows, key=lambda row: row["total_s"], reverse=True)
+
+    def counters(self):
+        with self._lock:
+            return {(name, labels): value for (name, labels), value in self._counters.items()}
+
+    def to_prometheus(self):
+        """Format teks eksposisi Prometheus (histogram, counter, gauge)."""
+        def fmt_labels(labels, extra=()):
+            items = [*labels, *extra]
+            if not items:
+                return ""
+            escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in items)
+            return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(items, escaped)) + "}"
+
+        lines = []
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            counters = sorted(self._counters.items())
+            gauges = sorted(self._gauges.items())
+
+        name = f"{METRIC_PREFIX}_stage_duration_seconds"
+        lines.append(f"# HELP {name} Durasi stage hot-path (fetch, parse, resample, indikator, scan, render, kirim).")
+        lines.append(f"# TYPE {name} histogram")
+        for (stage, labels), histogram in histograms:
+            labels = (("stage", stage), *labels)
+            running = 0
+            for bound, bucket_count in zip((*LATENCY_BUCKETS, "+Inf"), histogram.counts):
+                running += bucket_count
+                lines.append(f"{name}_bucket{fmt_labels(labels, (('le', bound),))} {running}")
+            lines.append(f"{name}_sum{fmt_labels(labels)} {histogram.sum:.6f}")
+            lines.append(f"{name}_count{fmt_labels(labels)} {histogram.count}")
+
+        seen = set()
+        for (counter, labels), value in counters:
+            metric = f"{METRIC_PREFIX}_{counter}_total"
+            if metric not in seen:
+                seen.add(metric)
+                lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric}{fmt_labels(labels)} {value}")
+
+        seen = set()
+        for (gauge, labels), value in gauges:
+            metric = f"{METRIC_PREFIX}_{gauge}"
+            if metric not in seen:
+                seen.add(metric)
+                lines.append(f"# TYPE {metric} gauge")
+            lines.append(f"{metric}{fmt_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path=METRICS_PATH):
+        """Tulis atomik untuk node_exporter textfile collector."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, path)
+        return path
+
+
+metrics = MetricsRegistry()
+timed = metrics.timed
+inc = metrics.inc
+
+_http_server = None
+
+
+def start_metrics_server(port, host="127.0.0.1"):
+    """Endpoint /metrics sederhana (thread daemon) untuk di-scrape Prometheus."""
+    global _http_server
+    if _http_server is not None or not port:
+        return _http_server
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.rstrip("/") != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.to_prometheus().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    try:
+        _http_server = ThreadingHTTPServer((host, int(port)), Handler)
+    except OSError as e:
+        logger.error(f"Gagal membuka endpoint metrik di {host}:{port}: {e}")
+        return None
+    threading.Thread(target=_http_server.serve_forever, name="metrics-http", daemon=True).start()
+    logger.info(f"📈 Endpoint metrik Prometheus aktif di http://{host}:{port}/metrics")
+    return _http_server
@@ -0,0 +1,192 @@
+import time
+import logging
+import threading
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# ========================================
+# 🔥 Top movers multi-window dari snapshot ticker
+# ========================================
+WINDOWS = {"15m": 15 * 60, "1h": 3600, "4h": 4 * 3600, "24h": 24 * 3600}
+DEFAULT_TOP_K = 10
+# Snapshot dianggap mewakili awal window jika selisih waktunya masih dalam toleransi ini
+WINDOW_TOLERANCE = 0.2
+MIN_RECORD_INTERVAL_SECONDS = 30
+
+
+class MarketSnapshot:
+    """Satu snapshot /api/tickers sebagai array NumPy sejajar (diurutkan berdasarkan pair)."""
+
+    __slots__ = ("ts", "pairs", "last", "vol_idr", "change_24h")
+
+    def __init__(self, ts, pairs, last, vol_idr, change_24h):
+        self.ts = ts
+        self.pairs = pairs
+        self.last = last
+        self.vol_idr = vol_idr
+        self.change_24h = change_24h
+
+    def __len__(self):
+        return len(self.pairs)
+
+
+def snapshot_from_tickers(tickers, ts=None):
+    """Bangun MarketSnapshot dari dict hasil fetch_all_tickers (satu kali lintasan)."""
+    pairs = sorted(tickers)
+    n = len(pairs)
+    last = np.empty(n, dtype=np.float64)
+    vol_idr = np.empty(n, dtype=np.float64)
+    change = np.empty(n, dtype=np.float64)
+    for i, pair in enumerate(pairs):
+        info = tickers[pair]
+        last[i] = info.get("last", np.nan)
+        vol_idr[i] = info.get("vol_idr", 0.0)
+        change[i] = info.get("change", np.nan)
+    return MarketSnapshot(ts or time.time(), np.array(pairs), last, vol_idr, change)
+
+
+class SnapshotHistory:
+    """Riwayat harga terakhir per snapshot untuk window terpanjang (default 24 jam)."""
+
+    def __init__(self, max_age=max(WINDOWS.values()) * (1 + WINDOW_TOLERANCE), min_interval=MIN_RECORD_INTERVAL_SECONDS):
+        self.max_age = max_age
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._snapshots = deque()
+
+    def record(self, snapshot):
+        with self._lock:
+            if self._snapshots and snapshot.ts - self._snapshots[-1].ts < self.min_interval:
+                return False
+            if self._snapshots and np.array_equal(self._snapshots[-1].pairs, snapshot.pairs):
+                snapshot.pairs = self._snapshots[-1].pairs  # pakai ulang array pair yang sama
+            self._snapshots.append(snapshot)
+            while self._snapshots and snapshot.ts - self._snapshots[0].ts > self.max_age:
+                self._snapshots.popleft()
+            return True
+
+    def at(self, ts):
+        """Snapshot terbaru yang diambil pada/sebelum `ts`, atau None."""
+        with self._lock:
+            found = None
+            for snapshot in self._snapshots:
+                if snapshot.ts > ts:
+                    break
+                found = snapshot
+            return found
+
+    def latest(self):
+        with self._lock:
+            return self._snapshots[-1] if self._snapshots else None
+
+    def coverage_seconds(self, now=None):
+        with self._lock:
+            if not self._snapshots:
+                return 0.0
+            return (now or time.time()) - self._snapshots[0].ts
+
+    def __len__(self):
+        return len(self._snapshots)
+
+
+def align_values(current_pairs, past, field="last"):
+    """Kolom `field` snapshot `past` yang disejajarkan ke urutan pair snapshot sekarang (NaN jika pair baru)."""
+    values = getattr(past, field)
+    if past.pairs is current_pairs or np.array_equal(past.pairs, current_pairs):
+        return values
+    idx = np.searchsorted(past.pairs, current_pairs).clip(max=len(past.pairs) - 1)
+    return np.where(past.pairs[idx] == current_pairs, values[idx], np.nan)
+
+
+def window_changes(snapshot, history, windows=tuple(WINDOWS)):
+    """
+    Matriks perubahan harga (%) berbentuk (jumlah window, jumlah pair).
+
+    Window tanpa riwayat yang cukup bernilai NaN, kecuali 24h yang memakai
+    kolom `change` dari ticker sebagai cadangan.
+    """
+    changes = np.full((len(windows), len(snapshot)), np.nan)
+    covered = {}
+    for row, window in enumerate(windows):
+        seconds = WINDOWS[window]
+        past = history.at(snapshot.ts - seconds)
+        if past is not None and snapshot.ts - past.ts <= seconds * (1 + WINDOW_TOLERANCE):
+            base = align_values(snapshot.pairs, past)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                changes[row] = np.where(base > 0, (snapshot.last - base) / base * 100, np.nan)
+            covered[window] = "riwayat"
+        elif window == "24h":
+            changes[row] = snapshot.change_24h
+            covered[window] = "ticker"
+        else:
+            covered[window] = None
+    return changes, covered
+
+
+def top_k_indices(values, k, largest=True):
+    """
+    Indeks top-K per baris memakai argpartition (O(n)) lalu mengurutkan hanya K
+    elemen tersebut. NaN tidak pernah terpilih.
+    """
+    values = np.atleast_2d(values)
+    filled = np.where(np.isnan(values), -np.inf if largest else np.inf, values)
+    keyed = -filled if largest else filled
+    k = min(k, values.shape[1])
+    if k <= 0:
+        return [np.array([], dtype=np.intp) for _ in range(values.shape[0])]
+    part = np.argpartition(keyed, k - 1, axis=1)[:, :k]
+    order = np.take_along_axis(keyed, part, axis=1).argsort(axis=1, kind="stable")
+    ranked = np.take_along_axis(part, order, axis=1)
+    return [row[np.isfinite(values[i, row])] for i, row in enumerate(ranked)]
+
+
+def compute_movers(snapshot, history=None, windows=tuple(WINDOWS), k=DEFAULT_TOP_K, min_vol_idr=0.0):
+    """
+    Hitung gainers/losers semua window dan top volume dalam satu lintasan.
+
+    Returns:
+        dict: {"windows": {window: {"gainers": df, "losers": df, "source": str|None}},
+               "volume": df}
+    """
+    if history is None:
+        history = market_history
+    changes, covered = window_changes(snapshot, history, windows)
+
+    # Filter likuiditas sekali untuk semua window
+    liquid = snapshot.vol_idr >= min_vol_idr
+    changes[:, ~liquid] = np.nan
+
+    gainers = top_k_indices(changes, k, largest=True)
+    losers = top_k_indices(changes, k, largest=False)
+    volume = top_k_indices(np.where(liquid, snapshot.vol_idr, np.nan), k, largest=True)[0]
+
+    def frame(idx, change_row=None):
+        data = {"last": snapshot.last[idx], "vol_idr": snapshot.vol_idr[idx]}
+        if change_row is not None:
+            data["change"] = change_row[idx]
+        return pd.DataFrame(data, index=pd.Index(snapshot.pairs[idx], name="Pair"))
+
+    result = {"windows": {}, "volume": frame(volume)}
+    for row, window in enumerate(windows):
+        result["windows"][window] = {
+            "gainers": frame(gainers[row], changes[row]),
+            "losers": frame(losers[row], changes[row]),
+            "source": covered[window],
+        }
+    return result
+
+
+market_history = SnapshotHistory()
+
+
+def record_tickers(tickers, ts=None):
+    """Catat snapshot tickers ke riwayat global; dipanggil setiap kali tickers baru diambil."""
+    if not tickers:
+        return None
+    snapshot = snapshot_from_tickers(tickers, ts)
+    market_history.record(snapshot)
+    return snapshot
@@ -0,0 +1,308 @@
+"""
+Backfill OHLCV historis dari endpoint chart TradingView Indodax ke SQLite lokal,
+lalu digabung dengan candle hasil /trades. Riwayat yang sudah tersimpan tidak
+diambil ulang; setiap pemanggilan hanya menambal ujung terbaru (dan ujung lama
+jika jumlah bar yang diminta bertambah).
+
+    python -m modules.ohlc_history --pairs btc_idr,eth_idr --tf 1H,4H,1D --bars 5000
+    python -m modules.ohlc_history --tf 1D          # semua pair di registry
+"""
+import os
+import time
+import sqlite3
+import logging
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from modules.timeframes import timeframe_seconds
+
+logger = logging.getLogger(__name__)
+
+# ========================================
+# 🗄️ Riwayat OHLC (TradingView history Indodax -> SQLite)
+# ========================================
+HISTORY_URL = "https://indodax.com/tradingview/history_v2"
+HISTORY_DB_PATH = os.path.join("data", "ohlc_history.sqlite3")
+# Timeframe dashboard -> resolusi chart TradingView Indodax
+TF_RESOLUTION = {"5min": "5", "15min": "15", "30min": "30", "1H": "60", "1h": "60", "4H": "240", "1D": "1D"}
+DEFAULT_HISTORY_BARS = 1000
+BARS_PER_PAGE = 1000
+PAGE_CONCURRENCY = 4
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS candles (
+    pair   TEXT NOT NULL,
+    tf     TEXT NOT NULL,
+    ts     INTEGER NOT NULL,
+    open   REAL NOT NULL,
+    high   REAL NOT NULL,
+    low    REAL NOT NULL,
+    close  REAL NOT NULL,
+    volume REAL NOT NULL,
+    PRIMARY KEY (pair, tf, ts)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS coverage (
+    pair       TEXT NOT NULL,
+    tf         TEXT NOT NULL,
+    first_ts   INTEGER NOT NULL,
+    last_ts    INTEGER NOT NULL,
+    -- Bursa tidak punya data sebelum waktu ini: jangan diminta lagi
+    exhausted  INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (pair, tf)
+);
+"""
+
+
+def _tf_key(tf):
+    """'1h' dan '1H' disimpan dengan kunci yang sama."""
+    return "1H" if tf == "1h" else tf
+
+
+def parse_history(payload):
+    """
+    Respons history_v2 ([{"Time", "Open", ...}]) atau format UDF TradingView
+    ({"s": "ok", "t": [...], "o": [...], ...}) -> list tuple (ts, o, h, l, c, v).
+    """
+    rows = []
+    if isinstance(payload, dict):
+        if payload.get("s") not in ("ok", None):
+            return rows
+        for ts, o, h, l, c, v in zip(*(payload.get(k, []) for k in ("t", "o", "h", "l", "c", "v"))):
+            rows.append((int(ts), float(o), float(h), float(l), float(c), float(v)))
+    elif isinstance(payload, list):
+        for bar in payload:
+            try:
+                rows.append((int(bar["Time"]), float(bar["Open"]), float(bar["High"]),
+                             float(bar["Low"]), float(bar["Close"]), float(bar["Volume"])))
+            except (KeyError, TypeError, ValueError):
+                continue
+    return rows
+
+
+class OHLCHistoryStore:
+    """Candle historis per (pair, tf) di SQLite + catatan rentang yang sudah diambil."""
+
+    def __init__(self, path=HISTORY_DB_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def coverage(self, pair, tf):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT first_ts, last_ts, exhausted FROM coverage WHERE pair = ? AND tf = ?", (pair, _tf_key(tf))
+            ).fetchone()
+        return None if row is None else {"first_ts": row[0], "last_ts": row[1], "exhausted": bool(row[2])}
+
+    def save(self, pair, tf, rows, first_ts, last_ts, exhausted=False):
+        tf = _tf_key(tf)
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO candles (pair, tf, ts, open, high, low, close, volume) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(pair, tf, *row) for row in rows],
+            )
+            self._conn.execute(
+                """INSERT INTO coverage (pair, tf, first_ts, last_ts, exhausted, updated_at) VALUES (?, ?, ?, ?, ?, ?)
+                   ON CONFLICT (pair, tf) DO UPDATE SET
+                       first_ts = MIN(first_ts, excluded.first_ts),
+                       last_ts = MAX(last_ts, excluded.last_ts),
+                       exhausted = MAX(exhausted, excluded.exhausted),
+                       updated_at = excluded.updated_at""",
+                (pair, tf, first_ts, last_ts, int(exhausted), time.time()),
+            )
+
+    def load(self, pair, tf, since=None):
+        """Candle tersimpan sebagai DataFrame (date, open, high, low, close, volume), urut waktu."""
+        import pandas as pd
+
+        sql = "SELECT ts, open, high, low, close, volume FROM candles WHERE pair = ? AND tf = ?"
+        params = [pair, _tf_key(tf)]
+        if since is not None:
+            sql += " AND ts >= ?"
+            params.append(int(since))
+        with self._lock:
+            rows = self._conn.execute(sql + " ORDER BY ts", params).fetchall()
+        df = pd.DataFrame(rows, columns=["ts", "open", "high", "low", "close", "volume"])
+        df.insert(0, "date", pd.to_datetime(df.pop("ts"), unit="s"))
+        return df
+
+    def stats(self):
+        with self._lock:
+            candles = self._conn.execute("SELECT COUNT(*) FROM candles").fetchone()[0]
+            series = self._conn.execute("SELECT COUNT(*) FROM coverage").fetchone()[0]
+        return {"candles": candles, "series": series}
+
+
+def fetch_history_page(pair, tf, start, end):
+    """Satu halaman history [start, end] (epoch detik) lewat rate governor."""
+    from modules.metrics import timed
+    from modules.pair_registry import pair_registry
+    from modules.rate_limiter import governed_get
+
+    info = pair_registry.resolve(pair)
+    symbol = info.symbol if info is not None else pair.replace("_", "").upper()
+    url = f"{HISTORY_URL}?symbol={symbol}&tf={TF_RESOLUTION[tf]}&from={int(start)}&to={int(end)}"
+    with timed("fetch", endpoint="history", pair=pair, tf=tf):
+        response = governed_get(url, "history")
+        response.raise_for_status()
+        return parse_history(response.json())
+
+
+def _pages(start, end, tf_seconds):
+    span = BARS_PER_PAGE * tf_seconds
+    return [(page_start, min(end, page_start + span - 1)) for page_start in range(int(start), int(end) + 1, span)]
+
+
+def backfill(pair, tf, bars=DEFAULT_HISTORY_BARS, store=None, now=None, executor=None):
+    """
+    Pastikan `bars` candle terakhir (pair, tf) ada di store. Hanya rentang yang
+    belum pernah diambil yang diminta; halaman diambil paralel.
+
+    Returns:
+        int: jumlah candle yang disimpan/diperbarui.
+    """
+    if tf not in TF_RESOLUTION:
+        return 0
+    store = store or get_history_store()
+    tf_seconds = timeframe_seconds(tf)
+    now = int(now or time.time())
+    want_from = now - now % tf_seconds - (bars - 1) * tf_seconds
+    covered = store.coverage(pair, tf)
+
+    ranges = []
+    if covered is None:
+        ranges.append((want_from, now))
+    else:
+        if want_from < covered["first_ts"] and not covered["exhausted"]:
+            ranges.append((want_from, covered["first_ts"] - 1))
+        # Candle terakhir yang tersimpan mungkin belum ditutup: ambil ulang mulai dari sana
+        ranges.append((covered["last_ts"], now))
+    pages = [page for start, end in ranges for page in _pages(start, end, tf_seconds)]
+    if not pages:
+        return 0
+
+    if executor is not None:
+        results = list(executor.map(lambda page: fetch_history_page(pair, tf, *page), pages))
+    else:
+        with ThreadPoolExecutor(max_workers=min(PAGE_CONCURRENCY, len(pages))) as pool:
+            results = list(pool.map(lambda page: fetch_history_page(pair, tf, *page), pages))
+
+    rows = sorted({row[0]: row for page_rows in results for row in page_rows}.values())
+    first_ts = ranges[0][0]
+    # Halaman tertua kosong saat mundur ke belakang = bursa tidak punya data lebih lama
+    extending_back = covered is None or first_ts < covered["first_ts"]
+    exhausted = bool(rows) and extending_back and not results[0]
+    if rows:
+        store.save(pair, tf, rows, first_ts=rows[0][0] if exhausted else first_ts,
+                   last_ts=rows[-1][0], exhausted=exhausted)
+    elif covered is None:
+        logger.warning(f"Riwayat OHLC {pair} {tf} kosong dari Indodax.")
+    return len(rows)
+
+
+def merge_history(history, live, tf_seconds=None):
+    """
+    Gabungkan candle historis dengan candle dari /trades. Candle live menang di
+    timestamp yang sama, kecuali candle live tertua: halaman /trades biasanya
+    dimulai di tengah candle itu sehingga versi historis lebih lengkap. Candle
+    live yang batasnya tidak sejajar dengan riwayat (mis. candle harian bursa
+    tidak mulai 00:00 UTC) dibuang agar tidak ada dua candle untuk satu periode.
+    Kolom alur transaksi (taker buy/sell, CVD, VWAP) hanya ada di candle live;
+    baris historis bernilai NaN.
+    """
+    import numpy as np
+    import pandas as pd
+
+    if history is None or history.empty:
+        return live
+    if live is None or live.empty:
+        return history
+    if len(live) > 1 and live["date"].iloc[0] in set(history["date"]):
+        live = live.iloc[1:]
+    if tf_seconds:
+        history_ts = history["date"].to_numpy(dtype="datetime64[s]").astype(np.int64)
+        live_ts = live["date"].to_numpy(dtype="datetime64[s]").astype(np.int64)
+        live = live[live_ts % tf_seconds == history_ts[-1] % tf_seconds]
+    live = live[live["date"].isin(history["date"]) | (live["date"] > history["date"].iloc[-1])]
+    merged = pd.concat([history[~history["date"].isin(live["date"])], live], ignore_index=True)
+    return merged.sort_values("date", ignore_index=True)
+
+
+def get_candles_with_history(pair, tf, bars=DEFAULT_HISTORY_BARS, limit=None):
+    """
+    Candle /trades (get_candlestick_data) + riwayat panjang dari store lokal.
+    Jika backfill gagal, tetap kembalikan candle live saja.
+    """
+    from modules.indodax_api import get_candlestick_data
+
+    live = get_candlestick_data(pair, tf=tf)
+    try:
+        backfill(pair, tf, bars)
+        store = get_history_store()
+        history = store.load(pair, tf, since=time.time() - bars * timeframe_seconds(tf, 300))
+    except Exception as e:
+        logger.warning(f"Backfill riwayat {pair} {tf} gagal, memakai candle /trades saja: {e}")
+        return live.tail(limit) if limit else live
+    merged = merge_history(history, live, timeframe_seconds(tf, None))
+    return merged.tail(limit).reset_index(drop=True) if limit else merged
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_history_store(path=HISTORY_DB_PATH):
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = OHLCHistoryStore(path)
+        return _store
+
+
+# === CLI backfill massal ===
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m modules.ohlc_history", description="Backfill riwayat OHLC Indodax ke SQLite lokal.")
+    parser.add_argument("--pairs", help="Daftar pair dipisah koma (default: semua pair di registry)")
+    parser.add_argument("--tf", default="1H,4H,1D", help="Timeframe dipisah koma (default: 1H,4H,1D)")
+    parser.add_argument("--bars", type=int, default=DEFAULT_HISTORY_BARS)
+    parser.add_argument("--concurrency", type=int, default=PAGE_CONCURRENCY)
+    parser.add_argument("--log-level", default="INFO")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=args.log_level.upper(), format='%(asctime)s - %(levelname)s - %(message)s')
+
+    from modules.pair_registry import load_pair_registry
+    registry = load_pair_registry()
+    pairs = ([registry.canonical(p.strip(), p.strip().lower()) for p in args.pairs.split(",") if p.strip()]
+             if args.pairs else registry.ids())
+    timeframes = [tf.strip() for tf in args.tf.split(",") if tf.strip() in TF_RESOLUTION]
+    jobs = [(pair, tf) for pair in pairs for tf in timeframes]
+
+    started = time.perf_counter()
+    total = 0
+    # Satu pool untuk semua halaman; governor rate limiter tetap membatasi laju request
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pages, \
+            ThreadPoolExecutor(max_workers=args.concurrency) as series:
+        def run(job):
+            try:
+                return backfill(*job, bars=args.bars, executor=pages)
+            except Exception as e:
+                logger.warning(f"Backfill {job[0]} {job[1]} gagal: {e}")
+                return 0
+        for (pair, tf), saved in zip(jobs, series.map(run, jobs)):
+            total += saved
+            logger.info(f"🗄️ {pair} {tf}: {saved} candle disimpan")
+    logger.info(f"Backfill selesai: {total} candle untuk {len(jobs)} seri dalam {time.perf_counter() - started:.1f} detik. "
+                f"Store: {get_history_store().stats()}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
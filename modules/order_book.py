@@ -0,0 +1,218 @@
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait as wait_futures
+
+import numpy as np
+import pandas as pd
+
+from modules.metrics import timed
+
+logger = logging.getLogger(__name__)
+
+# ========================================
+# 📚 Order book per pair (/api/{pair}/depth) + metrik kedalaman vektor
+# ========================================
+MAX_LEVELS = 150
+# Band harga (% dari mid) untuk imbalance bid/ask; band sinyal dipakai "Sinyal Pasar" & "Rasio B/S"
+DEFAULT_BANDS_PCT = (0.5, 1.0, 2.0)
+SIGNAL_BAND_PCT = 1.0
+DEPTH_MAX_AGE_SECONDS = 60
+DEPTH_FETCH_WORKERS = 2
+
+
+def parse_bands(value, default=DEFAULT_BANDS_PCT):
+    """"0.5, 1, 2" (config) -> (0.5, 1.0, 2.0); nilai tidak valid -> default."""
+    if not value:
+        return tuple(default)
+    try:
+        bands = tuple(sorted({float(part) for part in str(value).split(",") if part.strip()}))
+    except ValueError:
+        logger.warning(f"depth_bands tidak valid ({value!r}), memakai {default}.")
+        return tuple(default)
+    return tuple(band for band in bands if band > 0) or tuple(default)
+
+
+def _levels(rows, descending):
+    """[[harga, jumlah], ...] (angka atau string) -> (harga, jumlah) float64 terurut, tanpa level kosong."""
+    levels = np.asarray(rows if rows else np.empty((0, 2)), dtype=np.float64).reshape(-1, 2)
+    levels = levels[np.isfinite(levels).all(axis=1) & (levels[:, 0] > 0) & (levels[:, 1] > 0)]
+    order = np.argsort(-levels[:, 0] if descending else levels[:, 0], kind="stable")
+    levels = levels[order[:MAX_LEVELS]]
+    return levels[:, 0].copy(), levels[:, 1].copy()
+
+
+class OrderBook:
+    """Satu sisi bid (harga turun) dan ask (harga naik) sebagai array NumPy terurut."""
+
+    __slots__ = ("pair", "bid_prices", "bid_amounts", "ask_prices", "ask_amounts", "updated_at")
+
+    def __init__(self, pair):
+        self.pair = pair
+        self.bid_prices = self.bid_amounts = self.ask_prices = self.ask_amounts = np.empty(0)
+        self.updated_at = 0.0
+
+    def apply_snapshot(self, payload, now=None):
+        """Ganti isi book dengan respons depth; level bernilai nol/invalid dibuang."""
+        self.bid_prices, self.bid_amounts = _levels(payload.get("buy"), descending=True)
+        self.ask_prices, self.ask_amounts = _levels(payload.get("sell"), descending=False)
+        self.updated_at = now or time.time()
+        return self
+
+    @property
+    def best_bid(self):
+        return self.bid_prices[0] if len(self.bid_prices) else np.nan
+
+    @property
+    def best_ask(self):
+        return self.ask_prices[0] if len(self.ask_prices) else np.nan
+
+
+def depth_metrics(books, bands=DEFAULT_BANDS_PCT, signal_band=SIGNAL_BAND_PCT):
+    """
+    Metrik kedalaman semua pair sekaligus: book dipadatkan ke matriks
+    (pair x level) lalu dihitung tanpa loop per pair.
+
+    Kolom (per pair):
+        best_bid, best_ask, spread_pct
+        bid_depth_<b>, ask_depth_<b>, imbalance_<b> untuk setiap band b (% dari mid, notional quote)
+        bid_depth, ask_depth, imbalance: salinan band sinyal
+        book_slope: kemiringan kedalaman kumulatif (notional per 1% jarak dari mid, rata-rata bid & ask)
+
+    Returns:
+        pd.DataFrame: index = pair.
+    """
+    bands = tuple(sorted(set(bands) | {signal_band}))
+    pairs = [book.pair for book in books]
+    n = len(books)
+    levels = max((max(len(b.bid_prices), len(b.ask_prices)) for b in books), default=0) or 1
+    bid_p = np.full((n, levels), np.nan)
+    ask_p = np.full((n, levels), np.nan)
+    bid_a = np.zeros((n, levels))
+    ask_a = np.zeros((n, levels))
+    for i, book in enumerate(books):
+        bid_p[i, :len(book.bid_prices)] = book.bid_prices
+        bid_a[i, :len(book.bid_amounts)] = book.bid_amounts
+        ask_p[i, :len(book.ask_prices)] = book.ask_prices
+        ask_a[i, :len(book.ask_amounts)] = book.ask_amounts
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        best_bid, best_ask = bid_p[:, 0], ask_p[:, 0]
+        mid = (best_bid + best_ask) / 2
+        out = {
+            "best_bid": best_bid,
+            "best_ask": best_ask,
+            "spread_pct": (best_ask - best_bid) / mid * 100,
+        }
+        # Jarak tiap level dari mid (%); NaN (level kosong) gagal semua perbandingan band
+        bid_dist = (mid[:, None] - bid_p) / mid[:, None] * 100
+        ask_dist = (ask_p - mid[:, None]) / mid[:, None] * 100
+        bid_notional = np.nan_to_num(bid_p * bid_a)
+        ask_notional = np.nan_to_num(ask_p * ask_a)
+        for band in bands:
+            bid_depth = np.where(bid_dist <= band, bid_notional, 0.0).sum(axis=1)
+            ask_depth = np.where(ask_dist <= band, ask_notional, 0.0).sum(axis=1)
+            total = bid_depth + ask_depth
+            out[f"bid_depth_{band:g}"] = bid_depth
+            out[f"ask_depth_{band:g}"] = ask_depth
+            out[f"imbalance_{band:g}"] = np.where(total > 0, (bid_depth - ask_depth) / total, np.nan)
+
+        # Regresi lewat titik asal: depth kumulatif ~ slope * jarak, dalam band terlebar
+        widest = bands[-1]
+        slopes = []
+        for dist, notional in ((bid_dist, bid_notional), (ask_dist, ask_notional)):
+            inside = dist <= widest
+            x = np.where(inside, dist, 0.0)
+            y = np.where(inside, np.cumsum(notional, axis=1), 0.0)
+            slopes.append(np.where(inside.any(axis=1), (x * y).sum(axis=1) / (x * x).sum(axis=1), np.nan))
+        slopes = np.vstack(slopes)
+        sides = np.isfinite(slopes).sum(axis=0)
+        out["book_slope"] = np.where(sides > 0, np.nansum(slopes, axis=0) / sides, np.nan)
+
+    out["bid_depth"] = out[f"bid_depth_{signal_band:g}"]
+    out["ask_depth"] = out[f"ask_depth_{signal_band:g}"]
+    out["imbalance"] = out[f"imbalance_{signal_band:g}"]
+    return pd.DataFrame(out, index=pd.Index(pairs, name="Pair"))
+
+
+class OrderBookStore:
+    """
+    Book terakhir per pair. refresh() hanya mengambil ulang pair yang sudah
+    basi dan belum sedang diambil, di thread latar belakang (laju dibatasi rate
+    governor bucket "depth"), jadi render tabel tidak menunggu jaringan.
+    """
+
+    def __init__(self, workers=DEPTH_FETCH_WORKERS):
+        self._lock = threading.Lock()
+        self._books = {}
+        self._inflight = set()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="depth")
+        self.version = 0
+        self.failures = 0
+
+    def update(self, pair, payload, now=None):
+        book = OrderBook(pair).apply_snapshot(payload, now)
+        with self._lock:
+            self._books[pair] = book
+            self.version += 1
+        return book
+
+    def _fetch(self, pair):
+        from modules.indodax_api import fetch_depth
+
+        try:
+            payload = fetch_depth(pair)
+            with timed("parse", endpoint="depth", pair=pair):
+                self.update(pair, payload)
+        except Exception as e:
+            self.failures += 1
+            logger.warning(f"Gagal mengambil order book {pair}: {e}")
+        finally:
+            with self._lock:
+                self._inflight.discard(pair)
+
+    def refresh(self, pairs, max_age=DEPTH_MAX_AGE_SECONDS, wait=False):
+        """Jadwalkan pengambilan ulang pair yang basi; wait=True menunggu sampai selesai."""
+        now = time.time()
+        with self._lock:
+            stale = [
+                pair for pair in pairs
+                if pair not in self._inflight and now - getattr(self._books.get(pair), "updated_at", 0.0) > max_age
+            ]
+            self._inflight.update(stale)
+        futures = [self._executor.submit(self._fetch, pair) for pair in stale]
+        if wait and futures:
+            wait_futures(futures)
+        return len(stale)
+
+    def books(self, pairs=None):
+        with self._lock:
+            if pairs is None:
+                return list(self._books.values())
+            return [self._books[pair] for pair in pairs if pair in self._books]
+
+    def metrics(self, pairs=None, bands=DEFAULT_BANDS_PCT, signal_band=SIGNAL_BAND_PCT):
+        with timed("depth_metrics"):
+            return depth_metrics(self.books(pairs), bands, signal_band)
+
+    def stats(self):
+        with self._lock:
+            ages = [time.time() - book.updated_at for book in self._books.values()]
+            return {
+                "books": len(self._books),
+                "inflight": len(self._inflight),
+                "oldest_age": max(ages) if ages else None,
+                "failures": self.failures,
+            }
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_order_book_store():
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = OrderBookStore()
+        return _store
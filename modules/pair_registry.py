@@ -0,0 +1,197 @@
+import math
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# ========================================
+# 🗂️ Registry pair: id kanonik, alias & metadata format
+# ========================================
+# Id kanonik mengikuti key /api/tickers Indodax: "<base>_<quote>" huruf kecil (mis. "btc_idr").
+# Alias yang dikenali: "btc_idr", "btcidr", "BTCIDR", "BTC/IDR", "btc-idr".
+KNOWN_QUOTES = ("usdt", "usdc", "idr", "btc")
+DEFAULT_VOLUME_DECIMALS = 8
+
+
+def alias_key(raw):
+    """Normalisasi alias pair menjadi key lookup: huruf kecil tanpa pemisah."""
+    return "".join(ch for ch in str(raw).lower() if ch.isalnum())
+
+
+def _split_pair(raw):
+    raw = str(raw).lower()
+    for sep in ("_", "/", "-"):
+        if sep in raw:
+            base, _, quote = raw.partition(sep)
+            return base, quote
+    if raw in KNOWN_QUOTES:  # mis. format_price(x, "idr")
+        return "", raw
+    for quote in KNOWN_QUOTES:
+        if raw.endswith(quote) and len(raw) > len(quote):
+            return raw[:-len(quote)], quote
+    return raw, ""
+
+
+def _decimals_from_scale(scale):
+    """pricescale ala TradingView (10^desimal) -> jumlah desimal, None jika tidak valid."""
+    try:
+        scale = float(scale)
+    except (TypeError, ValueError):
+        return None
+    if scale < 1:
+        return None
+    return int(round(math.log10(scale)))
+
+
+def _dynamic_price_formatter(quote):
+    """Aturan lama format_price untuk pair tanpa metadata presisi."""
+    if quote.startswith("usd"):
+        return "{:,.8f}".format
+    if quote == "idr":
+        return lambda price: f"{price:,.0f}" if price >= 1 else f"{price:,.6f}"
+    return "{:,.2f}".format
+
+
+class PairInfo:
+    __slots__ = ("id", "base", "quote", "symbol", "price_decimals", "volume_decimals", "format_price", "format_volume")
+
+    def __init__(self, pair_id, base, quote, price_decimals=None, volume_decimals=DEFAULT_VOLUME_DECIMALS):
+        self.id = pair_id
+        self.base = base
+        self.quote = quote
+        self.symbol = f"{base}{quote}".upper()
+        self.price_decimals = price_decimals
+        self.volume_decimals = volume_decimals
+        # Formatter dikompilasi sekali per pair, bukan dicari ulang per baris tabel
+        if price_decimals is None:
+            self.format_price = _dynamic_price_formatter(quote)
+        else:
+            self.format_price = f"{{:,.{price_decimals}f}}".format
+        self.format_volume = f"{{:,.{volume_decimals}f}}".format
+
+    def aliases(self):
+        return {self.id, f"{self.base}{self.quote}", self.symbol, f"{self.base}/{self.quote}".upper()}
+
+    def __repr__(self):
+        return f"PairInfo({self.id!r}, price_decimals={self.price_decimals}, volume_decimals={self.volume_decimals})"
+
+
+class PairRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pairs = {}
+        self._by_alias = {}
+        self.version = 0
+        self.source = ""
+
+    def replace(self, infos, source=""):
+        pairs = {info.id: info for info in infos}
+        by_alias = {}
+        for info in pairs.values():
+            for alias in info.aliases():
+                by_alias[alias_key(alias)] = info
+        with self._lock:
+            self._pairs = pairs
+            self._by_alias = by_alias
+            self.source = source
+            self.version += 1
+
+    def resolve(self, raw):
+        """PairInfo untuk alias apa pun (btc_idr / btcidr / BTCIDR), None jika tidak dikenal."""
+        if raw is None:
+            return None
+        info = self._pairs.get(raw)
+        if info is not None:
+            return info
+        return self._by_alias.get(alias_key(raw))
+
+    def canonical(self, raw, default=None):
+        info = self.resolve(raw)
+        return info.id if info is not None else default
+
+    def base_of(self, raw):
+        info = self.resolve(raw)
+        return info.base if info is not None else _split_pair(raw)[0]
+
+    def price_formatter(self, raw):
+        info = self.resolve(raw)
+        return info.format_price if info is not None else _dynamic_price_formatter(_split_pair(raw)[1])
+
+    def ids(self):
+        return sorted(self._pairs)
+
+    def __contains__(self, raw):
+        return self.resolve(raw) is not None
+
+    def __len__(self):
+        return len(self._pairs)
+
+
+# ========================================
+# ✅ Pembuatan registry dari API Indodax
+# ========================================
+def pair_info_from_metadata(item):
+    """PairInfo dari satu entri /api/pairs (ticker_id, traded_currency, base_currency, pricescale, ...)."""
+    pair_id = str(item.get("ticker_id") or "").lower()
+    base = str(item.get("traded_currency") or "").lower()
+    quote = str(item.get("base_currency") or "").lower()
+    if not pair_id:
+        pair_id = f"{base}_{quote}" if base and quote else str(item.get("id", "")).lower()
+    if not base or not quote:
+        base, quote = _split_pair(pair_id)
+    volume_decimals = item.get("volume_precision")
+    return PairInfo(
+        pair_id,
+        base,
+        quote,
+        price_decimals=_decimals_from_scale(item.get("pricescale")),
+        volume_decimals=int(volume_decimals) if isinstance(volume_decimals, (int, float)) else DEFAULT_VOLUME_DECIMALS,
+    )
+
+
+def pair_info_from_id(pair_id):
+    base, quote = _split_pair(pair_id)
+    return PairInfo(str(pair_id).lower(), base, quote)
+
+
+pair_registry = PairRegistry()
+_load_lock = threading.Lock()
+
+
+def load_pair_registry(refresh=False):
+    """
+    Isi registry global sekali dari /api/pairs (presisi lengkap), dengan
+    fallback ke key /api/tickers. Panggilan berikutnya langsung mengembalikan
+    registry yang sama kecuali `refresh=True`.
+    """
+    from modules.indodax_api import load_indodax_pair_metadata, load_indodax_pairs
+
+    with _load_lock:
+        if len(pair_registry) and not refresh:
+            return pair_registry
+
+        metadata = load_indodax_pair_metadata()
+        infos = []
+        for item in metadata:
+            try:
+                infos.append(pair_info_from_metadata(item))
+            except (TypeError, ValueError, AttributeError) as e:
+                logger.warning(f"Metadata pair tidak valid dilewati: {item!r} ({e})")
+        source = "pairs"
+
+        ticker_ids = load_indodax_pairs()
+        if ticker_ids:
+            # Hanya pair yang aktif di tickers; yang belum ada di /api/pairs memakai aturan format default
+            active = set(ticker_ids)
+            infos = [info for info in infos if info.id in active]
+            known = {info.id for info in infos}
+            infos.extend(pair_info_from_id(pair_id) for pair_id in ticker_ids if pair_id not in known)
+            if not metadata:
+                source = "tickers"
+
+        if infos:
+            pair_registry.replace(infos, source=source)
+            logger.info(f"🗂️ Registry pair dimuat: {len(pair_registry)} pair (sumber: {source}).")
+        else:
+            logger.error("Registry pair kosong: /api/pairs dan /api/tickers gagal dimuat.")
+        return pair_registry
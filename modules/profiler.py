@@ -0,0 +1,235 @@
+import os
+import re
+import sys
+import time
+import pstats
+import cProfile
+import logging
+import threading
+from collections import Counter
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# ========================================
+# 🔬 Profiling on-demand: satu rerun dashboard / satu siklus auto-scan
+# ========================================
+PROFILE_DIR = os.path.join("data", "profiles")
+SAMPLE_INTERVAL_SECONDS = 0.005
+DEFAULT_TOP_N = 25
+MAX_STACK_DEPTH = 128
+# Jumlah profil (.pstats + .folded) yang disimpan; yang lebih lama dihapus setiap kali profil baru disimpan
+MAX_PROFILES = 20
+
+# cProfile memakai hook profil per thread; satu sesi aktif per proses sudah cukup.
+# Sesi yang thread-nya mati sebelum stop()/discard() diambil alih.
+_state_lock = threading.Lock()
+_active_session = None
+
+
+class StackSampler:
+    """
+    Profiler sampling: thread latar belakang mengambil stack thread target tiap
+    `interval` detik dan menghitungnya dalam format folded ("a;b;c N"), siap
+    dipakai flamegraph.pl / speedscope.
+    """
+
+    def __init__(self, thread_id, interval=SAMPLE_INTERVAL_SECONDS):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    @staticmethod
+    def _frame_label(frame):
+        code = frame.f_code
+        module = os.path.splitext(os.path.basename(code.co_filename))[0]
+        return f"{module}:{code.co_name}"
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                return  # thread target sudah selesai
+            labels = []
+            while frame is not None and len(labels) < MAX_STACK_DEPTH:
+                labels.append(self._frame_label(frame))
+                frame = frame.f_back
+            self.stacks[";".join(reversed(labels))] += 1
+            self.samples += 1
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+
+    def folded(self):
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common()) + "\n"
+
+
+def top_functions(stats, n=DEFAULT_TOP_N, sort="cumtime"):
+    """
+    Ringkasan fungsi terpanas dari pstats.Stats.
+
+    Returns:
+        list[dict]: function, ncalls, tottime, cumtime (detik), diurutkan menurut `sort`.
+    """
+    rows = []
+    for (filename, line, name), (_, ncalls, tottime, cumtime, _) in stats.stats.items():
+        location = "~" if filename == "~" else f"{os.path.basename(filename)}:{line}"
+        rows.append({"function": f"{name} ({location})", "ncalls": ncalls,
+                     "tottime": round(tottime, 4), "cumtime": round(cumtime, 4)})
+    rows.sort(key=lambda row: row[sort], reverse=True)
+    return rows[:n]
+
+
+def _slug(value):
+    return re.sub(r"[^A-Za-z0-9_.-]+", "-", str(value)).strip("-") or "na"
+
+
+class ProfileSession:
+    """
+    cProfile (deterministik) + StackSampler untuk thread pemanggil. Dipakai
+    sebagai context manager, atau start()/stop() jika blok yang diprofil tidak
+    bisa dibungkus `with` (mis. seluruh skrip Streamlit).
+    """
+
+    def __init__(self, label, pair="", tf="", directory=PROFILE_DIR, sampling=True, top_n=DEFAULT_TOP_N,
+                 keep=MAX_PROFILES):
+        self.label = label
+        self.keep = keep
+        self.pair = pair
+        self.tf = tf
+        self.directory = directory
+        self.sampling = sampling
+        self.top_n = top_n
+        self.result = None
+        self._profiler = None
+        self._sampler = None
+        self._started = 0.0
+        self._owns_lock = False
+        self._thread = None
+
+    def start(self):
+        global _active_session
+        with _state_lock:
+            # Thread (bukan ident) agar ident yang dipakai ulang thread baru tidak dianggap sesi lama
+            if _active_session is not None and _active_session._thread.is_alive():
+                logger.warning("Profiling lain masih berjalan, permintaan profil dilewati.")
+                return self
+            self._thread = threading.current_thread()
+            _active_session = self
+        self._owns_lock = True
+        self._started = time.perf_counter()
+        if self.sampling:
+            self._sampler = StackSampler(threading.get_ident()).start()
+        self._profiler = cProfile.Profile()
+        self._profiler.enable()
+        return self
+
+    @property
+    def active(self):
+        return self._owns_lock
+
+    def stop(self):
+        """Hentikan profiler, simpan artefak, kembalikan ringkasan (None jika tidak aktif)."""
+        if not self._owns_lock:
+            return None
+        try:
+            elapsed = self._disable()
+            self.result = self._save(elapsed)
+            logger.info(f"🔬 Profil '{self.label}' ({elapsed:.2f}s) disimpan ke {self.result['pstats_path']}")
+            return self.result
+        finally:
+            self._release()
+
+    def discard(self):
+        """Hentikan profiler tanpa menyimpan artefak, mis. sesi yang terputus exception di tengah skrip."""
+        if not self._owns_lock:
+            return
+        try:
+            self._disable()
+            logger.info(f"🔬 Profil '{self.label}' tidak selesai, dibuang.")
+        finally:
+            self._release()
+
+    def _disable(self):
+        self._profiler.disable()
+        elapsed = time.perf_counter() - self._started
+        if self._sampler is not None:
+            self._sampler.stop()
+        return elapsed
+
+    def _release(self):
+        global _active_session
+        self._owns_lock = False
+        with _state_lock:
+            if _active_session is self:
+                _active_session = None
+
+    def _save(self, elapsed):
+        os.makedirs(self.directory, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        base = os.path.join(self.directory, "_".join(_slug(p) for p in (stamp, self.label, self.pair, self.tf) if p))
+        self._profiler.dump_stats(f"{base}.pstats")
+        stats = pstats.Stats(self._profiler)
+        result = {
+            "label": self.label,
+            "pair": self.pair,
+            "tf": self.tf,
+            "timestamp": stamp,
+            "elapsed": elapsed,
+            "pstats_path": f"{base}.pstats",
+            "folded_path": None,
+            "samples": 0,
+            "top_cumtime": top_functions(stats, self.top_n, "cumtime"),
+            "top_tottime": top_functions(stats, self.top_n, "tottime"),
+        }
+        if self._sampler is not None and self._sampler.samples:
+            with open(f"{base}.folded", "w", encoding="utf-8") as f:
+                f.write(self._sampler.folded())
+            result["folded_path"] = f"{base}.folded"
+            result["samples"] = self._sampler.samples
+        prune_profiles(self.directory, self.keep)
+        return result
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+
+def list_profiles(directory=PROFILE_DIR, limit=20):
+    """Artefak .pstats terbaru lebih dulu."""
+    try:
+        names = [name for name in os.listdir(directory) if name.endswith(".pstats")]
+    except FileNotFoundError:
+        return []
+    return [os.path.join(directory, name) for name in sorted(names, reverse=True)[:limit]]
+
+
+def prune_profiles(directory=PROFILE_DIR, keep=MAX_PROFILES):
+    """Hapus artefak di luar `keep` profil terbaru (nama file diawali timestamp)."""
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return 0
+    bases = sorted({name.rsplit(".", 1)[0] for name in names if name.endswith((".pstats", ".folded"))}, reverse=True)
+    removed = 0
+    for base in bases[keep:]:
+        for ext in (".pstats", ".folded"):
+            try:
+                os.remove(os.path.join(directory, base + ext))
+                removed += 1
+            except FileNotFoundError:
+                pass
+    return removed
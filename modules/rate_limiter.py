@@ -0,0 +1,241 @@
+import time
+import logging
+import threading
+from collections import deque
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+# ========================================
+# ⚙️ Batas default per kelas endpoint Indodax (request/detik, burst)
+# ========================================
+DEFAULT_LIMITS = {
+    "ticker": {"rate": 3.0, "burst": 6},
+    "trades": {"rate": 2.0, "burst": 4},
+    "depth": {"rate": 2.0, "burst": 4},
+    "public": {"rate": 1.0, "burst": 2},
+    "history": {"rate": 2.0, "burst": 4},
+}
+
+MAX_RETRIES = 3
+RATE_WINDOW_SECONDS = 60
+
+
+def classify_endpoint(url):
+    """Tentukan kelas endpoint dari URL Indodax."""
+    if "/trades" in url:
+        return "trades"
+    if "/depth" in url:
+        return "depth"
+    if "/tradingview/" in url:
+        return "history"
+    if "/ticker" in url:
+        return "ticker"
+    return "public"
+
+
+def parse_retry_after(value, default=5.0):
+    """Header Retry-After bisa berupa detik atau tanggal HTTP."""
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return default
+
+
+# ========================================
+# ✅ Token bucket per kelas endpoint
+# ========================================
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = float(rate)
+        self.capacity = float(burst)
+        self.tokens = float(burst)
+        self.paused_until = 0.0
+        self.waiting = 0
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+        self._granted = deque()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    def acquire(self):
+        """Blok sampai token tersedia (dan tidak sedang di-pause oleh Retry-After)."""
+        with self._lock:
+            self.waiting += 1
+        try:
+            while True:
+                with self._lock:
+                    now = time.monotonic()
+                    self._refill(now)
+                    if now < self.paused_until:
+                        wait = self.paused_until - now
+                    elif self.tokens >= 1:
+                        self.tokens -= 1
+                        self._granted.append(now)
+                        return
+                    else:
+                        wait = (1 - self.tokens) / self.rate
+                time.sleep(min(wait, 1.0))
+        finally:
+            with self._lock:
+                self.waiting -= 1
+
+    def pause(self, seconds):
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0.0
+
+    def observed_rate(self):
+        with self._lock:
+            cutoff = time.monotonic() - RATE_WINDOW_SECONDS
+            while self._granted and self._granted[0] < cutoff:
+                self._granted.popleft()
+            return len(self._granted) / RATE_WINDOW_SECONDS
+
+
+# ========================================
+# ✅ Batas konkurensi adaptif (AIMD)
+# ========================================
+class AimdLimiter:
+    """
+    Additive-increase / multiplicative-decrease untuk jumlah request paralel.
+
+    Naik ~1 slot per "jendela" request sukses yang cepat, turun setengah saat
+    error, 429 atau latensi melewati target (maksimal sekali per cooldown).
+    """
+
+    def __init__(self, initial=4, min_limit=1, max_limit=16, latency_target=2.0, decrease_cooldown=2.0):
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target = latency_target
+        self.decrease_cooldown = decrease_cooldown
+        self.in_flight = 0
+        self.waiting = 0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+        self._latencies = deque(maxlen=200)
+        self._outcomes = deque(maxlen=200)
+
+    def acquire(self):
+        with self._cond:
+            self.waiting += 1
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.waiting -= 1
+            self.in_flight += 1
+
+    def release(self, latency, ok):
+        with self._cond:
+            self.in_flight -= 1
+            self._latencies.append(latency)
+            self._outcomes.append(ok)
+            now = time.monotonic()
+            if not ok or latency > self.latency_target:
+                if now - self._last_decrease >= self.decrease_cooldown:
+                    self.limit = max(self.min_limit, self.limit / 2)
+                    self._last_decrease = now
+            else:
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            self._cond.notify_all()
+
+    def snapshot(self):
+        with self._cond:
+            outcomes = list(self._outcomes)
+            latencies = list(self._latencies)
+            return {
+                "concurrency_limit": int(self.limit),
+                "in_flight": self.in_flight,
+                "waiting": self.waiting,
+                "error_rate": (outcomes.count(False) / len(outcomes)) if outcomes else 0.0,
+                "avg_latency": (sum(latencies) / len(latencies)) if latencies else 0.0,
+            }
+
+
+# ========================================
+# ✅ Governor global (dipakai semua thread & session)
+# ========================================
+class RateGovernor:
+    def __init__(self, limits=None, max_retries=MAX_RETRIES, **aimd_kwargs):
+        limits = limits or DEFAULT_LIMITS
+        self.buckets = {name: TokenBucket(cfg["rate"], cfg["burst"]) for name, cfg in limits.items()}
+        self.concurrency = AimdLimiter(**aimd_kwargs)
+        self.max_retries = max_retries
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.concurrency.max_limit)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def get(self, url, endpoint_class=None, timeout=10, **kwargs):
+        """
+        GET lewat token bucket + limiter AIMD. Respons 429/503 dengan Retry-After
+        akan mem-pause bucket terkait lalu dicoba ulang (maks. max_retries).
+
+        Returns:
+            requests.Response: Respons terakhir (caller tetap memanggil raise_for_status()).
+        """
+        endpoint_class = endpoint_class or classify_endpoint(url)
+        bucket = self.buckets.get(endpoint_class) or self.buckets["public"]
+
+        for attempt in range(self.max_retries + 1):
+            bucket.acquire()
+            self.concurrency.acquire()
+            start = time.monotonic()
+            ok = False
+            try:
+                response = self.session.get(url, timeout=timeout, **kwargs)
+                ok = response.status_code < 500 and response.status_code != 429
+            finally:
+                self.concurrency.release(time.monotonic() - start, ok)
+
+            if response.status_code in (429, 503) and attempt < self.max_retries:
+                delay = parse_retry_after(response.headers.get("Retry-After"), default=2.0 ** attempt)
+                logger.warning(f"⏳ Indodax membalas {response.status_code} untuk {endpoint_class}, jeda {delay:.1f} detik.")
+                bucket.pause(delay)
+                continue
+            return response
+        return response
+
+    def stats(self):
+        """Rate teramati, konfigurasi dan kedalaman antrean per kelas endpoint."""
+        result = {"concurrency": self.concurrency.snapshot(), "endpoints": {}}
+        for name, bucket in self.buckets.items():
+            result["endpoints"][name] = {
+                "configured_rate": bucket.rate,
+                "observed_rate": round(bucket.observed_rate(), 3),
+                "tokens": round(bucket.tokens, 2),
+                "queue_depth": bucket.waiting,
+                "paused_for": round(max(0.0, bucket.paused_until - time.monotonic()), 1),
+            }
+        return result
+
+
+_governor = None
+_governor_lock = threading.Lock()
+
+
+def get_governor():
+    global _governor
+    with _governor_lock:
+        if _governor is None:
+            _governor = RateGovernor()
+        return _governor
+
+
+def governed_get(url, endpoint_class=None, **kwargs):
+    return get_governor().get(url, endpoint_class=endpoint_class, **kwargs)
+
+
+def get_rate_stats():
+    return get_governor().stats()
@@ -0,0 +1,309 @@
+"""
+Auto-scan semua pair tanpa Streamlit.
+
+Bisa dijalankan sebagai daemon:
+    python -m modules.scanner            # scan tiap jam (default)
+    python -m modules.scanner --once     # satu siklus lalu keluar
+
+Modul berat (pandas, ta, schedule) baru diimpor saat dibutuhkan sehingga
+`--help` dan pemuatan konfigurasi tetap cepat.
+"""
+import argparse
+import logging
+import time
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# === alerts_from_indicators ===
+def alerts_from_indicators(df_with_indicators):
+    """Aturan alert (RSI ekstrem, MACD crossover) dari candle terakhir frame berindikator."""
+    if df_with_indicators is None or df_with_indicators.empty:
+        return []
+    latest = df_with_indicators.iloc[-1]
+    alerts = []
+    if latest.get('rsi', 50) > 70: alerts.append(f"RSI Overbought ({latest['rsi']:.2f})")
+    elif latest.get('rsi', 50) < 30: alerts.append(f"RSI Oversold ({latest['rsi']:.2f})")
+
+    macd = latest.get('macd')
+    macd_signal = latest.get('macd_signal')
+    macd_hist = latest.get('macd_histogram')
+    if macd is not None and macd_signal is not None and macd_hist is not None:
+        prev_macd_hist = df_with_indicators['macd_histogram'].iloc[-2] if len(df_with_indicators) > 1 else 0
+        if macd > macd_signal and prev_macd_hist <= 0:
+            alerts.append("MACD Bullish Crossover")
+        elif macd < macd_signal and prev_macd_hist >= 0:
+            alerts.append("MACD Bearish Crossover")
+    return alerts
+
+
+def fetch_candles(pair, tf='1h', limit=100, history=False):
+    """Candle untuk scan: dari /trades saja, atau digabung riwayat backfill (modules.ohlc_history)."""
+    if history:
+        from modules.ohlc_history import get_candles_with_history
+        return get_candles_with_history(pair, tf, limit=limit)
+    from modules.indodax_api import get_candlestick_data
+    return get_candlestick_data(pair, tf=tf, limit=limit)
+
+
+# === scan_pair / scan_pairs_in_pool ===
+def scan_pair(pair, tf='1h', limit=100, history=False):
+    """Hitung indikator untuk satu pair dan kembalikan daftar alert (bisa kosong)."""
+    from modules.indicators import apply_indicators
+
+    from modules.metrics import timed
+
+    df = fetch_candles(pair, tf=tf, limit=limit, history=history)
+    if df is None or df.empty:
+        return []
+    with timed("indicators", pair=pair, tf=tf):
+        df = apply_indicators(df.copy())
+    with timed("scan", pair=pair, tf=tf):
+        return alerts_from_indicators(df)
+
+
+def scan_pairs_in_pool(pairs, workers, tf='1h', limit=100, history=False):
+    """
+    Ambil candle semua pair (I/O, di proses ini) lalu hitung indikator + sinyal
+    secara paralel di pool proses (modules.worker_pool).
+
+    Returns:
+        dict: {pair: daftar alert}
+    """
+    from modules.metrics import timed
+    from modules.worker_pool import get_worker_pool
+
+    candles = {}
+    for p in pairs:
+        try:
+            candles[p] = fetch_candles(p, tf=tf, limit=limit, history=history)
+        except Exception as e:
+            logger.warning(f"Error saat mengambil candle {p}: {e}")
+    # Indikator + scan berjalan di proses worker: yang terukur di sini total per siklus
+    with timed("indicators_pool", tf=tf):
+        results = get_worker_pool(workers).run(candles)
+    alerts = {}
+    for p, result in results.items():
+        if "error" in result:
+            logger.warning(f"Error saat auto-scan pair {p}: {result['error']}")
+        elif result["alerts"]:
+            alerts[p] = result["alerts"]
+    return alerts
+
+
+# === write_auto_scan_log ===
+def write_auto_scan_log(alerted_pairs_info, tf='1h'):
+    """Catat hasil auto-scan ke event log (buffer, ditulis per batch oleh modules.event_log)."""
+    from modules.event_log import get_event_log
+
+    events = get_event_log()
+    for item in alerted_pairs_info:
+        events.log("auto_scan", item['pair'], message=", ".join(item['signals']), signals=item['signals'], source="scanner", tf=tf)
+    logger.info(f"Hasil auto-scan dicatat ke event log. Sinyal pada: {', '.join([i['pair'] for i in alerted_pairs_info])}")
+
+
+# === screen_stage ===
+def screen_stage(pairs, thresholds, window_seconds=3600):
+    """
+    Tahap 1 funnel: saring `pairs` dari satu snapshot /api/tickers (modules.screener).
+    Jika tickers gagal diambil, semua pair diteruskan ke tahap 2.
+
+    Returns:
+        tuple: (pair kandidat, dict jumlah per filter atau None jika screening dilewati)
+    """
+    from modules.indodax_api import fetch_all_tickers
+    from modules.screener import screen_pairs
+
+    tickers = fetch_all_tickers()
+    if not tickers:
+        logger.warning("Snapshot tickers kosong, screening tahap 1 dilewati (semua pair di-scan).")
+        return pairs, None
+    return screen_pairs(pairs, tickers, window_seconds=window_seconds, thresholds=thresholds)
+
+
+def log_funnel(funnel):
+    """Jumlah pair per tahap ke log + gauge Prometheus, untuk menyetel ambang screening."""
+    from modules.metrics import metrics
+
+    for stage, count in funnel["stages"].items():
+        metrics.set_gauge("auto_scan_funnel", count, stage=stage)
+    screen = funnel.get("screen")
+    if screen:
+        for name in ("liquid", "change", "range", "volume", "no_baseline", "not_in_tickers"):
+            metrics.set_gauge("auto_scan_screen_pass", screen[name], filter=name)
+        age = "tanpa baseline" if screen["baseline_age"] is None else f"baseline {screen['baseline_age']}s"
+        logger.info(
+            f"🧪 Screening tahap 1 ({age}): likuid {screen['liquid']}, harga {screen['change']}, "
+            f"range {screen['range']}, volume {screen['volume']}, tanpa baseline {screen['no_baseline']}, "
+            f"tidak ada di tickers {screen['not_in_tickers']}"
+        )
+    logger.info("🔻 Funnel auto-scan: " + " → ".join(f"{stage} {count}" for stage, count in funnel["stages"].items()))
+
+
+# === auto_scan_all_pairs_job ===
+def auto_scan_all_pairs_job(available_pairs, telegram_token=None, telegram_chat_id=None, workers=0, history=False,
+                            screen=None, screen_window=3600):
+    """
+    Scan semua pair, kirim digest alert ke outbox Telegram dan catat hasilnya ke event log.
+    `workers` > 1 mengaktifkan mode pool proses (indikator dihitung di luar GIL);
+    `history` menggabungkan candle dengan riwayat OHLC hasil backfill;
+    `screen` (dict ambang dari modules.screener.screen_thresholds) mengaktifkan
+    tahap 1 murah dari /api/tickers sehingga hanya kandidat yang diambil candlenya.
+    """
+    from modules.circuit_breaker import is_pair_skipped
+    from modules.metrics import metrics, timed
+    from modules.telegram_outbox import get_outbox
+
+    logger.info("Memulai auto-scan semua pair...")
+    cycle_start = time.perf_counter()
+    alerted_pairs_info = []
+    alert_blocks = []
+    skipped_pairs = [p for p in available_pairs if is_pair_skipped(p)]
+    skipped = set(skipped_pairs)
+    scan_pairs = [p for p in available_pairs if p not in skipped]
+    funnel = {"stages": {"pair": len(available_pairs), "aktif": len(scan_pairs)}}
+    if screen is not None:
+        with timed("screen"):
+            scan_pairs, funnel["screen"] = screen_stage(scan_pairs, screen, screen_window)
+        funnel["stages"]["kandidat"] = len(scan_pairs)
+
+    if workers and workers > 1:
+        alerts_by_pair = scan_pairs_in_pool(scan_pairs, workers, history=history)
+    else:
+        alerts_by_pair = {}
+        for p in scan_pairs:
+            try:
+                alerts = scan_pair(p, history=history)
+                if alerts:
+                    alerts_by_pair[p] = alerts
+            except Exception as e:
+                # Jeda/backoff ditangani oleh rate governor (modules.rate_limiter)
+                logger.warning(f"Error saat auto-scan pair {p}: {e}")
+
+    for p, alerts in alerts_by_pair.items():
+        alert_blocks.append(f"<b>{p.upper()}</b>\n" + "\n".join([f"- {a}" for a in alerts]))
+        alerted_pairs_info.append({'pair': p, 'signals': alerts, 'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")})
+        logger.info(f"Sinyal auto-scan terdeteksi di {p.upper()}: {', '.join(alerts)}")
+
+    funnel["stages"]["alert"] = len(alerts_by_pair)
+    log_funnel(funnel)
+
+    if skipped_pairs:
+        logger.info(f"{len(skipped_pairs)} pair dilewati (circuit breaker open / data kosong): {', '.join(skipped_pairs[:20])}")
+
+    if alerted_pairs_info:
+        # Satu siklus = satu digest (dipecah otomatis jika > 4096 karakter)
+        header = f"🚨 Sinyal Auto-Scan (1H) - {len(alerted_pairs_info)} pair"
+        get_outbox(telegram_token).enqueue_digest(alert_blocks, telegram_chat_id, header=header)
+        write_auto_scan_log(alerted_pairs_info)
+    else:
+        logger.info("Auto-scan selesai: tidak ada sinyal baru yang signifikan terdeteksi.")
+
+    metrics.observe("auto_scan_cycle", time.perf_counter() - cycle_start)
+    metrics.inc("auto_scan_alerts", len(alerted_pairs_info))
+    try:
+        metrics.write_prometheus()
+    except OSError as e:
+        logger.warning(f"Gagal menulis file metrik: {e}")
+    return alerted_pairs_info
+
+
+# === run_auto_scan_scheduler ===
+def run_auto_scan_scheduler(available_pairs, telegram_token=None, telegram_chat_id=None, interval_seconds=3600, workers=0,
+                            history=False, screen=None):
+    import schedule
+
+    schedule.every(interval_seconds).seconds.do(
+        auto_scan_all_pairs_job, available_pairs, telegram_token, telegram_chat_id, workers, history, screen, interval_seconds
+    )
+    logger.info(f"Auto-scan semua pair diatur untuk berjalan setiap {interval_seconds} detik.")
+    while True:
+        schedule.run_pending()
+        time.sleep(30)
+
+
+# === CLI ===
+def build_arg_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m modules.scanner",
+        description="Daemon auto-scan Read ONE Trade (tanpa Streamlit).",
+    )
+    parser.add_argument("--config", help="Path file TOML (default: .streamlit/secrets.toml)")
+    parser.add_argument("--once", action="store_true", help="Jalankan satu siklus scan lalu keluar")
+    parser.add_argument("--interval", type=int, default=3600, help="Jeda antar siklus dalam detik (default: 3600)")
+    parser.add_argument("--pairs", help="Daftar pair dipisah koma (default: semua pair Indodax)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Jumlah proses worker indikator (0/1 = di proses utama; default: indicator_workers di config)")
+    parser.add_argument("--backfill", action="store_true", default=None,
+                        help="Gabungkan candle dengan riwayat OHLC lokal (default: history_backfill di config)")
+    parser.add_argument("--screen", action="store_true", default=None,
+                        help="Saring pair dulu dari snapshot /api/tickers, hanya kandidat yang di-scan penuh "
+                             "(default: scan_screening di config; ambang screen_* di config)")
+    parser.add_argument("--profile", action="store_true",
+                        help="Profil siklus scan pertama (cProfile + sampling) ke data/profiles/")
+    parser.add_argument("--metrics-port", type=int, default=None,
+                        help="Port endpoint /metrics Prometheus (0 = mati; default: metrics_port di config)")
+    parser.add_argument("--log-level", default="INFO")
+    return parser
+
+
+def main(argv=None):
+    args = build_arg_parser().parse_args(argv)
+    logging.basicConfig(level=args.log_level.upper(), format='%(asctime)s - %(levelname)s - %(message)s')
+
+    from modules.config import load_config
+    config = load_config(args.config)
+    token, chat_id = config["telegram_token"], config["telegram_chat_id"]
+    workers = args.workers if args.workers is not None else config["indicator_workers"]
+    history = args.backfill if args.backfill is not None else config["history_backfill"]
+    screening = args.screen if args.screen is not None else config["scan_screening"]
+    screen = None
+    if screening:
+        from modules.screener import screen_thresholds
+        screen = screen_thresholds(config)
+    if not token or not chat_id:
+        logger.warning("Telegram token/chat id kosong, alert hanya dicatat ke log.")
+
+    metrics_port = args.metrics_port if args.metrics_port is not None else config["metrics_port"]
+    if metrics_port:
+        from modules.metrics import start_metrics_server
+        start_metrics_server(metrics_port)
+
+    from modules.pair_registry import load_pair_registry
+    registry = load_pair_registry()
+    if args.pairs:
+        # Alias apa pun (btcidr, BTCIDR, btc_idr) dinormalisasi ke id kanonik
+        available_pairs = [registry.canonical(p.strip(), p.strip().lower()) for p in args.pairs.split(",") if p.strip()]
+    else:
+        available_pairs = registry.ids()
+    if not available_pairs:
+        logger.error("Daftar pair kosong, auto-scan dibatalkan.")
+        return 1
+
+    if args.profile:
+        from modules.profiler import ProfileSession
+        with ProfileSession("auto_scan", pair=f"{len(available_pairs)}pairs", tf="1h") as session:
+            auto_scan_all_pairs_job(available_pairs, token, chat_id, workers, history, screen, args.interval)
+        if session.result:
+            logger.info(f"🔬 Profil siklus auto-scan: {session.result['pstats_path']}")
+            for row in session.result["top_cumtime"][:10]:
+                logger.info(f"   {row['cumtime']:8.3f}s kumulatif  {row['ncalls']:>8} panggilan  {row['function']}")
+    if args.once:
+        from modules.event_log import get_event_log
+        from modules.telegram_outbox import get_outbox
+        if not args.profile:
+            auto_scan_all_pairs_job(available_pairs, token, chat_id, workers, history, screen, args.interval)
+        get_event_log().flush()
+        if not get_outbox(token).flush(timeout=120):
+            logger.warning("Sebagian pesan Telegram belum terkirim; akan dikirim ulang saat start berikutnya.")
+        return 0
+
+    if not args.profile:
+        auto_scan_all_pairs_job(available_pairs, token, chat_id, workers, history, screen, args.interval)
+    run_auto_scan_scheduler(available_pairs, token, chat_id, interval_seconds=args.interval, workers=workers, history=history,
+                            screen=screen)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,162 @@
+"""
+Tahap 1 auto-scan: penyaringan murah semua pair dari satu snapshot /api/tickers.
+
+Hanya pair yang lolos salah satu filter berikut yang diteruskan ke tahap 2
+(candle /trades + indikator + aturan sinyal):
+
+    change  |perubahan harga| sejak snapshot baseline (± satu interval scan) >= screen_min_change_pct
+    range   range 24 jam >= screen_min_range_pct dan harga terakhir berada di tepi
+            range (<= screen_edge_fraction dari high/low)
+    volume  kenaikan volume IDR 24 jam sejak baseline >= screen_min_volume_delta_pct
+
+Pair di bawah screen_min_vol_idr selalu dibuang; pair tanpa baseline (listing
+baru / start pertama) selalu diteruskan agar tidak ada alert yang hilang.
+Baseline disimpan ke data/screen_baseline.npz sehingga `--once` dari cron tetap
+punya pembanding.
+"""
+import os
+import time
+import logging
+
+import numpy as np
+import pandas as pd
+
+from modules.config import FLOAT_KEYS
+from modules.movers import MarketSnapshot, WINDOW_TOLERANCE, align_values, market_history, record_tickers
+
+logger = logging.getLogger(__name__)
+
+# ========================================
+# 🧪 Filter vektor dari snapshot tickers
+# ========================================
+BASELINE_PATH = os.path.join("data", "screen_baseline.npz")
+SCREEN_DEFAULTS = {key: value for key, value in FLOAT_KEYS.items() if key.startswith("screen_")}
+FILTERS = ("change", "range", "volume", "no_baseline")
+
+
+def screen_thresholds(config=None):
+    """Ambang screening dari config (hasil load_config), default untuk kunci yang tidak ada."""
+    config = config or {}
+    return {key: float(config.get(key, default)) for key, default in SCREEN_DEFAULTS.items()}
+
+
+def load_baseline(path=BASELINE_PATH):
+    try:
+        with np.load(path) as data:
+            return MarketSnapshot(float(data["ts"]), data["pairs"], data["last"], data["vol_idr"], data["change_24h"])
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Baseline screening '{path}' tidak bisa dibaca: {e}")
+        return None
+
+
+def save_baseline(snapshot, path=BASELINE_PATH):
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(tmp_path, ts=snapshot.ts, pairs=snapshot.pairs.astype(str), last=snapshot.last,
+                 vol_idr=snapshot.vol_idr, change_24h=snapshot.change_24h)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"Gagal menyimpan baseline screening: {e}")
+
+
+def find_baseline(now, window_seconds, stored=None):
+    """
+    Snapshot pembanding berumur ± `window_seconds`: riwayat dalam proses
+    (modules.movers) lebih dulu, lalu baseline tersimpan. None jika tidak ada
+    yang cukup dekat (umur < separuh atau > dua kali window).
+    """
+    candidates = [market_history.at(now - window_seconds * (1 - WINDOW_TOLERANCE)), stored]
+    valid = [s for s in candidates if s is not None and window_seconds / 2 <= now - s.ts <= window_seconds * 2]
+    return min(valid, key=lambda s: abs(now - s.ts - window_seconds)) if valid else None
+
+
+def _price_range(tickers, pairs):
+    high = np.empty(len(pairs), dtype=np.float64)
+    low = np.empty(len(pairs), dtype=np.float64)
+    for i, pair in enumerate(pairs):
+        info = tickers[pair]
+        high[i] = info.get("high", np.nan)
+        low[i] = info.get("low", np.nan)
+    return high, low
+
+
+def screen_snapshot(snapshot, high, low, baseline=None, thresholds=None):
+    """
+    Semua filter tahap 1 untuk seluruh pair sekaligus.
+
+    Returns:
+        pd.DataFrame: index = pair; kolom metrik (change_pct, range_pct,
+        range_position, volume_delta_pct), satu kolom bool per filter dan
+        `candidate`.
+    """
+    t = dict(SCREEN_DEFAULTS, **(thresholds or {}))
+    last, vol_idr = snapshot.last, snapshot.vol_idr
+    if baseline is not None:
+        base_last = align_values(snapshot.pairs, baseline, "last")
+        base_vol = align_values(snapshot.pairs, baseline, "vol_idr")
+    else:
+        base_last = base_vol = np.full(len(snapshot), np.nan)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        change_pct = np.where(base_last > 0, (last - base_last) / base_last * 100, np.nan)
+        volume_delta_pct = np.where(base_vol > 0, (vol_idr - base_vol) / base_vol * 100, np.nan)
+        range_pct = np.where(low > 0, (high - low) / low * 100, np.nan)
+        range_position = np.where(high > low, (last - low) / (high - low), np.nan)
+
+    liquid = vol_idr >= t["screen_min_vol_idr"]
+    edge = t["screen_edge_fraction"]
+    # Perbandingan dengan NaN selalu False: metrik yang tidak tersedia tidak meloloskan pair
+    passed = {
+        "change": np.abs(change_pct) >= t["screen_min_change_pct"],
+        "range": (range_pct >= t["screen_min_range_pct"]) & ((range_position <= edge) | (range_position >= 1 - edge)),
+        "volume": volume_delta_pct >= t["screen_min_volume_delta_pct"],
+        "no_baseline": np.isnan(base_last),
+    }
+    candidate = liquid & np.logical_or.reduce([passed[name] for name in FILTERS])
+
+    frame = pd.DataFrame({
+        "change_pct": change_pct,
+        "range_pct": range_pct,
+        "range_position": range_position,
+        "volume_delta_pct": volume_delta_pct,
+        "liquid": liquid,
+        **{f"pass_{name}": liquid & passed[name] for name in FILTERS},
+        "candidate": candidate,
+    }, index=pd.Index(snapshot.pairs, name="Pair"))
+    return frame
+
+
+def screen_pairs(pairs, tickers, window_seconds=3600, thresholds=None, baseline_path=BASELINE_PATH, now=None):
+    """
+    Tahap 1 untuk `pairs` dari dict fetch_all_tickers.
+
+    Returns:
+        tuple: (daftar pair kandidat dalam urutan `pairs`, dict jumlah per tahap/filter)
+    """
+    now = now or time.time()
+    snapshot = record_tickers(tickers, now)
+    baseline = find_baseline(now, window_seconds, load_baseline(baseline_path))
+    high, low = _price_range(tickers, snapshot.pairs)
+    result = screen_snapshot(snapshot, high, low, baseline, thresholds)
+    save_baseline(snapshot, baseline_path)
+
+    known = result.reindex(pairs)
+    # Pair yang tidak ada di snapshot tickers tidak bisa disaring: teruskan ke tahap 2
+    missing = known["candidate"].isna().to_numpy()
+
+    def passed(column):
+        return known[column].to_numpy(dtype=bool, na_value=False)
+
+    candidates = [pair for pair, keep in zip(pairs, passed("candidate") | missing) if keep]
+    counts = {
+        "input": len(pairs),
+        "liquid": int(passed("liquid").sum()),
+        **{name: int(passed(f"pass_{name}").sum()) for name in FILTERS},
+        "not_in_tickers": int(missing.sum()),
+        "candidates": len(candidates),
+        "baseline_age": None if baseline is None else round(now - baseline.ts),
+    }
+    return candidates, counts
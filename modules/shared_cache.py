@@ -0,0 +1,368 @@
+"""
+Cache lintas proses untuk deployment multi-worker (beberapa server Streamlit di
+belakang load balancer). Snapshot ticker dan frame candle+indikator per
+(pair, timeframe) dipublikasikan ke file memory-mapped (default di /dev/shm),
+satu segmen per kunci:
+
+    [header 32 byte: magic, layout, seq, panjang payload, waktu tulis][payload]
+
+Konsistensi tanpa lock di sisi pembaca memakai seqlock: penulis menaikkan `seq`
+menjadi ganjil, menulis payload, lalu menaikkannya lagi menjadi genap. Pembaca
+menyalin payload dan menerimanya hanya jika `seq` genap dan tidak berubah.
+Hanya satu proses yang mengambil data ke API per segmen (flock non-blocking);
+proses lain menunggu versi baru, jadi beban upstream tetap walau jumlah proses
+bertambah.
+
+Payload hanya frame kolumnar atau JSON (tidak pernah pickle), dan direktori
+segmen wajib milik user proses ini tanpa izin tulis group/other: isi segmen
+berasal dari proses lain sehingga diperlakukan sebagai data, bukan kode.
+"""
+import os
+import re
+import json
+import mmap
+import stat
+import time
+import struct
+import logging
+import threading
+
+from modules.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+try:
+    import fcntl
+except ImportError:  # Windows: tanpa flock, cache lintas proses tidak tersedia
+    fcntl = None
+
+# ========================================
+# 🔗 Segmen shared memory (mmap) dengan header seqlock
+# ========================================
+DEFAULT_SHARED_DIR = "/dev/shm/readonetrade" if os.path.isdir("/dev/shm") else os.path.join("data", "shm")
+HEADER = struct.Struct("<4sIQQd")  # magic, layout, seq, panjang payload, waktu tulis (epoch)
+MAGIC = b"ROTS"
+LAYOUT_VERSION = 1
+INITIAL_CAPACITY = 1 << 20
+READ_RETRIES = 50
+WAIT_TIMEOUT_SECONDS = 10.0
+POLL_INTERVAL_SECONDS = 0.05
+FRAME_DTYPE_KINDS = "biufM"
+
+
+class UnsupportedPayload(TypeError):
+    """Nilai tidak bisa diserialisasi tanpa pickle; tidak dipublikasikan."""
+
+
+def encode_payload(value, stamp=None):
+    """
+    DataFrame numerik (RangeIndex, nama kolom string) -> metadata JSON + buffer
+    kolom mentah; dict/list (tickers, summary) -> JSON. Nilai lain menaikkan
+    UnsupportedPayload.
+    """
+    import numpy as np
+    import pandas as pd
+
+    meta = {"stamp": stamp}
+    buffers = []
+    if (isinstance(value, pd.DataFrame) and isinstance(value.index, pd.RangeIndex)
+            and all(isinstance(name, str) for name in value.columns)
+            and all(isinstance(dtype, np.dtype) and dtype.kind in FRAME_DTYPE_KINDS for dtype in value.dtypes)):
+        columns = []
+        offset = 0
+        for name in value.columns:
+            array = np.ascontiguousarray(value[name].to_numpy())
+            columns.append([name, array.dtype.str, offset, array.nbytes])
+            buffers.append(array.tobytes())
+            offset += array.nbytes
+        meta.update(kind="frame", rows=len(value), index_start=value.index.start, columns=columns,
+                    attrs=value.attrs if _json_safe(value.attrs) else {})
+    elif isinstance(value, (dict, list)):
+        meta["kind"] = "json"
+        try:
+            buffers.append(json.dumps(value, allow_nan=True).encode())
+        except (TypeError, ValueError) as e:
+            raise UnsupportedPayload(f"nilai tidak bisa diserialisasi ke JSON: {e}") from e
+    else:
+        raise UnsupportedPayload(f"tipe {type(value).__name__} tidak didukung shared cache")
+    meta_bytes = json.dumps(meta).encode()
+    return b"".join([struct.pack("<I", len(meta_bytes)), meta_bytes, *buffers])
+
+
+def decode_payload(payload):
+    """Kebalikan encode_payload -> (stamp, nilai)."""
+    import numpy as np
+    import pandas as pd
+
+    (meta_length,) = struct.unpack_from("<I", payload, 0)
+    meta = json.loads(payload[4:4 + meta_length])
+    body = 4 + meta_length
+    if meta["kind"] == "json":
+        return meta["stamp"], json.loads(payload[body:])
+    if meta["kind"] != "frame":
+        raise ValueError(f"jenis payload tidak dikenal: {meta['kind']!r}")
+    data = {}
+    for name, dtype, offset, nbytes in meta["columns"]:
+        dtype = np.dtype(dtype)
+        data[name] = np.frombuffer(payload, dtype=dtype, count=nbytes // dtype.itemsize, offset=body + offset)
+    start = meta["index_start"]
+    frame = pd.DataFrame(data, index=pd.RangeIndex(start, start + meta["rows"]))
+    frame.attrs.update(meta["attrs"])
+    return meta["stamp"], frame
+
+
+def _json_safe(value):
+    try:
+        json.dumps(value)
+        return True
+    except (TypeError, ValueError):
+        return False
+
+
+def ensure_private_dir(directory):
+    """
+    Buat direktori segmen dengan mode 0700; tolak direktori milik user lain atau
+    yang bisa ditulis group/other (mis. dibuat duluan oleh user lain di /dev/shm).
+    """
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    info = os.lstat(directory)
+    if not stat.S_ISDIR(info.st_mode):
+        raise PermissionError(f"'{directory}' bukan direktori (symlink?)")
+    if info.st_uid != os.getuid():
+        raise PermissionError(f"'{directory}' dimiliki uid {info.st_uid}, bukan uid proses ini ({os.getuid()})")
+    if info.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+        raise PermissionError(f"'{directory}' bisa ditulis group/other (mode {stat.S_IMODE(info.st_mode):o})")
+    return directory
+
+
+def _segment_name(key):
+    return re.sub(r"[^A-Za-z0-9_.-]+", "-", key).strip("-") + ".seg"
+
+
+class SharedSegment:
+    """Satu file mmap. write() hanya dipanggil pemegang try_lock(); read() tanpa lock lintas proses."""
+
+    def __init__(self, path):
+        self.path = path
+        self.local_lock = threading.Lock()  # flock berlaku per proses, thread sesi perlu lock sendiri
+        self._map_lock = threading.Lock()  # remap/close tidak boleh terjadi saat thread lain menyalin
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_NOFOLLOW, 0o600)
+        self._map = None
+
+    def _remap(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        size = os.fstat(self._fd).st_size
+        if size >= HEADER.size:
+            self._map = mmap.mmap(self._fd, size)
+        return self._map
+
+    def try_lock(self):
+        try:
+            fcntl.flock(self._fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except BlockingIOError:
+            return False
+
+    def unlock(self):
+        fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def write(self, payload):
+        with self._map_lock:
+            return self._write(payload)
+
+    def _write(self, payload):
+        needed = HEADER.size + len(payload)
+        if self._map is None or len(self._map) < needed:
+            if os.fstat(self._fd).st_size < needed:
+                # File hanya membesar: pemetaan lama di proses pembaca tetap valid sampai mereka remap
+                os.ftruncate(self._fd, max(INITIAL_CAPACITY, 1 << (needed - 1).bit_length()))
+            self._remap()
+        mapped = self._map
+        magic, _, seq, _, _ = HEADER.unpack_from(mapped, 0)
+        seq = seq if magic == MAGIC else 0
+        # Seq ganjil tersisa dari penulis yang mati di tengah jalan: lompat ke ganjil berikutnya
+        writing = seq + 1 if seq % 2 == 0 else seq + 2
+        now = time.time()
+        HEADER.pack_into(mapped, 0, MAGIC, LAYOUT_VERSION, writing, len(payload), now)
+        mapped[HEADER.size:needed] = payload
+        HEADER.pack_into(mapped, 0, MAGIC, LAYOUT_VERSION, writing + 1, len(payload), now)
+        return writing + 1
+
+    def read(self):
+        """(seq, waktu tulis, payload) versi konsisten terakhir, atau None."""
+        with self._map_lock:
+            return self._read()
+
+    def _read(self):
+        for _ in range(READ_RETRIES):
+            mapped = self._map or self._remap()
+            if mapped is None:
+                return None
+            magic, layout, seq, length, written_at = HEADER.unpack_from(mapped, 0)
+            if magic != MAGIC or layout != LAYOUT_VERSION or seq == 0:
+                return None
+            if seq % 2:
+                time.sleep(0)  # penulis sedang menulis
+                continue
+            if HEADER.size + length > len(mapped):
+                self._remap()  # segmen sudah diperbesar penulis
+                continue
+            payload = mapped[HEADER.size:HEADER.size + length]
+            if HEADER.unpack_from(mapped, 0)[2] == seq:
+                return seq, written_at, payload
+        return None
+
+    def close(self):
+        with self._map_lock:
+            if self._map is not None:
+                self._map.close()
+                self._map = None
+            os.close(self._fd)
+
+
+class SharedCache:
+    """
+    get_or_publish(): baca segmen; jika basi, satu proses (pemegang flock)
+    menghitung & mempublikasikan, proses lain menunggu versi baru. Penunggu
+    menjadi penulis begitu lock lepas tanpa versi baru, dan menghitung sendiri
+    sebagai cadangan jika penulis belum selesai setelah `wait_timeout`.
+    """
+
+    def __init__(self, directory=DEFAULT_SHARED_DIR, wait_timeout=WAIT_TIMEOUT_SECONDS):
+        self.directory = ensure_private_dir(directory)
+        self.wait_timeout = wait_timeout
+        self._lock = threading.Lock()
+        self._segments = {}
+        self.hits = 0
+        self.published = 0
+        self.waited = 0
+        self.fallbacks = 0
+
+    def _segment(self, key):
+        with self._lock:
+            segment = self._segments.get(key)
+            if segment is None:
+                segment = self._segments[key] = SharedSegment(os.path.join(self.directory, _segment_name(key)))
+            return segment
+
+    def read(self, key):
+        """(stamp, waktu tulis, nilai) atau None jika belum ada / rusak."""
+        entry = self._segment(key).read()
+        if entry is None:
+            return None
+        _, written_at, payload = entry
+        try:
+            stamp, value = decode_payload(payload)
+        except Exception as e:
+            logger.warning(f"Segmen shared cache '{key}' tidak bisa dibaca: {e}")
+            return None
+        return stamp, written_at, value
+
+    def publish(self, key, value, stamp=None):
+        """Tulis tanpa pemilihan penulis (pemanggil menjamin hanya satu penulis)."""
+        return self._segment(key).write(encode_payload(value, stamp))
+
+    def get_or_publish(self, key, compute, stamp=None, max_age=None, valid=None):
+        """
+        Args:
+            key (str): Nama segmen, mis. "tickers" atau "candles/btc_idr/1H".
+            compute (callable): Mengambil/menghitung nilai baru (hanya dipanggil penulis).
+            stamp: Penanda versi (JSON), mis. [indeks candle, compact]; beda stamp = basi.
+            max_age (float): Umur maksimum data (detik), None = selama stamp sama.
+            valid (callable): Nilai yang gagal valid() tidak dipublikasikan (mis. frame kosong).
+        """
+        stamp = json.loads(json.dumps(stamp))  # tuple -> list, sama dengan hasil decode
+
+        def fresh():
+            entry = self.read(key)
+            if entry is not None and entry[0] == stamp and (max_age is None or time.time() - entry[1] <= max_age):
+                return entry
+            return None
+
+        entry = fresh()
+        if entry is not None:
+            self._count("hits", key)
+            return entry[2]
+
+        segment = self._segment(key)
+        with segment.local_lock:
+            deadline = time.monotonic() + self.wait_timeout
+            outcome = "hits"
+            while True:
+                entry = fresh()
+                if entry is not None:
+                    self._count(outcome, key)
+                    return entry[2]
+                if segment.try_lock():
+                    try:
+                        entry = fresh()  # proses lain baru saja selesai menulis
+                        if entry is not None:
+                            self._count(outcome, key)
+                            return entry[2]
+                        value = compute()
+                        if valid is None or valid(value):
+                            try:
+                                segment.write(encode_payload(value, stamp))
+                                self._count("published", key)
+                            except UnsupportedPayload as e:
+                                logger.warning(f"Nilai '{key}' tidak dipublikasikan ke shared cache: {e}")
+                        return value
+                    finally:
+                        segment.unlock()
+                if time.monotonic() >= deadline:
+                    break
+                # Proses lain sedang mengambil data yang sama: tunggu hasilnya. Jika lock
+                # lepas tanpa versi baru (nilai penulis gagal valid() atau error), proses ini
+                # langsung mengambil alih peran penulis pada putaran berikutnya.
+                outcome = "waited"
+                time.sleep(POLL_INTERVAL_SECONDS)
+        logger.warning(f"Penulis shared cache '{key}' tidak selesai dalam {self.wait_timeout}s, mengambil data sendiri.")
+        self._count("fallbacks", key)
+        return compute()
+
+    def _count(self, outcome, key):
+        setattr(self, outcome, getattr(self, outcome) + 1)
+        metrics.inc(f"shared_cache_{outcome}", kind=key.split("/", 1)[0])
+
+    def stats(self):
+        with self._lock:
+            segments = len(self._segments)
+        return {
+            "directory": self.directory,
+            "segments": segments,
+            "hits": self.hits,
+            "published": self.published,
+            "waited": self.waited,
+            "fallbacks": self.fallbacks,
+        }
+
+    def close(self):
+        with self._lock:
+            for segment in self._segments.values():
+                segment.close()
+            self._segments.clear()
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_cache(directory=None):
+    """
+    Cache lintas proses tunggal per proses; None jika platform tidak mendukung
+    flock atau direktori segmen tidak aman (lihat ensure_private_dir).
+    """
+    global _shared
+    if fcntl is None:
+        logger.warning("fcntl tidak tersedia, shared cache lintas proses dinonaktifkan.")
+        return None
+    with _shared_lock:
+        if _shared is None:
+            try:
+                _shared = SharedCache(directory or DEFAULT_SHARED_DIR)
+            except (PermissionError, OSError) as e:
+                logger.error(f"Direktori shared cache tidak aman/tidak bisa dipakai, shared cache dinonaktifkan: {e}")
+                return None
+        return _shared
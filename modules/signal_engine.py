@@ -43,11 +43,13 @@ def scan_signals(pair, df):
         ).map({True: "Strong Up Spike", False: ""})
 
         signals['pair'] = pair
-        signals['timestamp'] = signals.index
+        signals['timestamp'] = signals['date'] if 'date' in signals.columns else signals.index
 
+        # Alur taker ikut ditampilkan jika candle dibangun dari trades (lihat indodax_api.aggregate_candles)
+        flow_columns = [col for col in ('taker_buy_ratio', 'cvd', 'vwap') if col in signals.columns]
         return signals[['pair', 'timestamp', 'open', 'high', 'low', 'close', 
                         'macd', 'macd_signal_label', 'volume_spike_label', 'rsi_signal',
-                        'bb_breakout', 'bb_breakdown', 'combo_spike']]
+                        'bb_breakout', 'bb_breakdown', 'combo_spike', *flow_columns]]
 
     except Exception as e:
         logger.error(f"Error dalam scan_signals: {str(e)}", exc_info=True)
@@ -0,0 +1,145 @@
+"""
+Server WebSocket lokal pengganti stream Indodax (protokol JSON Centrifugo yang sama)
+untuk pengembangan & uji tanpa jaringan. Mengirim market:summary-24h semua pair dan
+chart:tick-<pair> untuk channel yang di-subscribe, dengan harga random walk.
+
+    python -m modules.stream_standin --port 8765 --drop-rate 0.02 --disconnect-every 120
+
+Lalu arahkan dashboard ke sana: `indodax_ws_url = "ws://127.0.0.1:8765/ws"` dan
+`market_stream = true` di secrets.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import random
+import time
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PAIRS = ("btc_idr", "eth_idr", "usdt_idr", "sol_idr", "doge_idr")
+
+
+class StandInMarket:
+    """Harga sintetis + offset per channel; `drop_rate` melewatkan publikasi (offset tetap naik)."""
+
+    def __init__(self, pairs=DEFAULT_PAIRS, drop_rate=0.0, seed=None):
+        self.rng = random.Random(seed)
+        self.drop_rate = drop_rate
+        self.prices = {pair.replace("_", ""): 10 ** self.rng.uniform(2, 9) for pair in pairs}
+        self.open_24h = dict(self.prices)
+        self.low = dict(self.prices)
+        self.high = dict(self.prices)
+        self.volume = {pair_id: 0.0 for pair_id in self.prices}
+        self.offsets = {}
+        self.trade_id = 0
+
+    def _publish(self, channel, data):
+        offset = self.offsets.get(channel, 0) + 1
+        self.offsets[channel] = offset
+        if self.rng.random() < self.drop_rate:
+            return None
+        return json.dumps({"result": {"channel": channel, "data": {"data": data, "offset": offset}}})
+
+    def step(self, channels):
+        """Satu tick pasar; kembalikan pesan untuk channel yang diminta."""
+        now = int(time.time())
+        messages = []
+        for pair_id, price in self.prices.items():
+            price = max(price * (1 + self.rng.gauss(0, 0.001)), 1e-8)
+            amount = self.rng.expovariate(1.0)
+            self.prices[pair_id] = price
+            self.low[pair_id] = min(self.low[pair_id], price)
+            self.high[pair_id] = max(self.high[pair_id], price)
+            self.volume[pair_id] += amount
+            channel = f"chart:tick-{pair_id}"
+            if channel in channels:
+                self.trade_id += 1
+                message = self._publish(channel, [[now, self.trade_id, pair_id, round(price, 8), f"{amount:.8f}"]])
+                if message:
+                    messages.append(message)
+        if "market:summary-24h" in channels:
+            rows = [
+                [pair_id, now, round(self.prices[pair_id], 8), round(self.low[pair_id], 8), round(self.high[pair_id], 8),
+                 round(self.open_24h[pair_id], 8), f"{self.volume[pair_id] * self.prices[pair_id]:.0f}", f"{self.volume[pair_id]:.8f}"]
+                for pair_id in self.prices
+            ]
+            message = self._publish("market:summary-24h", rows)
+            if message:
+                messages.append(message)
+        return messages
+
+
+def make_app(market, interval=1.0, disconnect_every=0.0):
+    from tornado.web import Application
+    from tornado.websocket import WebSocketHandler
+
+    clients = set()
+
+    class StreamHandler(WebSocketHandler):
+        def check_origin(self, origin):
+            return True
+
+        def open(self):
+            self.channels = set()
+            self.opened_at = time.monotonic()
+            clients.add(self)
+
+        def on_message(self, message):
+            for line in message.splitlines():
+                request = json.loads(line)
+                if request.get("method", 0) == 1:
+                    self.channels.add(request["params"]["channel"])
+                    self.write_message(json.dumps({"id": request.get("id"), "result": {}}))
+                else:
+                    self.write_message(json.dumps({"id": request.get("id"), "result": {"client": "standin", "version": "0"}}))
+
+        def on_close(self):
+            clients.discard(self)
+
+    async def publisher():
+        while True:
+            await asyncio.sleep(interval)
+            channels = set().union(*(client.channels for client in clients)) if clients else set()
+            messages = market.step(channels)
+            for client in list(clients):
+                if disconnect_every and time.monotonic() - client.opened_at > disconnect_every:
+                    client.close()
+                    continue
+                for message in messages:
+                    channel = json.loads(message)["result"]["channel"]
+                    if channel in client.channels:
+                        client.write_message(message)
+
+    app = Application([(r"/ws/?", StreamHandler)])
+    app.publisher = publisher
+    return app
+
+
+async def serve(port=8765, pairs=DEFAULT_PAIRS, interval=1.0, drop_rate=0.0, disconnect_every=0.0, ready=None):
+    app = make_app(StandInMarket(pairs, drop_rate), interval, disconnect_every)
+    server = app.listen(port, address="127.0.0.1")
+    logger.info(f"🧪 Stand-in stream Indodax di ws://127.0.0.1:{port}/ws ({len(pairs)} pair)")
+    if ready is not None:
+        ready.set()
+    try:
+        await app.publisher()
+    finally:
+        server.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Server WebSocket lokal pengganti stream Indodax.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--pairs", default=",".join(DEFAULT_PAIRS))
+    parser.add_argument("--interval", type=float, default=1.0, help="Jeda antar tick (detik)")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="Peluang publikasi dilewati (uji deteksi gap)")
+    parser.add_argument("--disconnect-every", type=float, default=0.0, help="Putuskan klien tiap N detik (uji reconnect)")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    pairs = [p.strip() for p in args.pairs.split(",") if p.strip()]
+    asyncio.run(serve(args.port, pairs, args.interval, args.drop_rate, args.disconnect_every))
+
+
+if __name__ == "__main__":
+    main()
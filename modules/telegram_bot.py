@@ -78,27 +78,20 @@ def send_telegram_photo(photo_path, token, chat_id, caption="📸 Screenshot UI"
         return False
 
 # ========================================
-# ⚙️ Opsional: Ambil Config dari Streamlit secrets
+# ⚙️ Opsional: Ambil Config dari secrets.toml / env
 # ========================================
 def get_current_config():
     """
-    Ambil konfigurasi dari st.secrets (opsional, jika digunakan dengan Streamlit).
+    Ambil konfigurasi dari `.streamlit/secrets.toml` atau environment variable
+    tanpa mengimpor Streamlit (lihat modules.config).
 
     Returns:
         dict: Konfigurasi (atau kosong jika gagal).
     """
     try:
-        import streamlit as st
-        return {
-            "exchange": st.secrets["exchange"],
-            "api_key": st.secrets["api_key"],
-            "api_secret": st.secrets["api_secret"],
-            "telegram_token": st.secrets["telegram_token"],
-            "telegram_chat_id": st.secrets["telegram_chat_id"]
-        }
-    except ImportError:
-        logger.warning("Streamlit tidak tersedia, get_current_config dilewati.")
-        return {}
+        from modules.config import CONFIG_KEYS, load_config
+        config = load_config()
+        return {key: config[key] for key in CONFIG_KEYS}
     except Exception as e:
-        logger.error(f"Gagal mengambil konfigurasi dari st.secrets: {e}")
+        logger.error(f"Gagal mengambil konfigurasi: {e}")
         return {}
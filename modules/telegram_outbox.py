@@ -0,0 +1,384 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+import logging
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from modules.rate_limiter import TokenBucket
+from modules.metrics import inc, timed
+
+logger = logging.getLogger(__name__)
+
+# ========================================
+# ⚙️ Batas Telegram Bot API
+# ========================================
+TELEGRAM_MAX_MESSAGE_LENGTH = 4096
+TELEGRAM_MAX_CAPTION_LENGTH = 1024
+GLOBAL_RATE_PER_SECOND = 25      # Telegram: ~30 pesan/detik per bot
+PER_CHAT_INTERVAL_SECONDS = 1.0  # Telegram: ~1 pesan/detik per chat
+MAX_ATTEMPTS = 8
+MAX_BACKOFF_SECONDS = 300
+MAX_CACHED_FILE_IDS = 256
+
+OUTBOX_PATH = os.path.join("data", "telegram_outbox.sqlite3")
+
+
+# ========================================
+# ✅ Gabungkan alert menjadi digest <= 4096 karakter
+# ========================================
+def build_digests(blocks, header="", limit=TELEGRAM_MAX_MESSAGE_LENGTH):
+    """
+    Gabungkan beberapa blok teks (mis. alert per pair) menjadi sesedikit mungkin
+    pesan, masing-masing tidak lebih dari `limit` karakter. Blok tidak dipotong
+    di tengah kecuali satu blok sendiri sudah melebihi batas.
+
+    Returns:
+        list[str]: Daftar pesan siap kirim.
+    """
+    separator = "\n\n"
+    digests = []
+    current = header
+    for block in blocks:
+        if not block:
+            continue
+        room = limit - len(header) - (len(separator) if header else 0)
+        if len(block) > room:
+            block = block[:room - 1] + "…"
+        candidate = f"{current}{separator}{block}" if current else block
+        if len(candidate) <= limit:
+            current = candidate
+        else:
+            digests.append(current)
+            current = f"{header}{separator}{block}" if header else block
+    if current and current != header:
+        digests.append(current)
+    return digests
+
+
+# ========================================
+# ✅ Outbox: antrean SQLite bersama + worker latar belakang
+# ========================================
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id            TEXT PRIMARY KEY,
+    kind          TEXT NOT NULL,
+    chat_id       TEXT NOT NULL,
+    fields        TEXT NOT NULL DEFAULT '{}',
+    photo         BLOB,
+    attempts      INTEGER NOT NULL DEFAULT 0,
+    next_attempt  REAL NOT NULL DEFAULT 0,
+    created       REAL NOT NULL,
+    -- Worker yang sedang mengirim item ini dan batas sewanya (proses mati -> sewa habis, item diambil lagi)
+    claimed_by    TEXT,
+    claimed_until REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_outbox_ready ON outbox (next_attempt, created);
+CREATE TABLE IF NOT EXISTS file_ids (
+    cache_key TEXT PRIMARY KEY,
+    file_id   TEXT NOT NULL,
+    updated   REAL NOT NULL
+);
+"""
+CLAIM_LEASE_SECONDS = 60
+POLL_INTERVAL_SECONDS = 5.0
+
+
+class TelegramOutbox:
+    """
+    Antrean pesan di tabel SQLite (WAL) yang dipakai bersama dashboard, daemon
+    scanner dan semua proses server. Setiap item adalah satu baris: enqueue
+    menambah satu baris, worker mengklaim satu baris secara atomik (sewa
+    `CLAIM_LEASE_SECONDS`) lalu menghapus/memperbarui baris itu saja, jadi item
+    tidak dikirim dua kali dan tidak ada proses yang menimpa antrean proses lain.
+    """
+
+    def __init__(self, token, path=OUTBOX_PATH, global_rate=GLOBAL_RATE_PER_SECOND,
+                 per_chat_interval=PER_CHAT_INTERVAL_SECONDS, max_attempts=MAX_ATTEMPTS):
+        self.token = token
+        self.path = path
+        self.per_chat_interval = per_chat_interval
+        self.max_attempts = max_attempts
+        self.worker_id = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._global_bucket = TokenBucket(global_rate, global_rate)
+        self._cond = threading.Condition()
+        self._db_lock = threading.Lock()
+        self._own = set()  # id item yang di-enqueue proses ini (untuk flush)
+        self._chat_next = {}
+        self._thread = None
+        self._sent = 0
+        self._dropped = 0
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=2))
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        pending = self._execute("SELECT COUNT(*) FROM outbox")[0][0]
+        if pending:
+            logger.info(f"📬 {pending} pesan Telegram tertunda di {self.path}.")
+
+    # --- Persistensi ---------------------------------------------------
+    def _execute(self, sql, params=()):
+        with self._db_lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _insert(self, item):
+        # Dipanggil saat memegang self._db_lock
+        fields = {k: v for k, v in item.items()
+                  if k not in ("id", "kind", "chat_id", "attempts", "next_attempt", "created", "photo")}
+        self._conn.execute(
+            "INSERT OR IGNORE INTO outbox (id, kind, chat_id, fields, photo, attempts, next_attempt, created) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (item["id"], item["kind"], str(item["chat_id"]), json.dumps(fields), item.get("photo"),
+             item.get("attempts", 0), item.get("next_attempt", 0.0), item.get("created", time.time())),
+        )
+
+    def _file_id(self, cache_key):
+        if not cache_key:
+            return None
+        rows = self._execute("SELECT file_id FROM file_ids WHERE cache_key = ?", (cache_key,))
+        return rows[0][0] if rows else None
+
+    def _remember_file_id(self, cache_key, file_id):
+        with self._db_lock:
+            self._conn.execute("INSERT OR REPLACE INTO file_ids VALUES (?, ?, ?)", (cache_key, file_id, time.time()))
+            self._conn.execute(
+                "DELETE FROM file_ids WHERE cache_key NOT IN "
+                "(SELECT cache_key FROM file_ids ORDER BY updated DESC LIMIT ?)", (MAX_CACHED_FILE_IDS,)
+            )
+
+    # --- API publik ----------------------------------------------------
+    def start(self):
+        with self._cond:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="telegram-outbox", daemon=True)
+                self._thread.start()
+        return self
+
+    def enqueue(self, kind, chat_id, **fields):
+        if not self.token or not chat_id:
+            return None
+        item = {
+            "id": uuid.uuid4().hex,
+            "kind": kind,
+            "chat_id": str(chat_id),
+            "created": time.time(),
+            **fields,
+        }
+        try:
+            with self._db_lock:
+                self._insert(item)
+        except sqlite3.Error as e:
+            logger.error(f"Gagal menyimpan pesan ke outbox Telegram: {e}")
+            return None
+        with self._cond:
+            self._own.add(item["id"])
+            self._cond.notify_all()
+        return item["id"]
+
+    def enqueue_message(self, text, chat_id, parse_mode="HTML"):
+        return self.enqueue("message", chat_id, text=text[:TELEGRAM_MAX_MESSAGE_LENGTH], parse_mode=parse_mode)
+
+    def enqueue_photo(self, photo, chat_id, caption="", cache_key=None):
+        """
+        `photo` bisa berupa bytes gambar atau path file lokal. Jika `cache_key`
+        sudah pernah terkirim, file_id Telegram dipakai ulang (tanpa upload).
+        """
+        if not isinstance(photo, (bytes, bytearray)):
+            with open(photo, "rb") as f:
+                photo = f.read()
+        return self.enqueue("photo", chat_id, photo=bytes(photo), caption=caption[:TELEGRAM_MAX_CAPTION_LENGTH], cache_key=cache_key)
+
+    def enqueue_digest(self, blocks, chat_id, header=""):
+        return [self.enqueue_message(text, chat_id) for text in build_digests(blocks, header=header)]
+
+    def _own_pending(self):
+        with self._cond:
+            own = list(self._own)
+        if not own:
+            return 0
+        placeholders = ",".join("?" * len(own))
+        remaining = {row[0] for row in self._execute(f"SELECT id FROM outbox WHERE id IN ({placeholders})", own)}
+        with self._cond:
+            self._own &= remaining | (self._own - set(own))
+            return len(self._own)
+
+    def flush(self, timeout=60):
+        """Tunggu sampai pesan yang di-enqueue proses ini terkirim (untuk mode CLI --once). True jika selesai."""
+        deadline = time.monotonic() + timeout
+        while self._own_pending():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            with self._cond:
+                self._cond.wait(min(remaining, 1.0))
+        return True
+
+    def stats(self):
+        pending, retrying = self._execute("SELECT COUNT(*), COALESCE(SUM(attempts > 0), 0) FROM outbox")[0]
+        return {
+            "pending": pending,
+            "retrying": retrying,
+            "sent": self._sent,
+            "dropped": self._dropped,
+            "cached_file_ids": self._execute("SELECT COUNT(*) FROM file_ids")[0][0],
+        }
+
+    # --- Worker --------------------------------------------------------
+    def _claim(self, now):
+        """
+        Klaim satu item siap kirim secara atomik (antar proses: BEGIN IMMEDIATE).
+
+        Returns:
+            tuple: (item atau None, detik sampai item berikutnya siap atau None)
+        """
+        cooling = [chat for chat, ready_at in self._chat_next.items() if ready_at > now]
+        skip = f"AND chat_id NOT IN ({','.join('?' * len(cooling))})" if cooling else ""
+        with self._db_lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT id, kind, chat_id, fields, photo, attempts FROM outbox "
+                    f"WHERE next_attempt <= ? AND claimed_until <= ? {skip} ORDER BY created LIMIT 1",
+                    (now, now, *cooling),
+                ).fetchone()
+                if row is None:
+                    next_ready = self._conn.execute(
+                        "SELECT MIN(MAX(next_attempt, claimed_until)) FROM outbox"
+                    ).fetchone()[0]
+                    self._conn.execute("COMMIT")
+                    cooldown = min((self._chat_next[c] for c in cooling), default=None)
+                    waits = [t - now for t in (next_ready, cooldown) if t is not None]
+                    return None, max(0.0, min(waits)) if waits else None
+                self._conn.execute(
+                    "UPDATE outbox SET claimed_by = ?, claimed_until = ? WHERE id = ?",
+                    (self.worker_id, now + CLAIM_LEASE_SECONDS, row[0]),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        item_id, kind, chat_id, fields, photo, attempts = row
+        return {"id": item_id, "kind": kind, "chat_id": chat_id, "photo": photo, "attempts": attempts,
+                **json.loads(fields)}, 0.0
+
+    def _finish(self, item, ok, retry_after, permanent):
+        """Hapus item terkirim/dibuang atau jadwalkan ulang; hanya baris item ini yang disentuh."""
+        if ok or permanent or item["attempts"] + 1 >= self.max_attempts:
+            if not ok:
+                self._dropped += 1
+                logger.error(f"❌ Pesan Telegram {item['id']} dibuang setelah {item['attempts'] + 1} percobaan.")
+            else:
+                self._sent += 1
+            self._execute("DELETE FROM outbox WHERE id = ?", (item["id"],))
+            return
+        attempts = item["attempts"] + 1
+        backoff = retry_after or min(MAX_BACKOFF_SECONDS, 2 ** attempts)
+        next_attempt = time.time() + backoff
+        if retry_after:
+            self._chat_next[item["chat_id"]] = next_attempt
+        fields = {k: v for k, v in item.items() if k not in ("id", "kind", "chat_id", "photo", "attempts")}
+        self._execute(
+            "UPDATE outbox SET attempts = ?, next_attempt = ?, fields = ?, claimed_by = NULL, claimed_until = 0 "
+            "WHERE id = ?", (attempts, next_attempt, json.dumps(fields), item["id"]),
+        )
+        logger.warning(f"⏳ Kirim Telegram gagal, dicoba lagi dalam {backoff:.0f} detik (percobaan {attempts}).")
+
+    def _run(self):
+        while True:
+            try:
+                item, wait = self._claim(time.time())
+            except sqlite3.Error as e:
+                logger.error(f"Gagal membaca outbox Telegram: {e}")
+                item, wait = None, POLL_INTERVAL_SECONDS
+            if item is None:
+                # Proses lain juga bisa menambah item: cek ulang berkala walau tidak ada notify
+                with self._cond:
+                    self._cond.wait(min(wait, POLL_INTERVAL_SECONDS) if wait is not None else POLL_INTERVAL_SECONDS)
+                continue
+            self._chat_next[item["chat_id"]] = time.time() + self.per_chat_interval
+
+            self._global_bucket.acquire()
+            with timed("send", kind=item["kind"]):
+                ok, retry_after, permanent = self._deliver(item)
+            if not ok:
+                inc("send_failures", kind=item["kind"])
+            try:
+                self._finish(item, ok, retry_after, permanent)
+            except sqlite3.Error as e:
+                logger.error(f"Gagal memperbarui outbox Telegram: {e}")
+            with self._cond:
+                self._cond.notify_all()
+
+    def _deliver(self, item):
+        """Returns: (ok, retry_after, permanent)."""
+        try:
+            if item["kind"] == "photo":
+                url = f"https://api.telegram.org/bot{self.token}/sendPhoto"
+                data = {"chat_id": item["chat_id"], "caption": item.get("caption", "")}
+                file_id = self._file_id(item.get("cache_key"))
+                if file_id:
+                    data["photo"] = file_id
+                    response = self.session.post(url, data=data, timeout=20)
+                else:
+                    files = {"photo": ("chart.png", item["photo"])}
+                    response = self.session.post(url, files=files, data=data, timeout=20)
+            else:
+                url = f"https://api.telegram.org/bot{self.token}/sendMessage"
+                payload = {"chat_id": item["chat_id"], "text": item["text"]}
+                if item.get("parse_mode"):
+                    payload["parse_mode"] = item["parse_mode"]
+                response = self.session.post(url, json=payload, timeout=10)
+        except requests.exceptions.RequestException as e:
+            logger.warning(f"Gagal menghubungi Telegram: {e}")
+            return False, None, False
+
+        try:
+            body = response.json()
+        except ValueError:
+            body = {}
+        if response.ok and body.get("ok", False):
+            photos = body.get("result", {}).get("photo") if isinstance(body.get("result"), dict) else None
+            if item.get("cache_key") and photos:
+                self._remember_file_id(item["cache_key"], photos[-1]["file_id"])
+            return True, None, False
+        if response.status_code == 429:
+            return False, body.get("parameters", {}).get("retry_after", 5), False
+        if response.status_code >= 500:
+            return False, None, False
+
+        description = body.get("description", response.text[:200])
+        if self._file_id(item.get("cache_key")) and "file" in description.lower():
+            # file_id kedaluwarsa/tidak valid: upload ulang gambarnya
+            self._execute("DELETE FROM file_ids WHERE cache_key = ?", (item["cache_key"],))
+            return False, 0.1, False
+        if item.get("parse_mode") and "parse" in description.lower():
+            # Teks tidak valid sebagai HTML: kirim ulang sebagai teks biasa
+            item["parse_mode"] = None
+            return False, 0.1, False
+        logger.error(f"❌ Telegram menolak pesan ({response.status_code}): {description}")
+        return False, None, True
+
+
+_outbox = None
+_outbox_lock = threading.Lock()
+
+
+def get_outbox(token, path=OUTBOX_PATH):
+    """Outbox tunggal per proses (antreannya dibagi antar proses); worker dimulai saat pertama kali diminta."""
+    global _outbox
+    with _outbox_lock:
+        if _outbox is None:
+            _outbox = TelegramOutbox(token, path=path)
+        elif token and _outbox.token != token:
+            _outbox.token = token
+        return _outbox.start()
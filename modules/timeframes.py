@@ -0,0 +1,21 @@
+import re
+
+# ========================================
+# ⏱️ Timeframe candle -> detik (dipakai REST, stream, riwayat OHLC & dashboard)
+# ========================================
+_TF_PATTERN = re.compile(r"^(\d+)\s*(min|h|d)$", re.IGNORECASE)
+_TF_UNIT_SECONDS = {"min": 60, "h": 3600, "d": 86400}
+_RAISE = object()
+
+
+def timeframe_seconds(tf, default=_RAISE):
+    """
+    '5min' -> 300, '1H'/'1h' -> 3600, '1D' -> 86400. Timeframe tidak dikenal
+    menaikkan ValueError, kecuali `default` diberikan.
+    """
+    match = _TF_PATTERN.match(str(tf).strip())
+    if not match:
+        if default is not _RAISE:
+            return default
+        raise ValueError(f"Timeframe tidak dikenal: {tf!r}")
+    return int(match.group(1)) * _TF_UNIT_SECONDS[match.group(2).lower()]
@@ -0,0 +1,254 @@
+import os
+import time
+import queue
+import logging
+import itertools
+import multiprocessing as mp
+from multiprocessing import shared_memory
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# ========================================
+# 🧵 Pool proses untuk indikator + sinyal (di luar GIL Streamlit)
+# ========================================
+# Candle dikirim lewat shared memory: satu blok float64 per shard dengan kolom
+# berikut (epoch detik muat persis di float64), tanpa pickling DataFrame.
+CANDLE_COLUMNS = ("ts", "open", "high", "low", "close", "volume")
+SHARDS_PER_WORKER = 4
+TASK_TIMEOUT_SECONDS = 120
+MAX_TASK_ATTEMPTS = 3
+POLL_INTERVAL_SECONDS = 0.5
+
+
+def default_worker_count():
+    return max(1, (os.cpu_count() or 1) - 1)
+
+
+# --- Sisi worker -------------------------------------------------------
+def compute_pair(pair, df):
+    """Indikator + sinyal satu pair; hasil ringkas (alert + bitmask sinyal per candle)."""
+    from modules.compact_frames import compact_signals
+    from modules.indicators import apply_indicators
+    from modules.scanner import alerts_from_indicators
+    from modules.signal_engine import scan_signals
+
+    with_indicators = apply_indicators(df)
+    compact = compact_signals(scan_signals(pair, with_indicators))
+    if compact is None or compact.empty:
+        return {"alerts": alerts_from_indicators(with_indicators), "ts": np.empty(0, np.int64), "signal_flags": np.empty(0, np.uint8)}
+    return {
+        "alerts": alerts_from_indicators(with_indicators),
+        "ts": compact["ts"].to_numpy(),
+        "signal_flags": compact["signal_flags"].to_numpy(),
+    }
+
+
+def _worker_main(task_queue, result_queue):
+    import signal
+    import pandas as pd
+
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # Ctrl+C ditangani proses induk
+    while True:
+        task = task_queue.get()
+        if task is None:
+            return
+        task_id, shm_name, n_rows, pairs = task
+        shm = shared_memory.SharedMemory(name=shm_name)
+        results = {}
+        try:
+            block = np.ndarray((n_rows, len(CANDLE_COLUMNS)), dtype=np.float64, buffer=shm.buf)
+            rows = None
+            for pair, start, end in pairs:
+                rows = block[start:end]
+                df = pd.DataFrame(rows[:, 1:], columns=list(CANDLE_COLUMNS[1:]))
+                df.insert(0, "date", pd.to_datetime(rows[:, 0].astype(np.int64), unit="s"))
+                try:
+                    results[pair] = compute_pair(pair, df)
+                except Exception as e:
+                    results[pair] = {"error": str(e)}
+            del block, rows
+        finally:
+            shm.close()
+        result_queue.put((task_id, os.getpid(), results))
+
+
+# --- Sisi induk --------------------------------------------------------
+def pack_candles(candles_by_pair, pairs, block):
+    """Tulis candle `pairs` berurutan ke `block` (n, 6); kembalikan daftar (pair, start, end)."""
+    index, offset = [], 0
+    for pair in pairs:
+        df = candles_by_pair[pair]
+        size = len(df)
+        rows = block[offset:offset + size]
+        rows[:, 0] = df["date"].to_numpy(dtype="datetime64[s]").astype(np.int64)
+        for col, name in enumerate(CANDLE_COLUMNS[1:], start=1):
+            rows[:, col] = df[name].to_numpy(dtype=np.float64)
+        index.append((pair, offset, offset + size))
+        offset += size
+    return index
+
+
+class IndicatorWorkerPool:
+    """
+    Pool proses dengan shard pair. Tiap worker memproses satu shard dalam satu
+    waktu; worker yang mati atau macet (> task_timeout) diganti dan shard-nya
+    dikirim ulang (maksimal MAX_TASK_ATTEMPTS kali).
+    """
+
+    def __init__(self, workers=None, task_timeout=TASK_TIMEOUT_SECONDS, start_method="spawn"):
+        self.workers = workers or default_worker_count()
+        self.task_timeout = task_timeout
+        self._ctx = mp.get_context(start_method)
+        self._result_queue = self._ctx.Queue()
+        self._slots = [None] * self.workers
+        self._task_ids = itertools.count()
+        self.restarts = 0
+
+    # --- Manajemen proses ---------------------------------------------
+    def _spawn(self, slot):
+        task_queue = self._ctx.Queue()
+        process = self._ctx.Process(target=_worker_main, args=(task_queue, self._result_queue),
+                                    name=f"indicator-worker-{slot}", daemon=True)
+        process.start()
+        self._slots[slot] = {"process": process, "queue": task_queue, "task": None, "since": 0.0}
+
+    def start(self):
+        for slot in range(self.workers):
+            if self._slots[slot] is None or not self._slots[slot]["process"].is_alive():
+                self._spawn(slot)
+        return self
+
+    def _restart(self, slot, reason):
+        process = self._slots[slot]["process"]
+        logger.warning(f"♻️ Worker indikator {slot} (pid {process.pid}) diganti: {reason}")
+        if process.is_alive():
+            process.kill()
+        process.join(timeout=5)
+        self.restarts += 1
+        self._spawn(slot)
+
+    def close(self):
+        for slot in self._slots:
+            if slot is not None and slot["process"].is_alive():
+                slot["queue"].put(None)
+        for slot in self._slots:
+            if slot is not None:
+                slot["process"].join(timeout=5)
+                if slot["process"].is_alive():
+                    slot["process"].kill()
+        self._slots = [None] * self.workers
+
+    # --- Eksekusi -----------------------------------------------------
+    def _shards(self, sizes):
+        """Bagi pair ke shard dengan jumlah baris seimbang (pair terbesar dulu)."""
+        n_shards = max(1, min(len(sizes), self.workers * SHARDS_PER_WORKER))
+        shards = [[] for _ in range(n_shards)]
+        loads = [0] * n_shards
+        for pair, size in sorted(sizes.items(), key=lambda item: item[1], reverse=True):
+            target = loads.index(min(loads))
+            shards[target].append(pair)
+            loads[target] += size
+        return [(shard, load) for shard, load in zip(shards, loads) if shard]
+
+    def _make_task(self, candles_by_pair, shard, rows):
+        # Candle langsung ditulis ke shared memory shard (tanpa salinan perantara)
+        shm = shared_memory.SharedMemory(create=True, size=max(1, rows * len(CANDLE_COLUMNS) * 8))
+        view = np.ndarray((rows, len(CANDLE_COLUMNS)), dtype=np.float64, buffer=shm.buf)
+        index = pack_candles(candles_by_pair, shard, view)
+        del view
+        return {"id": next(self._task_ids), "shm": shm, "rows": rows, "pairs": index, "attempts": 0}
+
+    def _dispatch(self, slot, task):
+        task["attempts"] += 1
+        self._slots[slot].update(task=task, since=time.monotonic())
+        self._slots[slot]["queue"].put((task["id"], task["shm"].name, task["rows"], task["pairs"]))
+
+    @staticmethod
+    def _release(task):
+        if task.get("released"):
+            return
+        task["released"] = True
+        task["shm"].close()
+        task["shm"].unlink()
+
+    def run(self, candles_by_pair):
+        """
+        Hitung indikator + sinyal untuk semua pair.
+
+        Args:
+            candles_by_pair (dict): {pair: DataFrame candle (date, open, high, low, close, volume)}
+
+        Returns:
+            dict: {pair: {"alerts": [...], "ts": int64[], "signal_flags": uint8[]}} atau {"error": str}
+        """
+        self.start()
+        sizes = {pair: len(df) for pair, df in candles_by_pair.items() if df is not None and not df.empty}
+        pending = [self._make_task(candles_by_pair, shard, rows) for shard, rows in self._shards(sizes)]
+        in_flight = {}
+        results = {}
+        try:
+            while pending or in_flight:
+                for slot, state in enumerate(self._slots):
+                    if state["task"] is None and pending:
+                        task = pending.pop(0)
+                        in_flight[task["id"]] = task
+                        self._dispatch(slot, task)
+
+                try:
+                    task_id, _, shard_results = self._result_queue.get(timeout=POLL_INTERVAL_SECONDS)
+                except queue.Empty:
+                    task_id = None
+
+                if task_id is not None and task_id in in_flight:
+                    results.update(shard_results)
+                    self._release(in_flight.pop(task_id))
+                    for state in self._slots:
+                        if state["task"] is not None and state["task"]["id"] == task_id:
+                            state["task"] = None
+
+                # Deteksi worker mati / macet lalu kirim ulang shard-nya
+                now = time.monotonic()
+                for slot, state in enumerate(self._slots):
+                    task = state["task"]
+                    alive = state["process"].is_alive()
+                    if task is None:
+                        if not alive:
+                            self._restart(slot, f"exit code {state['process'].exitcode}")
+                        continue
+                    if alive and now - state["since"] < self.task_timeout:
+                        continue
+                    self._restart(slot, "timeout" if alive else f"exit code {state['process'].exitcode}")
+                    if task["attempts"] >= MAX_TASK_ATTEMPTS:
+                        logger.error(f"Shard {task['id']} gagal {task['attempts']} kali, {len(task['pairs'])} pair dilewati.")
+                        results.update({pair: {"error": "worker gagal"} for pair, _, _ in task["pairs"]})
+                        self._release(in_flight.pop(task["id"]))
+                    else:
+                        pending.insert(0, task)
+        finally:
+            for task in [*in_flight.values(), *pending]:
+                self._release(task)
+        return results
+
+    def stats(self):
+        return {
+            "workers": self.workers,
+            "alive": sum(1 for state in self._slots if state is not None and state["process"].is_alive()),
+            "restarts": self.restarts,
+        }
+
+
+_pool = None
+
+
+def get_worker_pool(workers=None):
+    """Pool tunggal per proses; dibuat ulang jika jumlah worker berubah."""
+    global _pool
+    workers = workers or default_worker_count()
+    if _pool is not None and _pool.workers != workers:
+        _pool.close()
+        _pool = None
+    if _pool is None:
+        _pool = IndicatorWorkerPool(workers)
+    return _pool.start()
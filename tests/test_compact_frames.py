@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.compact_frames import OHLCV_COLUMNS, candle_frames, compact_candles, expand_candle_frames
+
+T0 = 1_700_000_000
+
+
+def indicator_frame(rows=5):
+    close = 100.0 + np.arange(rows, dtype=np.float64)
+    return pd.DataFrame({
+        "date": pd.to_datetime(T0 + 3600 * np.arange(rows), unit="s"),
+        "open": close, "high": close + 1, "low": close - 1, "close": close, "volume": np.ones(rows),
+        "rsi": np.linspace(30.0, 70.0, rows),
+    })
+
+
+# === pair tanpa candle ===
+@pytest.mark.parametrize("compact", [False, True])
+@pytest.mark.parametrize("empty", [None, pd.DataFrame(), pd.DataFrame(columns=OHLCV_COLUMNS)])
+def test_empty_pair_in_both_modes(compact, empty):
+    # Frame kosong tanpa kolom = hasil cache bersama saat pair tidak punya candle
+    candle_df, with_indicators = expand_candle_frames(*candle_frames(empty, compact))
+
+    assert candle_df.empty and with_indicators.empty
+    assert list(candle_df.columns) == OHLCV_COLUMNS
+
+
+# === pair dengan candle ===
+@pytest.mark.parametrize("compact", [False, True])
+def test_candle_frames_roundtrip(compact):
+    full = indicator_frame()
+    stored = compact_candles(full, "btcidr") if compact else full
+
+    candle_df, with_indicators = expand_candle_frames(*candle_frames(stored, compact))
+
+    assert list(candle_df.columns) == OHLCV_COLUMNS
+    assert candle_df["date"].tolist() == full["date"].tolist()
+    np.testing.assert_allclose(candle_df["close"].to_numpy(dtype=np.float64), full["close"].to_numpy())
+    assert "rsi" in with_indicators.columns
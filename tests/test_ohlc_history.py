@@ -0,0 +1,130 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules import ohlc_history
+from modules.ohlc_history import OHLCHistoryStore, backfill, merge_history
+
+HOUR = 3600
+DAY = 86400
+T0 = 1_700_000_000 - 1_700_000_000 % DAY  # 00:00 UTC
+
+
+def frame(timestamps, close, **extra):
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    close = np.broadcast_to(np.asarray(close, dtype=np.float64), timestamps.shape)
+    df = pd.DataFrame({
+        "date": pd.to_datetime(timestamps, unit="s"),
+        "open": close, "high": close + 1, "low": close - 1, "close": close, "volume": np.ones(len(timestamps)),
+    })
+    for name, values in extra.items():
+        df[name] = values
+    return df
+
+
+# === merge_history ===
+def test_merge_overlap_keeps_history_for_partial_first_live_candle():
+    history = frame(T0 + HOUR * np.arange(10), 100.0)
+    live = frame(T0 + HOUR * np.arange(7, 13), 200.0, taker_buy_volume=np.full(6, 0.5))
+
+    merged = merge_history(history, live, HOUR)
+
+    expected_ts = T0 + HOUR * np.arange(13)
+    assert merged["date"].tolist() == pd.to_datetime(expected_ts, unit="s").tolist()
+    assert merged["date"].is_unique
+    # Candle live tertua (jam ke-7) dimulai di tengah periode: versi historis dipakai
+    assert merged.loc[7, "close"] == 100.0
+    assert (merged.loc[8:, "close"] == 200.0).all()
+    assert merged.loc[:7, "taker_buy_volume"].isna().all()
+    assert (merged.loc[8:, "taker_buy_volume"] == 0.5).all()
+
+
+def test_merge_drops_live_daily_candles_misaligned_with_history():
+    # Candle harian bursa dimulai 17:00 UTC (00:00 WIB), candle /trades di 00:00 UTC
+    history = frame(T0 - 7 * HOUR + DAY * np.arange(5), 100.0)
+    live = frame(T0 + DAY * np.arange(3, 7), 200.0)
+
+    merged = merge_history(history, live, DAY)
+
+    pd.testing.assert_frame_equal(merged, history)
+
+
+def test_merge_keeps_aligned_daily_candles_after_history():
+    history = frame(T0 - 7 * HOUR + DAY * np.arange(5), 100.0)
+    live = frame(T0 - 7 * HOUR + DAY * np.arange(4, 8), 200.0)
+
+    merged = merge_history(history, live, DAY)
+
+    assert len(merged) == 8
+    assert merged["date"].is_unique
+    assert merged.loc[4, "close"] == 100.0  # candle live tertua tidak menimpa riwayat
+    assert (merged.loc[5:, "close"] == 200.0).all()
+
+
+def test_merge_with_empty_side_returns_other():
+    history = frame(T0 + HOUR * np.arange(3), 100.0)
+    assert merge_history(history, history.iloc[:0], HOUR) is history
+    assert merge_history(history.iloc[:0], history, HOUR) is history
+
+
+# === backfill ===
+class FakeExchange:
+    """Halaman history sintetis 1H; tidak ada data sebelum `listed_at`."""
+
+    def __init__(self, listed_at):
+        self.listed_at = listed_at
+        self.requests = []
+
+    def __call__(self, pair, tf, start, end):
+        self.requests.append((start, end))
+        first = max(start, self.listed_at)
+        first += -first % HOUR
+        return [(ts, 1.0, 2.0, 0.5, 1.5, 10.0) for ts in range(first, end + 1, HOUR)]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return OHLCHistoryStore(str(tmp_path / "history.sqlite3"))
+
+
+def test_backfill_marks_exhausted_when_oldest_page_is_empty(store, monkeypatch):
+    now = T0 + 5 * DAY
+    # Listing baru: halaman pertama (paling lama) dari 1500 bar kosong
+    exchange = FakeExchange(listed_at=now - 300 * HOUR)
+    monkeypatch.setattr(ohlc_history, "fetch_history_page", exchange)
+
+    saved = backfill("new_idr", "1H", bars=1500, store=store, now=now)
+
+    assert len(exchange.requests) == 2
+    assert saved == 301
+    coverage = store.coverage("new_idr", "1H")
+    assert coverage["exhausted"]
+    assert coverage["first_ts"] == now - 300 * HOUR
+    assert coverage["last_ts"] == now
+
+    # Meminta lebih banyak bar tidak mengulang rentang sebelum listing
+    exchange.requests.clear()
+    backfill("new_idr", "1H", bars=3000, store=store, now=now)
+    assert exchange.requests == [(now, now)]
+
+
+def test_backfill_second_call_fetches_only_tail(store, monkeypatch):
+    now = T0 + 100 * DAY
+    exchange = FakeExchange(listed_at=0)
+    monkeypatch.setattr(ohlc_history, "fetch_history_page", exchange)
+
+    backfill("btc_idr", "1H", bars=1500, store=store, now=now)
+    coverage = store.coverage("btc_idr", "1H")
+    assert not coverage["exhausted"]
+    assert coverage["first_ts"] == now - 1499 * HOUR
+    assert len(store.load("btc_idr", "1H")) == 1500
+
+    exchange.requests.clear()
+    later = now + 3 * HOUR + 120
+    saved = backfill("btc_idr", "1H", bars=1500, store=store, now=later)
+
+    # Hanya dari candle terakhir tersimpan (mungkin belum ditutup) sampai sekarang
+    assert exchange.requests == [(now, later)]
+    assert saved == 4
+    assert store.coverage("btc_idr", "1H")["last_ts"] == now + 3 * HOUR
+    assert len(store.load("btc_idr", "1H")) == 1503
@@ -0,0 +1,37 @@
+import threading
+
+from modules import profiler
+from modules.profiler import ProfileSession
+
+
+def session(tmp_path):
+    return ProfileSession("rerun", directory=str(tmp_path / "profiles"), sampling=False)
+
+
+# === satu sesi aktif per proses ===
+def test_discard_releases_without_saving(tmp_path):
+    first = session(tmp_path).start()
+    assert first.active
+    assert not session(tmp_path).start().active  # sesi pertama masih memegang profiler
+
+    first.discard()
+
+    assert not first.active and profiler._active_session is None
+    assert not (tmp_path / "profiles").exists()
+    second = session(tmp_path).start()
+    assert second.active
+    assert second.stop()["label"] == "rerun"
+
+
+def test_session_of_finished_thread_is_taken_over(tmp_path):
+    # Thread skrip yang berhenti di tengah (exception, st.stop()) tanpa stop()/discard()
+    abandoned = []
+    worker = threading.Thread(target=lambda: abandoned.append(session(tmp_path).start()))
+    worker.start()
+    worker.join()
+    assert abandoned[0].active
+
+    current = session(tmp_path).start()
+
+    assert current.active and profiler._active_session is current
+    current.discard()
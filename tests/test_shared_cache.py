@@ -0,0 +1,57 @@
+import multiprocessing
+import time
+
+import pytest
+
+from modules import shared_cache
+from modules.shared_cache import SharedCache
+
+pytestmark = pytest.mark.skipif(shared_cache.fcntl is None, reason="flock tidak tersedia")
+
+KEY = "candles/btc_idr/1H"
+
+
+def slow_invalid_writer(directory, started):
+    cache = SharedCache(directory)
+
+    def compute():
+        started.set()
+        time.sleep(0.5)
+        return {}  # mis. pair tanpa candle: gagal valid(), tidak dipublikasikan
+
+    cache.get_or_publish(KEY, compute, stamp=[1], valid=bool)
+
+
+# === get_or_publish lintas proses ===
+def test_waiter_takes_over_when_writer_publishes_nothing(tmp_path):
+    directory = str(tmp_path / "shm")
+    cache = SharedCache(directory)
+    context = multiprocessing.get_context("fork")
+    started = context.Event()
+    writer = context.Process(target=slow_invalid_writer, args=(directory, started))
+    writer.start()
+    try:
+        assert started.wait(5)
+        begin = time.monotonic()
+        value = cache.get_or_publish(KEY, lambda: {"close": 100.0}, stamp=[1], valid=bool)
+        elapsed = time.monotonic() - begin
+    finally:
+        writer.join(5)
+
+    assert value == {"close": 100.0}
+    # Penunggu tidak menunggu wait_timeout penuh: langsung jadi penulis saat lock lepas
+    assert elapsed < cache.wait_timeout / 2
+    assert cache.fallbacks == 0 and cache.published == 1
+    assert cache.read(KEY)[2] == {"close": 100.0}
+
+
+def test_waiter_reads_value_published_by_other_process(tmp_path):
+    directory = str(tmp_path / "shm")
+    cache = SharedCache(directory)
+    cache.publish(KEY, {"close": 1.0}, stamp=[1])
+    other = SharedCache(directory)
+
+    value = other.get_or_publish(KEY, lambda: pytest.fail("compute tidak boleh dipanggil"), stamp=[1])
+
+    assert value == {"close": 1.0}
+    assert other.hits == 1
@@ -1,5 +1,11 @@
-import pandas as pd
+import hashlib
 import logging
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from modules.pair_registry import pair_registry
 
 logger = logging.getLogger(__name__)
 
@@ -7,6 +13,15 @@ logger = logging.getLogger(__name__)
 def format_price_idr_int(val):
     return f"{int(val):,}".replace(",", ".")
 
+# === format_price ===
+def format_price(price, pair_symbol):
+    try:
+        price = float(price)
+        # Formatter sudah dikompilasi per pair di registry (fallback: aturan quote currency)
+        return pair_registry.price_formatter(pair_symbol)(price)
+    except (ValueError, TypeError):
+        return str(price)
+
 # ---Fungsi Hitung Rasio-------------------------
 def hitung_rasio_bs(buy, sell):
     if buy == 0 and sell == 0:
@@ -18,7 +33,21 @@ def hitung_rasio_bs(buy, sell):
         return f"Supply > Demand ({ratio:.2f})"
     else:
         return f"Seimbang ({ratio:.2f})"
-        
+
+# === generate_market_signal ===
+def generate_market_signal(buy_vol, sell_vol):
+    if buy_vol > sell_vol * 1.2: return "STRONG BUY"
+    if buy_vol > sell_vol: return "BUY"
+    if buy_vol == sell_vol: return "HOLD"
+    if sell_vol > buy_vol * 1.2: return "STRONG SELL"
+    return "SELL"
+
+# === get_position_suggestion ===
+def get_position_suggestion(signal):
+    if signal in ["STRONG BUY", "BUY"]: return "Pertimbangkan LONG"
+    if signal in ["STRONG SELL", "SELL"]: return "Pertimbangkan SHORT"
+    return "-"
+
 # --- Fungsi pembersih & transformasi awal data ticker ---
 def clean_and_transform_market_data(data_dict):
     df = pd.DataFrame.from_dict(data_dict, orient='index')
@@ -35,60 +64,117 @@ def clean_and_transform_market_data(data_dict):
 
     return df
 
-# --- Fungsi untuk memperkaya dataframe dengan logika bisnis ---
-def enrich_market_dataframe(df):
-    df['Harga'] = [format_price(price, pair) for price, pair in zip(df['last'], df.index)]
-    df['Volume IDR (24j)'] = df['vol_idr'].apply(lambda x: f"{x:,.0f} IDR")
-    df['Volume Buy'] = df['buy'].apply(lambda x: f"{x:,.0f}")
-    df['Volume Sell'] = df['sell'].apply(lambda x: f"{x:,.0f}")
-    df['Rasio B/S'] = df.apply(lambda x: hitung_rasio_bs(x['buy'], x['sell']), axis=1)
-    df['Sinyal Pasar'] = df.apply(lambda x: generate_market_signal(x['buy'], x['sell']), axis=1)
-    df['Saran Posisi'] = df['Sinyal Pasar'].apply(get_position_suggestion)
-    df['Spike (%)'] = df.apply(lambda x: ((x['high'] - x['low']) / x['low'] * 100) if x['low'] > 0 else 0, axis=1)
-    df['Spike (%)'] = df['Spike (%)'].apply(lambda x: f"{x:.2f}%")
-    return df
-
-def get_top_movers(tickers):
-    """Ambil top gainers, top losers dan top volume movers."""
-    try:
-        if not tickers:
-            logger.warning("Data tickers kosong")
-            return pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
-
-        df = pd.DataFrame.from_dict(tickers, orient='index')
-
-        if df.empty:
-            logger.warning("DataFrame tickers kosong")
-            return pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
-
-        required_columns = ['last', 'change', 'vol_idr']
-        if not all(col in df.columns for col in required_columns):
-            logger.error(f"Kolom yang diperlukan tidak ada: {required_columns}. Kolom yang tersedia: {df.columns.tolist()}")
-            return pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
-
-        # Konversi tipe data
-        df['last'] = pd.to_numeric(df['last'], errors='coerce')
-        df['change'] = pd.to_numeric(df['change'], errors='coerce')
-        df['vol_idr'] = pd.to_numeric(df['vol_idr'], errors='coerce')
-
-        # Filter NaN values
-        df = df.dropna(subset=['last', 'change', 'vol_idr'])
+# --- Versi vektor dari aturan di atas (satu operasi untuk semua pair) ---
+def market_signal_array(buy, sell):
+    return np.select(
+        [buy > sell * 1.2, buy > sell, buy == sell, sell > buy * 1.2],
+        ["STRONG BUY", "BUY", "HOLD", "STRONG SELL"],
+        default="SELL",
+    )
+
+def position_suggestion_array(signals):
+    return np.select(
+        [np.isin(signals, ["STRONG BUY", "BUY"]), np.isin(signals, ["STRONG SELL", "SELL"])],
+        ["Pertimbangkan LONG", "Pertimbangkan SHORT"],
+        default="-",
+    )
+
+def ratio_bs_values(buy, sell):
+    both_zero = (buy == 0) & (sell == 0)
+    return np.where(both_zero, 1.0, buy / (sell + 1e-9)), both_zero
+
+def rasio_bs_array(buy, sell):
+    ratio, both_zero = ratio_bs_values(buy, sell)
+    labels = np.select([both_zero, ratio > 1.2, ratio < 0.8], ["Seimbang", "Demand > Supply", "Supply > Demand"], default="Seimbang")
+    return np.char.add(np.char.add(labels.astype(str), " ("), np.char.mod("%.2f)", ratio))
+
+def format_price_array(prices, pairs):
+    """Sama dengan format_price: satu lookup O(1) ke formatter pair di registry per baris."""
+    formatter_for = pair_registry.price_formatter
+    return [formatter_for(pair)(price) for pair, price in zip(pairs, prices.tolist())]
+
+def format_thousands_array(values, suffix=""):
+    return [f"{x:,.0f}{suffix}" for x in values.tolist()]
+
+ENRICH_INPUT_COLUMNS = ['last', 'buy', 'sell', 'vol_idr', 'high', 'low']
+# Metrik order book dari modules.order_book.depth_metrics (band sinyal)
+DEPTH_INPUT_COLUMNS = ['bid_depth', 'ask_depth', 'imbalance', 'spread_pct', 'book_slope']
+_ENRICH_CACHE_SIZE = 8
+_enrich_cache = OrderedDict()
+
+def market_snapshot_hash(df, depth=None):
+    """Hash isi snapshot ticker (pair + kolom numerik) dan metrik depth untuk memoization."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(pair_registry.version).encode())  # format harga ikut berubah saat registry dimuat ulang
+    digest.update("\x1f".join(map(str, df.index)).encode())
+    digest.update(np.ascontiguousarray(df[ENRICH_INPUT_COLUMNS].to_numpy(dtype=np.float64)).tobytes())
+    if depth is not None and not depth.empty:
+        digest.update("\x1e".join(map(str, depth.index)).encode())
+        digest.update(np.ascontiguousarray(depth[DEPTH_INPUT_COLUMNS].to_numpy(dtype=np.float64)).tobytes())
+    return digest.hexdigest()
 
-        # Top gainers (nilai 'change' terbesar)
-        top_gainers = df.sort_values(by='change', ascending=False).head(10)
-
-        # Top losers (nilai 'change' terkecil)
-        top_losers = df.sort_values(by='change').head(10)
-
-        # Top volume movers (volume terbesar)
-        top_volume = df.sort_values(by='vol_idr', ascending=False).head(10)
-
-        logger.info(f"Kolom top_gainers sebelum return: {top_gainers.columns.tolist()}")
-        return top_gainers, top_losers, top_volume
-
-    except Exception as e:
-        logger.error(f"Error dalam get_top_movers: {str(e)}", exc_info=True)
-        return pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
+# --- Fungsi untuk memperkaya dataframe dengan logika bisnis ---
+def enrich_market_dataframe(df, depth=None):
+    """
+    Tambahkan kolom tampilan tabel pasar global secara vektor. Hasil di-memo
+    berdasarkan hash snapshot, jadi snapshot yang sama tidak dihitung ulang.
+
+    `buy`/`sell` ticker adalah harga bid/ask terbaik, bukan volume. "Rasio B/S",
+    "Sinyal Pasar" dan "Saran Posisi" dihitung dari notional order book dalam band
+    sinyal (`depth`, lihat modules.order_book); pair tanpa book diberi "-".
+    """
+    key = market_snapshot_hash(df, depth)
+    cached = _enrich_cache.get(key)
+    if cached is not None:
+        _enrich_cache.move_to_end(key)
+        return cached.copy()
+
+    df = df.copy()
+    last = df['last'].to_numpy(dtype=np.float64)
+    buy = df['buy'].to_numpy(dtype=np.float64)
+    sell = df['sell'].to_numpy(dtype=np.float64)
+    high = df['high'].to_numpy(dtype=np.float64)
+    low = df['low'].to_numpy(dtype=np.float64)
+
+    if depth is None or depth.empty:
+        book = np.full((len(df), len(DEPTH_INPUT_COLUMNS)), np.nan)
+    else:
+        book = depth.reindex(df.index)[DEPTH_INPUT_COLUMNS].to_numpy(dtype=np.float64)
+    bid_depth, ask_depth, imbalance, spread, slope = book.T
+    has_depth = np.isfinite(bid_depth) & np.isfinite(ask_depth) & (bid_depth + ask_depth > 0)
+
+    signals = np.where(has_depth, market_signal_array(bid_depth, ask_depth), "")
+    with np.errstate(divide='ignore', invalid='ignore'):
+        spike = np.where(low > 0, (high - low) / low * 100, 0.0)
+
+    df['Harga'] = format_price_array(last, df.index)
+    df['Volume IDR (24j)'] = format_thousands_array(df['vol_idr'].to_numpy(dtype=np.float64), " IDR")
+    df['Harga Bid'] = format_price_array(buy, df.index)
+    df['Harga Ask'] = format_price_array(sell, df.index)
+    df['Spread (%)'] = np.where(np.isfinite(spread), np.char.mod("%.2f%%", spread), "-")
+    df['Kedalaman Bid'] = np.where(has_depth, format_thousands_array(bid_depth, " IDR"), "-")
+    df['Kedalaman Ask'] = np.where(has_depth, format_thousands_array(ask_depth, " IDR"), "-")
+    df['Rasio B/S'] = np.where(has_depth, rasio_bs_array(bid_depth, ask_depth), "-")
+    df['Sinyal Pasar'] = signals
+    df['Saran Posisi'] = position_suggestion_array(signals)
+    df['Spike (%)'] = np.char.mod("%.2f%%", spike)
+    # Nilai numerik untuk mode tabel cepat (kolom bertipe, tanpa Styler)
+    df['rasio_bs'] = np.where(has_depth, ratio_bs_values(bid_depth, ask_depth)[0], np.nan)
+    df['spike_pct'] = spike
+    df['spread_pct'] = spread
+    df['bid_depth'] = bid_depth
+    df['ask_depth'] = ask_depth
+    df['imbalance'] = imbalance
+    df['book_slope'] = slope
+    # Imbalance per band yang dikonfigurasi (imbalance_0.5, imbalance_2, ...)
+    if depth is not None and not depth.empty:
+        band_columns = [col for col in depth.columns if col.startswith('imbalance_')]
+        df[band_columns] = depth.reindex(df.index)[band_columns].to_numpy(dtype=np.float64)
+
+    _enrich_cache[key] = df
+    while len(_enrich_cache) > _ENRICH_CACHE_SIZE:
+        _enrich_cache.popitem(last=False)
+    return df.copy()
 
 # ========FORMAT VOLUME ====================
 def format_token_amount(val):
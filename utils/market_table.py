@@ -0,0 +1,96 @@
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# ========================================
+# ⚡ Tabel pasar global: kolom bertipe + paging/sort/filter di server
+# ========================================
+SIGNAL_ORDER = ["STRONG BUY", "BUY", "HOLD", "SELL", "STRONG SELL"]
+SIGNAL_BADGES = {
+    "STRONG BUY": "🟢 STRONG BUY",
+    "BUY": "🟩 BUY",
+    "HOLD": "⬜ HOLD",
+    "SELL": "🟧 SELL",
+    "STRONG SELL": "🟥 STRONG SELL",
+}
+
+# Kolom tampilan -> kolom sumber numerik dari enrich_market_dataframe
+FAST_COLUMNS = {
+    'Harga': 'last',
+    'Volume IDR (24j)': 'vol_idr',
+    'Harga Bid': 'buy',
+    'Harga Ask': 'sell',
+    'Spread (%)': 'spread_pct',
+    'Kedalaman Bid': 'bid_depth',
+    'Kedalaman Ask': 'ask_depth',
+    'Slope Buku': 'book_slope',
+    'Rasio B/S': 'rasio_bs',
+    'Sinyal Pasar': 'Sinyal Pasar',
+    'Saran Posisi': 'Saran Posisi',
+    'Spike (%)': 'spike_pct',
+}
+
+SORTABLE_COLUMNS = ['Volume IDR (24j)', 'Harga', 'Rasio B/S', 'Spread (%)', 'Spike (%)', 'Sinyal Pasar', 'Pair']
+
+
+def signal_badge_categorical(signals):
+    """Label sinyal -> kategori berwarna (emoji) tanpa memproses sel satu per satu."""
+    categorical = pd.Categorical(signals, categories=SIGNAL_ORDER, ordered=True)
+    return categorical.rename_categories([SIGNAL_BADGES[s] for s in SIGNAL_ORDER])
+
+
+def band_imbalance_columns(df_market):
+    """Kolom imbalance per band order book (imbalance_0.5, imbalance_1, ...) dari enrich_market_dataframe."""
+    return [col for col in df_market.columns if col.startswith('imbalance_')]
+
+
+def build_fast_market_frame(df_market):
+    """Ambil kolom numerik + sinyal kategorikal dari hasil enrich_market_dataframe."""
+    columns = {label: df_market[source].to_numpy() for label, source in FAST_COLUMNS.items()}
+    for source in band_imbalance_columns(df_market):
+        columns[f"Imbalance ±{source.split('_', 1)[1]}%"] = df_market[source].to_numpy()
+    fast = pd.DataFrame(columns, index=df_market.index)
+    fast['Sinyal Pasar'] = signal_badge_categorical(df_market['Sinyal Pasar'].to_numpy())
+    fast['Saran Posisi'] = pd.Categorical(fast['Saran Posisi'])
+    return fast
+
+
+def query_market_table(fast_df, search="", signals=None, sort_by='Volume IDR (24j)', ascending=False,
+                       page=1, page_size=50):
+    """
+    Filter, urutkan dan potong tabel di server sehingga hanya halaman yang
+    terlihat yang dikirim ke browser.
+
+    Returns:
+        tuple: (DataFrame halaman aktif, jumlah baris setelah filter, jumlah halaman)
+    """
+    mask = np.ones(len(fast_df), dtype=bool)
+    if search:
+        mask &= np.asarray(fast_df.index.astype(str).str.contains(search.strip(), case=False, regex=False))
+    if signals:
+        mask &= np.isin(fast_df['Sinyal Pasar'].cat.codes.to_numpy(), [SIGNAL_ORDER.index(s) for s in signals])
+    filtered = fast_df[mask]
+
+    if sort_by == 'Pair':
+        keys = filtered.index.to_numpy().astype(str)
+        missing = np.zeros(len(keys), dtype=bool)
+    elif sort_by == 'Sinyal Pasar':
+        keys = filtered['Sinyal Pasar'].cat.codes.to_numpy()
+        missing = keys < 0
+    else:
+        keys = filtered[sort_by].to_numpy(dtype=np.float64)
+        missing = np.isnan(keys)
+    order = np.argsort(keys, kind='stable')
+    if not ascending:
+        order = order[::-1]
+    # Pair tanpa nilai (mis. belum ada order book) selalu di akhir, apa pun arah urutannya
+    order = np.concatenate([order[~missing[order]], order[missing[order]]])
+
+    total_rows = len(filtered)
+    total_pages = max(1, -(-total_rows // page_size))
+    page = min(max(1, int(page)), total_pages)
+    start = (page - 1) * page_size
+    return filtered.iloc[order[start:start + page_size]], total_rows, total_pages